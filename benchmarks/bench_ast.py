@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SPL AST Benchmark - memory and visitor dispatch of slotted nodes vs the dict AST
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_parser import wide_program
+from src.ast_nodes import NODE_CLASSES, Node, NodeVisitor, iter_nodes, to_dict
+from src.lexer import SPLexer
+from src.parser import Parser
+
+class DictWalker:
+    """Old-style dispatch: f-string + getattr per visit, fields by key"""
+    def visit(self, node):
+        method = getattr(self, f"visit_{node['type']}", self.generic_visit)
+        return method(node)
+
+    def generic_visit(self, node):
+        count = 1
+        for value in node.values():
+            if isinstance(value, dict) and 'type' in value:
+                count += self.visit(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict):
+                        count += self.visit(item) if 'type' in item else self.generic_visit(item)
+        return count
+
+class NodeWalker(NodeVisitor):
+    """Shared visitor base: cached per-class dispatch, fields by slot"""
+    def generic_visit(self, node):
+        count = 1
+        for name in node.fields:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                count += self.visit(value)
+            elif isinstance(value, list):
+                for item in value:
+                    count += self.visit(item)
+        return count
+
+class DictDispatch:
+    """Old-style dispatch with trivial handlers"""
+    def visit(self, node):
+        method = getattr(self, f"visit_{node['type']}", self.generic_visit)
+        return method(node)
+
+    def generic_visit(self, node):
+        return 0
+
+class NodeDispatch(NodeVisitor):
+    """Shared visitor dispatch with trivial handlers"""
+    def generic_visit(self, node):
+        return 0
+
+def _handler(self, node):
+    return 1
+
+for name in NODE_CLASSES:
+    setattr(DictDispatch, f"visit_{name}", _handler)
+    setattr(NodeDispatch, f"visit_{name}", _handler)
+
+def iter_dicts(node):
+    """Yield every typed dict in a dict AST"""
+    if isinstance(node, list):
+        for item in node:
+            yield from iter_dicts(item)
+    elif isinstance(node, dict):
+        if 'type' in node:
+            yield node
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from iter_dicts(value)
+
+def measure_memory(build):
+    tracemalloc.start()
+    tree = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, size
+
+def measure_walk(walker, ast, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for node in ast:
+            walker.visit(node)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=5000, help="Functions in the program (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Walks per visitor (default: 5)")
+    args = parser.parse_args()
+
+    tokens = SPLexer(wide_program(args.functions)).tokenize()
+    nodes, node_bytes = measure_memory(lambda: Parser(tokens).parse())
+    dicts, dict_bytes = measure_memory(lambda: to_dict(nodes))
+    count = sum(NodeWalker().visit(node) for node in nodes)
+
+    print(f"{count} nodes")
+    print(f"  memory    dict {dict_bytes / count:7.1f} B/node   "
+          f"slotted {node_bytes / count:7.1f} B/node   ({dict_bytes / node_bytes:.1f}x)")
+
+    flat_dicts = list(iter_dicts(dicts))
+    flat_nodes = list(iter_nodes(nodes))
+    dict_time = measure_walk(DictDispatch(), flat_dicts, args.repeat)
+    node_time = measure_walk(NodeDispatch(), flat_nodes, args.repeat)
+    print(f"  dispatch  dict {dict_time / len(flat_dicts) * 1e9:7.1f} ns/node  "
+          f"slotted {node_time / len(flat_nodes) * 1e9:7.1f} ns/node  ({dict_time / node_time:.1f}x)")
+
+    dict_time = measure_walk(DictWalker(), dicts, args.repeat)
+    node_time = measure_walk(NodeWalker(), nodes, args.repeat)
+    print(f"  full walk dict {dict_time / count * 1e9:7.1f} ns/node  "
+          f"slotted {node_time / count * 1e9:7.1f} ns/node  ({dict_time / node_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+SPL Async Backend Benchmark - I/O-bound anzisha blocks on one event loop
+
+Each task sleeps, or fetches a small JSON document from a local stand-in
+HTTP server, on the VM. The async backend runs them all as coroutines on
+one thread, with each request in flight on one of at most 256 pakua
+threads; the thread backend needs a thread per waiting task.
+"""
+import argparse
+import asyncio
+import io
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.concurrency import set_default_workers, spawn
+from src.lexer import Lexer
+from src.parser import Parser
+from src.processes import set_default_backend
+from src.vm import VirtualMachine
+
+BODY = b'{"jina": "spl", "namba": [1, 2, 3]}'
+
+class StandInServer:
+    """Minimal HTTP server on its own thread and event loop"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def _serve(self, ready: threading.Event) -> None:
+        async def handle(reader, writer):
+            while (await reader.readline()).strip():
+                pass
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY))
+            await writer.drain()
+            writer.close()
+
+        async def start():
+            self.server = await asyncio.start_server(handle, '127.0.0.1', 0, backlog=4096)
+            self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/data"
+            ready.set()
+            await self.server.serve_forever()
+
+        self.loop.run_until_complete(start())
+
+def run(block: str, tasks: int, backend: str) -> float:
+    set_default_backend(backend)
+    vm = VirtualMachine()
+    code = vm.compile(Parser(Lexer(block).tokenize()).parse())
+    env = vm.global_env
+    vm.local_names |= code.local_names
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        if backend == 'async':
+            spawned = [vm.loop.spawn(vm.steps(code, env, env)) for _ in range(tasks)]
+            # An empty program: the loop runs until its tasks are done
+            vm.execute(vm.compile([]), env)
+        else:
+            spawned = [spawn(vm.run, code, env, env) for _ in range(tasks)]
+            for task in spawned:
+                task.join()
+    seconds = time.perf_counter() - start
+    failed = sum(task.result.exception is not None for task in spawned)
+    if failed:
+        print(f"  {failed} of {tasks} tasks failed")
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks on the async backend (default: 10000)")
+    parser.add_argument("--thread-tasks", type=int, default=1000,
+                        help="Tasks on the thread backend, one thread each (default: 1000)")
+    parser.add_argument("--sleep", type=float, default=0.5, help="Seconds each sleeping task waits (default: 0.5)")
+    args = parser.parse_args()
+
+    server = StandInServer()
+    blocks = (("simamisha", f"simamisha({args.sleep})\n"),
+              ("pakua", f'pakua("{server.url}")\n'))
+    # A thread per task, so waiting tasks never queue behind each other
+    set_default_workers(0)
+    for name, block in blocks:
+        for backend, tasks in (("async", args.tasks), ("thread", args.thread_tasks)):
+            seconds = run(block, tasks, backend)
+            print(f"  {name:<10} {backend:<7} {tasks:6d} tasks  {seconds * 1000:8.1f} ms"
+                  f"  {tasks / seconds:8.0f} tasks/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+SPL JIT Benchmark - closure tier alone vs promotion of hot kazi to Python
+"""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_vm import fibonacci_program, loop_program
+from src.interpreter import Interpreter
+from src.jit import JIT
+from src.lexer import Lexer
+from src.parser import Parser
+
+def best_of(repeat: int, ast, threshold=None):
+    best = float('inf')
+    jit = None
+    for _ in range(repeat):
+        jit = JIT(threshold) if threshold else None
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            Interpreter(jit=jit).interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best, jit
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fib", type=int, default=22, help="Fibonacci argument (default: 22)")
+    parser.add_argument("--iterations", type=int, default=1200, help="Outer loop iterations (default: 1200)")
+    parser.add_argument("--depth", type=int, default=25, help="Inner loop iterations (default: 25)")
+    parser.add_argument("--threshold", type=int, default=50, help="JIT call threshold (default: 50)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per tier (default: 3)")
+    args = parser.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * args.depth + 1000))
+
+    programs = {
+        f"fibonacci({args.fib})": fibonacci_program(args.fib),
+        f"loop {args.iterations}x{args.depth}": loop_program(args.iterations, args.depth),
+    }
+    for name, source in programs.items():
+        ast = Parser(Lexer(source).tokenize()).parse()
+        closures, _ = best_of(args.repeat, ast)
+        native, jit = best_of(args.repeat, ast, args.threshold)
+        print(f"  {name:<20} closures {closures * 1000:8.1f} ms  jit {native * 1000:8.1f} ms  "
+              f"({closures / native:.2f}x)  promoted: {', '.join(jit.promoted()) or '-'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+SPL Lazy Parsing Benchmark - startup of scripts with many kazi but few calls
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.interpreter import Interpreter
+from src.lexer import SPLexer
+from src.parser import Parser
+
+def many_functions(functions: int) -> str:
+    """Many kazi with non-trivial bodies, each well-typed when called"""
+    return "".join(
+        f"kazi f{i}(a: int, b: int) -> int {{\n"
+        f"    x = a * 2 + b * 3 - (a - b) * 4 + {i}\n"
+        f"    y = x - {i} * (a - b)\n"
+        f"    kama x > {i} {{ rudisha x + y }} vinginevyo {{ rudisha f{i}(a, b + 1) }}\n"
+        f"}}\n"
+        for i in range(functions)
+    )
+
+def run(tokens, lazy: bool, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ast = Parser(tokens, lazy=lazy).parse()
+        Interpreter().interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (default: 3)")
+    parser.add_argument("--calls", type=int, default=3, help="Distinct kazi called per run (default: 3)")
+    args = parser.parse_args()
+
+    for functions in (100, 1000, 5000):
+        source = many_functions(functions) + "".join(
+            f"f{i}({i + 1}, 2)\n" for i in range(args.calls)
+        )
+        tokens = SPLexer(source).tokenize()
+        eager = run(tokens, False, args.repeat)
+        lazy = run(tokens, True, args.repeat)
+        print(f"  {functions:>5} kazi  eager {eager * 1000:8.1f} ms  "
+              f"lazy {lazy * 1000:8.1f} ms  ({eager / lazy:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+SPL Lexer Benchmark - regex engine vs character loop (MB/s)
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.lexer import SPLexer
+
+FUNCTION_TEMPLATE = """
+kazi hesabu_{i}(a: nambari, b: nambari) -> nambari {{
+    jumla = a * {i} + b / 2.5  # maoni ya {i}
+    lingana jumla {{
+        0 => "sifuri"
+        _ => jumla |> mshono
+    }}
+    rudisha jumla
+}}
+chapisha(hesabu_{i}({i}, 3.14))
+"""
+
+def generate_source(size_bytes: int) -> str:
+    """Generate a synthetic SPL program of roughly the requested size"""
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        chunk = FUNCTION_TEMPLATE.format(i=i)
+        parts.append(chunk)
+        total += len(chunk)
+        i += 1
+    return "".join(parts)
+
+def measure(engine: str, source: str, repeat: int) -> float:
+    """Return best-of-N throughput in MB/s for one lexer engine"""
+    megabytes = len(source.encode('utf-8')) / (1024 * 1024)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        SPLexer(source, engine=engine).tokenize()
+        best = min(best, time.perf_counter() - start)
+    return megabytes / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=float, default=2.0, help="Source size in MB (default: 2)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (default: 3)")
+    args = parser.parse_args()
+
+    source = generate_source(int(args.size * 1024 * 1024))
+    tokens = len(SPLexer(source).tokenize())
+    print(f"Source: {len(source) / (1024 * 1024):.2f} MB, {tokens} tokens")
+
+    results = {engine: measure(engine, source, args.repeat) for engine in ('char', 'regex')}
+    for engine, throughput in results.items():
+        print(f"  {engine:<6} {throughput:8.2f} MB/s")
+    print(f"  speedup {results['regex'] / results['char']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+SPL Match Benchmark - lingana with 10, 100 and 1000 literal arms
+
+Each engine dispatches through a decision tree, so time per match should
+stay flat as arms grow; the linear column tries the arms in order the way
+matching did before, for reference.
+"""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.decision import decision_tree
+from src.interpreter import Interpreter
+from src.jit import JIT
+from src.lexer import Lexer
+from src.parser import Parser
+from src.vm import VirtualMachine
+
+def match_program(arms: int, matches: int) -> str:
+    """A kazi matching over arms literal cases, applied to values spread
+    evenly across them"""
+    cases = "\n".join(f"        {arm} => {arm * 2}" for arm in range(arms))
+    values = " ".join(str(index * 7919 % arms) for index in range(matches))
+    return (
+        "kazi tafuta(x) {\n"
+        "    lingana x {\n"
+        f"{cases}\n"
+        "        _ => 0\n"
+        "    }\n"
+        "}\n"
+        f"chapisha jumlisha(panga(tafuta, panga(kamili, gawa(\"{values}\"))))\n"
+    )
+
+def best_of(repeat: int, make_engine, ast) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        engine = make_engine()
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            engine.interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def linear_dispatch(cases, value):
+    for index, case in enumerate(cases):
+        if not hasattr(case.pattern, 'value') or case.pattern.value == value:
+            return index
+    return None
+
+def dispatch_times(ast, matches: int):
+    """Seconds per dispatch: decision tree vs arms in order"""
+    cases = ast[0].body[0].cases
+    tree = decision_tree(cases)
+    values = list(range(len(cases) - 1)) * max(1, matches // len(cases))
+    start = time.perf_counter()
+    for value in values:
+        tree.dispatch(value)
+    tree_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for value in values:
+        linear_dispatch(cases, value)
+    return tree_time / len(values), (time.perf_counter() - start) / len(values)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arms", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Arm counts to run (default: 10 100 1000)")
+    parser.add_argument("--matches", type=int, default=3000, help="Matches per run (default: 3000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (default: 3)")
+    args = parser.parse_args()
+
+    engines = {
+        "tree": Interpreter,
+        "vm": VirtualMachine,
+        "jit": lambda: Interpreter(jit=JIT(1)),
+    }
+    for arms in args.arms:
+        ast = Parser(Lexer(match_program(arms, args.matches)).tokenize()).parse()
+        line = f"  {arms:>5} arms"
+        for name, make_engine in engines.items():
+            seconds = best_of(args.repeat, make_engine, ast)
+            line += f"  {name} {seconds * 1000:7.1f} ms"
+        tree, linear = dispatch_times(ast, args.matches)
+        line += f"  | dispatch {tree * 1e9:6.0f} ns  linear {linear * 1e9:8.0f} ns"
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+SPL Memoization Benchmark - plain calls vs LRU caches on kazi proven pure
+"""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_vm import fibonacci_program
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.memo import Memoizer
+from src.parser import Parser
+
+def best_of(repeat: int, ast, size=None):
+    best = float('inf')
+    memo = None
+    for _ in range(repeat):
+        memo = Memoizer(size, auto=True) if size is not None else None
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            Interpreter(memo=memo).interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best, memo
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fib", type=int, default=22, help="Fibonacci argument (default: 22)")
+    parser.add_argument("--size", type=int, default=256, help="Cache entries per kazi (default: 256)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (default: 3)")
+    args = parser.parse_args()
+
+    ast = Parser(Lexer(fibonacci_program(args.fib)).tokenize()).parse()
+    plain, _ = best_of(args.repeat, ast)
+    cached, memo = best_of(args.repeat, ast, args.size)
+    name = f"fibonacci({args.fib})"
+    print(f"  {name:<20} plain {plain * 1000:8.1f} ms  memo {cached * 1000:8.1f} ms"
+          f"  ({plain / cached:.0f}x)")
+    print(memo.report())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+SPL Parallel Parsing Benchmark - serial parse vs process pool at several -j
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_parser import wide_program
+from src.parallel_parser import parse_parallel, parse_serial
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=20000, help="Functions in the program (default: 20000)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[2, 4, 8], help="Worker counts (default: 2 4 8)")
+    args = parser.parse_args()
+
+    source = wide_program(args.functions)
+    print(f"{len(source) / 1e6:.1f} MB source, {os.cpu_count()} CPUs")
+
+    started = time.perf_counter()
+    parse_serial(source)
+    serial = time.perf_counter() - started
+    print(f"  serial      {serial * 1000:9.1f} ms")
+
+    for jobs in args.jobs:
+        started = time.perf_counter()
+        _, timings = parse_parallel(source, jobs)
+        elapsed = time.perf_counter() - started
+        print(f"  -j {jobs:<8} {elapsed * 1000:9.1f} ms  ({serial / elapsed:.2f}x)  {timings.format()}")
+
+if __name__ == '__main__':
+    main()
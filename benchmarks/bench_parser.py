@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+SPL Parser Benchmark - parse throughput on deep and wide synthetic programs
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.lexer import SPLexer
+from src.parser import Parser
+
+def wide_program(functions: int) -> str:
+    """Many small functions with short mixed-precedence expressions"""
+    return "".join(
+        f"kazi f{i}(a: int, b: int) -> int {{\n"
+        f"    x = a * {i} + b / 2 - (a + b) * 3\n"
+        f"    kama x > {i} {{ rudisha x }} vinginevyo {{ rudisha f{i}(x - 1, b) }}\n"
+        f"}}\n"
+        for i in range(functions)
+    )
+
+def long_chain(operators: int) -> str:
+    """A single left-associative chain: 1 + 2 - 3 + 4 ..."""
+    terms = [str(i % 97) for i in range(operators + 1)]
+    ops = ['+', '-', '*', '+'] * (operators // 4 + 1)
+    return "x = " + " ".join(f"{term} {op}" for term, op in zip(terms, ops)) + " 1\n"
+
+def nested_parens(depth: int, repeat: int) -> str:
+    """Deeply parenthesized expressions: (((1 + 1) * 2) - 3) ..."""
+    expr = "1"
+    for i in range(depth):
+        expr = f"({expr} {'+-*'[i % 3]} {i % 7})"
+    return "".join(f"y{i} = {expr}\n" for i in range(repeat))
+
+def measure(name: str, source: str, repeat: int):
+    tokens = SPLexer(source).tokenize()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Parser(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {name:<16} {len(tokens):>9} tokens {best * 1000:9.1f} ms "
+          f"{len(tokens) / best / 1e6:6.2f} Mtok/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1, help="Workload multiplier (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per workload (default: 3)")
+    args = parser.parse_args()
+
+    print(f"Recursion limit: {sys.getrecursionlimit()}")
+    measure("wide", wide_program(5000 * args.scale), args.repeat)
+    measure("long chain", long_chain(100000 * args.scale), args.repeat)
+    measure("nested parens", nested_parens(150, 200 * args.scale), args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SPL Process Backend Benchmark - CPU-bound anzisha blocks on threads vs processes
+
+Each task computes fib(N) in SPL. On threads the GIL serializes them; on
+the process backend they should scale with workers up to the CPU count.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_specialize import int_fibonacci_program
+from src.concurrency import spawn
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.processes import ProcessPool, spawn_process
+
+def parse(source: str):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def threads(interpreter: Interpreter, block, tasks: int) -> float:
+    start = time.perf_counter()
+    for task in [spawn(interpreter.interpret, block) for _ in range(tasks)]:
+        task.join()
+    return time.perf_counter() - start
+
+def processes(interpreter: Interpreter, block, tasks: int, pool: ProcessPool) -> float:
+    start = time.perf_counter()
+    for task in [spawn_process(block, interpreter.global_env, pool) for _ in range(tasks)]:
+        task.join()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fib", type=int, default=20, help="Fibonacci argument per task (default: 20)")
+    parser.add_argument("--tasks", type=int, default=8, help="Tasks per run (default: 8)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help="Process counts to try (default: 1 2 4 and the CPU count)")
+    args = parser.parse_args()
+
+    source = int_fibonacci_program(args.fib)
+    definitions = [node for node in parse(source) if node.type == 'FunctionDef']
+    block = parse(f"fib({args.fib})\n")
+    interpreter = Interpreter()
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret(definitions)
+
+    print(f"  {args.tasks} x fib({args.fib}), {os.cpu_count()} CPUs")
+    baseline = threads(interpreter, block, args.tasks)
+    print(f"  {'threads':<12} {baseline * 1000:8.1f} ms")
+    for workers in args.workers:
+        pool = ProcessPool(workers)
+        # Workers are started up front; warm them before timing
+        processes(interpreter, block, workers, pool)
+        seconds = processes(interpreter, block, args.tasks, pool)
+        pool.shutdown()
+        print(f"  {f'processes {workers}':<12} {seconds * 1000:8.1f} ms  ({baseline / seconds:4.2f}x threads)")
+
+if __name__ == '__main__':
+    main()
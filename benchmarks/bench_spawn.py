@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+SPL Spawn Benchmark - work-stealing pool vs a new thread per task
+
+Latency is the time from spawn() to the task starting; throughput spawns
+and joins many trivial tasks, flat from one thread and as a binary tree of
+nested spawns.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.concurrency import default_worker_count, set_default_workers, spawn
+
+def latency(samples: int) -> float:
+    """Median seconds from spawn to the task starting"""
+    delays = []
+    for _ in range(samples):
+        spawned = time.perf_counter()
+        task = spawn(lambda: time.perf_counter() - spawned)
+        task.join()
+        delays.append(task.result.value)
+    return statistics.median(delays)
+
+def flat(tasks: int) -> float:
+    start = time.perf_counter()
+    for task in [spawn(lambda: None) for _ in range(tasks)]:
+        task.join()
+    return time.perf_counter() - start
+
+def nested(depth: int) -> float:
+    def tree(level: int) -> None:
+        if level:
+            children = [spawn(tree, level - 1), spawn(tree, level - 1)]
+            for child in children:
+                child.join()
+
+    start = time.perf_counter()
+    spawn(tree, depth).join()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks for the flat run (default: 10000)")
+    parser.add_argument("--depth", type=int, default=10, help="Depth of the nested run (default: 10)")
+    parser.add_argument("--samples", type=int, default=500, help="Latency samples (default: 500)")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="Pool size (default: SPL_WORKERS or CPU count + 4)")
+    args = parser.parse_args()
+
+    nested_tasks = 2 ** (args.depth + 1) - 1
+    for name, workers in ((f"pool ({args.workers})", args.workers), ("thread per task", 0)):
+        set_default_workers(workers)
+        lat = latency(args.samples)
+        flat_seconds = flat(args.tasks)
+        nested_seconds = nested(args.depth)
+        print(f"  {name:<16} latency {lat * 1e6:7.1f} us"
+              f"  flat {args.tasks / flat_seconds:9.0f} tasks/s"
+              f"  nested {nested_tasks / nested_seconds:9.0f} tasks/s")
+
+if __name__ == '__main__':
+    main()
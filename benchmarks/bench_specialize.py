@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+SPL Specialization Benchmark - generic paths vs types proven by KihakikiAina
+
+Runs an int-annotated fibonacci and the nambari one from bench_vm with
+and without specialization, on the tree engine and with the JIT.
+"""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_vm import fibonacci_program
+from src.interpreter import Interpreter
+from src.jit import JIT
+from src.lexer import Lexer
+from src.parser import Parser
+
+def int_fibonacci_program(n: int) -> str:
+    return (
+        "kazi fib(n: int) -> int {\n"
+        "    kama n < 2 {\n"
+        "        rudisha n\n"
+        "    }\n"
+        "    rudisha fib(n - 1) + fib(n - 2)\n"
+        "}\n"
+        f"chapisha fib({n})\n"
+    )
+
+def best_of(repeat: int, ast, specialize: bool, jit: bool) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        interpreter = Interpreter(jit=JIT() if jit else None, specialize=specialize)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            interpreter.interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fib", type=int, default=22, help="Fibonacci argument (default: 22)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (default: 3)")
+    args = parser.parse_args()
+
+    programs = {
+        "fib (int)": int_fibonacci_program(args.fib),
+        "fibonacci (nambari)": fibonacci_program(args.fib),
+    }
+    for name, source in programs.items():
+        ast = Parser(Lexer(source).tokenize()).parse()
+        line = f"  {name:<20}"
+        for tier, jit in (("tree", False), ("jit", True)):
+            generic = best_of(args.repeat, ast, False, jit)
+            specialized = best_of(args.repeat, ast, True, jit)
+            line += (f"  {tier} {generic * 1000:7.1f} -> {specialized * 1000:7.1f} ms"
+                     f" ({(1 - specialized / generic) * 100:4.1f}% less)")
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+SPL Precompiled Benchmark - cold parse vs warm __splcache__ load
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_parser import wide_program
+from src import splc
+from src.ast_nodes import to_dict
+
+def best_of(repeat: int, fn):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=5000, help="Functions in the program (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "program.spl"
+        source.write_text(wide_program(args.functions))
+
+        cold, ast = best_of(args.repeat, lambda: splc.load_file(source, use_cache=False))
+        splc.load_file(source)
+        warm, cached = best_of(args.repeat, lambda: splc.load_file(source))
+        assert to_dict(cached) == to_dict(ast), "cached program differs from parse"
+
+        size = splc.cache_path(source).stat().st_size
+        print(f"source {source.stat().st_size / 1024:.0f} KiB, cache {size / 1024:.0f} KiB")
+        print(f"  cold (lex + parse)  {cold * 1000:8.1f} ms")
+        print(f"  warm (__splcache__) {warm * 1000:8.1f} ms  ({cold / warm:.1f}x)")
+
+if __name__ == '__main__':
+    main()
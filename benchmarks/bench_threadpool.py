@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+SPL ThreadPool Benchmark - bounded queue overflow policies under a fast producer
+
+One producer submits short sleeping tasks faster than the workers drain
+them. Each policy is reported with throughput, the deepest the queue got,
+how many tasks it turned away or ran on the producer, and wait/run times.
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.concurrency import OVERFLOW_POLICIES, PoolFullError, Task, ThreadPool, join_all
+
+def run(policy: str, tasks: int, work: float, workers: int, max_queue: int) -> None:
+    pool = ThreadPool(max_workers=workers, max_queue=max_queue, overflow=policy)
+    deepest = 0
+    sampling = True
+
+    def sample() -> None:
+        nonlocal deepest
+        while sampling:
+            deepest = max(deepest, pool.metrics()['queue_depth'])
+            time.sleep(0.001)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    accepted = []
+    start = time.perf_counter()
+    for _ in range(tasks):
+        task = Task(time.sleep, (work,))
+        try:
+            pool.submit(task)
+        except PoolFullError:
+            continue
+        accepted.append(task)
+    join_all(accepted)
+    seconds = time.perf_counter() - start
+    sampling = False
+    pool.shutdown()
+    metrics = pool.metrics()
+    wait, ran = metrics['wait_time'], metrics['run_time']
+    label = policy if max_queue else 'unbounded'
+    print(f"  {label:<12} {len(accepted) / seconds:8.0f} tasks/s  deepest queue {deepest:5d}"
+          f"  rejected {metrics['rejected']:5d}  caller ran {metrics['caller_runs']:5d}"
+          f"  wait p50/p99 {wait['p50'] * 1000:6.2f}/{wait['p99'] * 1000:6.2f} ms"
+          f"  run p50 {ran['p50'] * 1000:6.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000, help="Tasks submitted (default: 5000)")
+    parser.add_argument("--work", type=float, default=0.001, help="Seconds each task sleeps (default: 0.001)")
+    parser.add_argument("--workers", type=int, default=8, help="Maximum workers (default: 8)")
+    parser.add_argument("--max-queue", type=int, default=64, help="Queue bound (default: 64)")
+    args = parser.parse_args()
+
+    for policy in OVERFLOW_POLICIES:
+        run(policy, args.tasks, args.work, args.workers, args.max_queue)
+    # No bound, as the pool was before
+    run('block', args.tasks, args.work, args.workers, 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+SPL Token Memory Benchmark - Token objects vs CompactTokens (bytes per token)
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.lexer import SPLexer
+from benchmarks.bench_lexer import generate_source
+
+def measure(build, source: str):
+    """Return (result, bytes allocated and still held) for one representation"""
+    gc.collect()
+    tracemalloc.start()
+    result = build(source)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=float, default=1.0, help="Source size in MB (default: 1)")
+    args = parser.parse_args()
+
+    source = generate_source(int(args.size * 1024 * 1024))
+
+    tokens, list_bytes = measure(lambda src: SPLexer(src).tokenize(), source)
+    count = len(tokens)
+    del tokens
+    compact, compact_bytes = measure(lambda src: SPLexer(src).tokenize_compact(), source)
+
+    print(f"Source: {len(source) / (1024 * 1024):.2f} MB, {count} tokens")
+    print(f"  List[Token]    {list_bytes / count:8.1f} bytes/token")
+    print(f"  CompactTokens  {compact_bytes / count:8.1f} bytes/token "
+          f"(arrays: {compact.nbytes() / count:.1f})")
+    print(f"  reduction      {list_bytes / compact_bytes:8.1f}x")
+
+if __name__ == '__main__':
+    main()
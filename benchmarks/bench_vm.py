@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SPL VM Benchmark - tree-walking Interpreter vs bytecode VirtualMachine
+"""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.vm import VirtualMachine
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+def fibonacci_program(n: int) -> str:
+    """examples/fil.spl plus a call"""
+    return (EXAMPLES / "fil.spl").read_text() + f"\nchapisha fibonacci({n})\n"
+
+def loop_program(iterations: int, depth: int) -> str:
+    """SPL has no loop statement: panga drives the outer loop, a counting
+    kazi the inner one, with straight-line arithmetic in the body"""
+    return (
+        "kazi hesabu(i: int, jumla: int) -> int {\n"
+        "    kama i == 0 { rudisha jumla }\n"
+        "    x = i * 3 + jumla - 2\n"
+        "    y = x - i * 2 + 1\n"
+        "    rudisha hesabu(i - 1, jumla + y - x + i)\n"
+        "}\n"
+        f"kazi mzunguko(_) {{ hesabu({depth}, 0) }}\n"
+        f"chapisha jumlisha(panga(mzunguko, gawa(\"{' '.join('x' * iterations)}\")))\n"
+    )
+
+def best_of(repeat: int, engine, ast) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            engine().interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fib", type=int, default=20, help="Fibonacci argument (default: 20)")
+    parser.add_argument("--iterations", type=int, default=1200, help="Outer loop iterations (default: 1200)")
+    parser.add_argument("--depth", type=int, default=25, help="Inner loop iterations (default: 25)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (default: 3)")
+    args = parser.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * args.depth + 1000))
+
+    programs = {
+        f"fibonacci({args.fib})": fibonacci_program(args.fib),
+        f"loop {args.iterations}x{args.depth}": loop_program(args.iterations, args.depth),
+    }
+    for name, source in programs.items():
+        ast = Parser(Lexer(source).tokenize()).parse()
+        tree = best_of(args.repeat, Interpreter, ast)
+        vm = best_of(args.repeat, VirtualMachine, ast)
+        print(f"  {name:<20} tree {tree * 1000:8.1f} ms  vm {vm * 1000:8.1f} ms  ({tree / vm:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+SPL AST - Slotted node classes, packed locations and the shared visitor
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Source locations are packed into one int: start line in the high bits,
+# then 16 bits each for start column, end-line delta and end column.
+LOC_FIELD_BITS = 16
+LOC_FIELD_MASK = (1 << LOC_FIELD_BITS) - 1
+
+def pack_loc(start_line: int, start_col: int, end_line: int, end_col: int) -> int:
+    return (
+        (start_line << 48)
+        | (min(start_col, LOC_FIELD_MASK) << 32)
+        | (min(max(end_line - start_line, 0), LOC_FIELD_MASK) << 16)
+        | min(end_col, LOC_FIELD_MASK)
+    )
+
+def unpack_loc(loc: int) -> Dict[str, int]:
+    start_line = loc >> 48
+    return {
+        'start_line': start_line,
+        'start_col': (loc >> 32) & LOC_FIELD_MASK,
+        'end_line': start_line + ((loc >> 16) & LOC_FIELD_MASK),
+        'end_col': loc & LOC_FIELD_MASK,
+    }
+
+class Node:
+    """Base AST node; ``type`` is the class name, ``loc`` a packed location"""
+    __slots__ = ('loc',)
+    fields: Tuple[str, ...] = ()
+    type = 'Node'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.type = cls.__name__
+
+    @property
+    def location(self) -> Optional[Dict[str, int]]:
+        return unpack_loc(self.loc) if self.loc else None
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields)
+        return f"{self.type}({args})"
+
+# Expressions
+
+class Number(Node):
+    __slots__ = ('value',)
+    fields = ('value',)
+
+    def __init__(self, value: Any, loc: int = 0):
+        self.value = value
+        self.loc = loc
+
+class String(Node):
+    __slots__ = ('value',)
+    fields = ('value',)
+
+    def __init__(self, value: str, loc: int = 0):
+        self.value = value
+        self.loc = loc
+
+class Var(Node):
+    __slots__ = ('name',)
+    fields = ('name',)
+
+    def __init__(self, name: str, loc: int = 0):
+        self.name = name
+        self.loc = loc
+
+class BinaryOp(Node):
+    __slots__ = ('operator', 'left', 'right')
+    fields = ('operator', 'left', 'right')
+
+    def __init__(self, operator: str, left: Node, right: Node, loc: int = 0):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.loc = loc
+
+class Assignment(Node):
+    __slots__ = ('name', 'value', 'var_type')
+    fields = ('name', 'value', 'var_type')
+
+    def __init__(self, name: str, value: Node, var_type: Optional[str] = None, loc: int = 0):
+        self.name = name
+        self.value = value
+        self.var_type = var_type
+        self.loc = loc
+
+class FunctionCall(Node):
+    __slots__ = ('function', 'args')
+    fields = ('function', 'args')
+
+    def __init__(self, function: Node, args: List[Node], loc: int = 0):
+        self.function = function
+        self.args = args
+        self.loc = loc
+
+# Statements
+
+class Param(Node):
+    __slots__ = ('name', 'annotation')
+    fields = ('name', 'annotation')
+
+    def __init__(self, name: str, annotation: Optional[str] = None, loc: int = 0):
+        self.name = name
+        self.annotation = annotation
+        self.loc = loc
+
+class FunctionDef(Node):
+    """Function definition; the body may be parsed lazily on first access"""
+    __slots__ = ('name', 'params', 'return_type', '_body', 'lazy_body')
+    fields = ('name', 'params', 'return_type', 'body')
+
+    def __init__(self, name: str, params: List[Param], return_type: Optional[str],
+                 body: List[Node], loc: int = 0, lazy_body: Any = None):
+        self.name = name
+        self.params = params
+        self.return_type = return_type
+        self._body = body
+        self.lazy_body = lazy_body
+        self.loc = loc
+
+    @property
+    def body(self) -> List[Node]:
+        lazy_body = self.lazy_body
+        if lazy_body is not None:
+            self._body = lazy_body.parse()
+            self.lazy_body = None
+        return self._body
+
+    @body.setter
+    def body(self, value: List[Node]) -> None:
+        self._body = value
+        self.lazy_body = None
+
+    @property
+    def parsed(self) -> bool:
+        """Whether the body exists as nodes (checking does not force a parse)"""
+        return self.lazy_body is None
+
+class Print(Node):
+    __slots__ = ('value',)
+    fields = ('value',)
+
+    def __init__(self, value: Node, loc: int = 0):
+        self.value = value
+        self.loc = loc
+
+class Return(Node):
+    __slots__ = ('value',)
+    fields = ('value',)
+
+    def __init__(self, value: Optional[Node], loc: int = 0):
+        self.value = value
+        self.loc = loc
+
+class If(Node):
+    __slots__ = ('condition', 'then', 'orelse')
+    fields = ('condition', 'then', 'orelse')
+
+    def __init__(self, condition: Node, then: List[Node], orelse: List[Node], loc: int = 0):
+        self.condition = condition
+        self.then = then
+        self.orelse = orelse
+        self.loc = loc
+
+class Spawn(Node):
+    """anzisha block; backend is 'thread', 'process' or None for the default"""
+    __slots__ = ('body', 'backend')
+    fields = ('body', 'backend')
+
+    def __init__(self, body: List[Node], backend: Optional[str] = None, loc: int = 0):
+        self.body = body
+        self.backend = backend
+        self.loc = loc
+
+# Pattern matching
+
+class Literal(Node):
+    __slots__ = ('value',)
+    fields = ('value',)
+
+    def __init__(self, value: Any, loc: int = 0):
+        self.value = value
+        self.loc = loc
+
+class Wildcard(Node):
+    __slots__ = ()
+
+    def __init__(self, loc: int = 0):
+        self.loc = loc
+
+class Binding(Node):
+    __slots__ = ('name',)
+    fields = ('name',)
+
+    def __init__(self, name: str, loc: int = 0):
+        self.name = name
+        self.loc = loc
+
+class TypedPattern(Node):
+    __slots__ = ('name', 'annotation')
+    fields = ('name', 'annotation')
+
+    def __init__(self, name: str, annotation: str, loc: int = 0):
+        self.name = name
+        self.annotation = annotation
+        self.loc = loc
+
+class MatchCase(Node):
+    __slots__ = ('pattern', 'body')
+    fields = ('pattern', 'body')
+
+    def __init__(self, pattern: Node, body: List[Node], loc: int = 0):
+        self.pattern = pattern
+        self.body = body
+        self.loc = loc
+
+class PatternMatch(Node):
+    __slots__ = ('expression', 'cases')
+    fields = ('expression', 'cases')
+
+    def __init__(self, expression: Node, cases: List[MatchCase], loc: int = 0):
+        self.expression = expression
+        self.cases = cases
+        self.loc = loc
+
+NODE_CLASSES: Dict[str, type] = {cls.__name__: cls for cls in Node.__subclasses__()}
+
+class NodeVisitor:
+    """Shared visitor base: dispatches on the node class through a per-class cache.
+
+    Subclasses pick the method prefix (``visit_``, ``tembelea_``, ...) and
+    handle only the nodes they care about; ``generic_visit`` visits the
+    children of the rest.
+    """
+    visit_prefix = 'visit_'
+    _dispatch: Dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    def visit(self, node: Node) -> Any:
+        try:
+            method = self._dispatch[node.__class__]
+        except KeyError:
+            method = self._resolve(node.__class__)
+        return method(self, node)
+
+    @classmethod
+    def _resolve(cls, node_class: type) -> Callable:
+        method = getattr(cls, cls.visit_prefix + node_class.__name__, None)
+        if method is None:
+            method = cls.generic_visit
+        cls._dispatch[node_class] = method
+        return method
+
+    def generic_visit(self, node: Node) -> Any:
+        for name in node.fields:
+            value = getattr(node, name, None)
+            if isinstance(value, Node):
+                self.visit(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Node):
+                        self.visit(item)
+
+# Fields holding statement lists, as opposed to expression lists like args
+BLOCK_FIELDS = frozenset(('body', 'then', 'orelse'))
+
+class NodeTransformer(NodeVisitor):
+    """Visitor that rebuilds the tree from the values its visits return.
+
+    Inside lists a visit may return a node, None to drop the item, or a list
+    to splice in its place. Statement lists go through visit_block so passes
+    can treat them differently from expression lists.
+    """
+    def generic_visit(self, node: Node) -> Node:
+        for name in node.fields:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                new = self.visit(value)
+                if new is not value:
+                    setattr(node, name, new)
+            elif isinstance(value, list):
+                if name in BLOCK_FIELDS:
+                    setattr(node, name, self.visit_block(value))
+                else:
+                    setattr(node, name, self.visit_list(value))
+        return node
+
+    def visit_list(self, items: List[Any]) -> List[Any]:
+        result = []
+        for item in items:
+            if not isinstance(item, Node):
+                result.append(item)
+                continue
+            new = self.visit(item)
+            if isinstance(new, list):
+                result.extend(new)
+            elif new is not None:
+                result.append(new)
+        return result
+
+    def visit_block(self, statements: List[Node]) -> List[Node]:
+        return self.visit_list(statements)
+
+# Dict adapter for code that still produces or consumes the old dict AST
+
+# Field names that differ between the node classes and the dict format
+DICT_KEYS = {
+    ('Param', 'annotation'): 'type',
+    ('If', 'orelse'): 'else',
+}
+# Records that were plain dicts without a 'type' key
+UNTYPED_RECORDS = {'Param', 'MatchCase'}
+
+def to_dict(node: Any) -> Any:
+    """Convert nodes (or lists of nodes) to the legacy dict AST"""
+    if isinstance(node, list):
+        return [to_dict(item) for item in node]
+    if not isinstance(node, Node):
+        return node
+
+    result = {} if node.type in UNTYPED_RECORDS else {'type': node.type}
+    for name in node.fields:
+        result[DICT_KEYS.get((node.type, name), name)] = to_dict(getattr(node, name))
+    if node.loc:
+        result['loc'] = unpack_loc(node.loc)
+    return result
+
+def from_dict(data: Any, record: Optional[str] = None) -> Any:
+    """Convert a legacy dict AST (or list of them) to nodes"""
+    if isinstance(data, list):
+        return [from_dict(item, record) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    type_name = record or data.get('type')
+    if type_name not in NODE_CLASSES:
+        raise ValueError(f"Unknown AST node type: {type_name}")
+    cls = NODE_CLASSES[type_name]
+
+    kwargs = {}
+    for name in cls.fields:
+        value = data.get(DICT_KEYS.get((type_name, name), name))
+        if name == 'params':
+            value = from_dict(value or [], 'Param')
+        elif name == 'cases':
+            value = from_dict(value or [], 'MatchCase')
+        elif name in ('body', 'then', 'orelse', 'args'):
+            value = from_dict(value or [])
+        else:
+            value = from_dict(value)
+        kwargs[name] = value
+
+    loc = data.get('loc')
+    if loc:
+        kwargs['loc'] = pack_loc(
+            loc.get('start_line', 0), loc.get('start_col', 0),
+            loc.get('end_line', loc.get('start_line', 0)), loc.get('end_col', 0)
+        )
+    return cls(**kwargs)
+
+def ensure_nodes(ast: List[Any]) -> List[Node]:
+    """Accept either node lists or legacy dict ASTs at public entry points"""
+    if ast and isinstance(ast[0], dict):
+        return from_dict(ast)
+    return ast
+
+def iter_nodes(node: Any):
+    """Yield a node and all nodes below it, depth first"""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(item))
+        elif isinstance(item, Node):
+            yield item
+            for name in reversed(item.fields):
+                value = getattr(item, name)
+                if isinstance(value, (Node, list)):
+                    stack.append(value)
@@ -4,8 +4,16 @@ import sys
 import traceback
 from pathlib import Path
 from termcolor import cprint
-from .interpreter import execute_file, start_repl
+from .interpreter import execute_file, format_inline_caches, start_repl
 from .compiler import Compiler
+from .splc import SUFFIX as SPLC_SUFFIX, compile_file
+from .optimizer import OPTIMIZATION_LEVELS, format_report
+from .jit import DEFAULT_THRESHOLD, JIT
+from .memo import DEFAULT_CACHE_SIZE, Memoizer
+from .concurrency import WORKERS_ENV, set_default_workers
+from .processes import (
+    BACKEND_ENV, BACKENDS, PROCESSES_ENV, default_backend, set_default_backend
+)
 from .version import __version__
 
 LOGO_FILE_PATH = Path(__file__).parent.parent / "docs" / "logo.txt"
@@ -20,13 +28,13 @@ def print_banner():
     
     cprint(f"\nSwahili Programming Language v{__version__}\n", "yellow")
 
-def validate_file(file_path):
+def validate_file(file_path, suffixes=(".spl",)):
     """Validate SPL file existence and extension"""
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"File '{file_path}' not found")
-    if path.suffix != ".spl":
-        raise ValueError(f"Invalid extension '{path.suffix}', expected .spl")
+    if path.suffix not in suffixes:
+        raise ValueError(f"Invalid extension '{path.suffix}', expected {' or '.join(suffixes)}")
     return path.resolve()
 
 def parse_arguments():
@@ -44,12 +52,12 @@ def parse_arguments():
     parser.add_argument(
         "file", 
         nargs="?", 
-        help="SPL source file (required for run/compile)"
+        help="SPL source file (required for run/compile; run also accepts .splc)"
     )
     
     parser.add_argument(
         "--target", 
-        choices=["python", "llvm", "wasm"],
+        choices=["python", "llvm", "wasm", "splc"],
         default="python",
         help="Compilation target (default: python)"
     )
@@ -64,6 +72,118 @@ def parse_arguments():
         action="store_true",
         help="Enable restricted execution"
     )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Parse with N worker processes, 0 for one per CPU (run/compile)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help=f"Threads in the pool anzisha runs on, 0 for a thread per task "
+             f"(default: ${WORKERS_ENV} or CPU count + 4)"
+    )
+
+    parser.add_argument(
+        "--spawn-backend",
+        choices=BACKENDS,
+        help=f"Where plain anzisha blocks run: pool threads, worker processes for "
+             f"CPU-bound blocks, or coroutines on one event loop for I/O-bound ones "
+             f"(async needs --engine vm; default: ${BACKEND_ENV} or thread)"
+    )
+
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help=f"Worker processes for the process backend (default: ${PROCESSES_ENV} or CPU count)"
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=["tree", "vm"],
+        default="tree",
+        help="Execution engine: tree walker or bytecode VM (for run command, default: tree)"
+    )
+
+    parser.add_argument(
+        "--jit",
+        type=int,
+        nargs="?",
+        const=DEFAULT_THRESHOLD,
+        metavar="CALLS",
+        help=f"Promote kazi called CALLS times to generated Python, 0 on the first call (tree engine, default: {DEFAULT_THRESHOLD})"
+    )
+
+    parser.add_argument(
+        "--jit-report",
+        action="store_true",
+        help="Report promoted kazi and time spent in each tier (implies --jit)"
+    )
+
+    parser.add_argument(
+        "--memo",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CACHE_SIZE,
+        metavar="SIZE",
+        help=f"Cache results of kazi proven pure, SIZE per kazi, 0 for unbounded (tree engine, default: {DEFAULT_CACHE_SIZE})"
+    )
+
+    parser.add_argument(
+        "--memo-report",
+        action="store_true",
+        help="Report cache hits and misses per kazi (implies --memo)"
+    )
+
+    parser.add_argument(
+        "--specialize",
+        action="store_true",
+        help="Type-check first and specialize on proven types (tree engine and python target)"
+    )
+
+    parser.add_argument(
+        "--ic-report",
+        action="store_true",
+        help="Report inline cache hit rates per call site (tree engine)"
+    )
+
+    parser.add_argument(
+        "-O",
+        dest="optimize",
+        type=int,
+        choices=OPTIMIZATION_LEVELS,
+        default=1,
+        help="AST optimization level: 0 none, 1 safe passes, 2 also drops unused expressions (default: 1)"
+    )
+
+    parser.add_argument(
+        "--opt-report",
+        action="store_true",
+        help="Report how many nodes each optimizer pass removed (fresh parses only)"
+    )
+
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Report per-phase parse timings"
+    )
+
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Parse kazi bodies on first call (for run command)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write __splcache__ (for run command)"
+    )
     
     parser.add_argument(
         "-v", "--version",
@@ -73,6 +193,18 @@ def parse_arguments():
     
     return parser.parse_args()
 
+def report_timings(timings):
+    """Print parallel parse phase timings to stderr"""
+    cprint(timings.format(), "cyan", file=sys.stderr)
+
+def report_optimizer(report):
+    """Print nodes removed per optimizer pass to stderr"""
+    cprint(format_report(report), "cyan", file=sys.stderr)
+
+def report_inline_caches(stats):
+    """Print call site inline cache hit rates to stderr"""
+    cprint(format_inline_caches(stats), "cyan", file=sys.stderr)
+
 def handle_compile(args):
     """Handle compilation process"""
     if not args.file or not args.target:
@@ -81,9 +213,22 @@ def handle_compile(args):
     source_path = validate_file(args.file)
     output_path = Path(args.output) if args.output else source_path.with_suffix(f".{args.target}")
     
+    if args.target == "splc":
+        # Precompiled programs are binary and bypass the code generators
+        compile_file(source_path, output_path, optimize=args.optimize, jobs=args.jobs,
+                     on_timings=report_timings if args.timings else None,
+                     on_report=report_optimizer if args.opt_report else None)
+        cprint(f"\n✅ Successfully compiled to: {output_path}", "green")
+        return
+
     try:
-        compiler = Compiler(source_path.read_text())
+        compiler = Compiler(source_path.read_text(), jobs=args.jobs, optimize=args.optimize,
+                            specialize=args.specialize)
         output = compiler.compile(target=args.target)
+        if args.timings and compiler.parse_timings:
+            report_timings(compiler.parse_timings)
+        if args.opt_report:
+            report_optimizer(compiler.optimization_report)
         output_path.write_text(output)
         cprint(f"\n✅ Successfully compiled to: {output_path}", "green")
         
@@ -97,7 +242,41 @@ def main():
         if args.command == "run":
             if not args.file:
                 raise ValueError("Missing SPL file for execution")
-            execute_file(validate_file(args.file), sandbox=args.sandbox)
+            if args.workers is not None:
+                set_default_workers(args.workers)
+            if args.spawn_backend == 'async' and args.engine != 'vm':
+                raise ValueError("--spawn-backend async requires --engine vm")
+            if args.spawn_backend is not None or args.processes is not None:
+                set_default_backend(args.spawn_backend or default_backend(), args.processes)
+            jit = None
+            if args.jit is not None or args.jit_report:
+                threshold = DEFAULT_THRESHOLD if args.jit is None else args.jit
+                jit = JIT(threshold, timing=args.jit_report)
+            memo = None
+            if args.memo is not None or args.memo_report:
+                size = DEFAULT_CACHE_SIZE if args.memo is None else args.memo
+                memo = Memoizer(size or None, auto=True)
+            try:
+                execute_file(
+                    validate_file(args.file, (".spl", SPLC_SUFFIX)),
+                    sandbox=args.sandbox,
+                    use_cache=not args.no_cache,
+                    lazy=args.lazy,
+                    jobs=args.jobs,
+                    on_timings=report_timings if args.timings else None,
+                    optimize=args.optimize,
+                    on_report=report_optimizer if args.opt_report else None,
+                    engine=args.engine,
+                    jit=jit,
+                    memo=memo,
+                    specialize=args.specialize,
+                    on_inline_caches=report_inline_caches if args.ic_report else None
+                )
+            finally:
+                if jit is not None and args.jit_report:
+                    cprint(jit.report(), "cyan", file=sys.stderr)
+                if memo is not None and args.memo_report:
+                    cprint(memo.report(), "cyan", file=sys.stderr)
             
         elif args.command == "repl":
             print_banner()
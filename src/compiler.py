@@ -5,23 +5,50 @@ SPL Compiler - Optimized Version
 from pathlib import Path
 import llvmlite.ir as llir
 import llvmlite.binding as llvm
-from typing import Dict, Any, Optional
+from typing import Any, List, Optional
 from src.lexer import Lexer
 from src.parser import Parser
+from src.parallel_parser import parse_parallel
+from src.optimizer import optimize_ast
+from src.decision import decision_tree
+from src.specialize import Specialization
+from src.ast_nodes import (
+    Node, Number, String, Var, BinaryOp, FunctionCall, FunctionDef,
+    PatternMatch, Literal, Wildcard, Binding, TypedPattern, Return
+)
+
+# SPL type names as Python annotations; anything else becomes Any
+PYTHON_TYPES = {
+    'nambari': 'float', 'neno': 'str', 'orodha': 'list', 'kamusi': 'dict',
+    'int': 'int', 'float': 'float', 'str': 'str', 'any': 'Any',
+}
 
 class Compiler:
     """Compiles SPL code to various targets with enhanced error handling"""
     
-    def __init__(self, source: str):
+    def __init__(self, source: str, jobs: int = 1, optimize: int = 1, specialize: bool = False):
         self.source = source
+        self.jobs = jobs
+        self.optimize = optimize
+        # Types KihakikiAina proves, filled in by compile() when specializing
+        self.specialization = Specialization() if specialize else None
         self.ast: Optional[list] = None
+        self.parse_timings = None
+        self.optimization_report = {}
+        # Module-level definitions the transpiled code refers to
+        self._constants: List[str] = []
+        self._matches = 0
         self._llvm_initialized = False
         self._init_llvm()
 
     def _init_llvm(self) -> None:
         """Initialize LLVM infrastructure once"""
         if not self._llvm_initialized:
-            llvm.initialize()
+            try:
+                llvm.initialize()
+            except RuntimeError:
+                # llvmlite >= 0.45 initializes itself and rejects the call
+                pass
             llvm.initialize_native_target()
             llvm.initialize_native_asmprinter()
             self._llvm_initialized = True
@@ -36,77 +63,146 @@ class Compiler:
         if len(self.ast) == 0:
             raise ValueError("Empty AST: No nodes to compile")
 
-    def _transpile_node(self, node: Dict[str, Any], indent: int = 0) -> str:
-        """Recursive Python code generation with enhanced node support"""
+    def _transpile_node(self, node: Node, indent: int = 0, tail: bool = False) -> str:
+        """Recursive Python code generation with enhanced node support;
+        a lingana in tail position returns the value of its arm"""
         space = " " * indent
         
         # Function definition
-        if node["type"] == "FunctionDef":
+        if isinstance(node, FunctionDef):
             params = ", ".join(
-                f"{p['name']}: {p.get('type', 'Any')}"
-                for p in node["params"]
+                f"{p.name}: {self._annotation(p.annotation)}"
+                for p in node.params
             )
-            code = f"{space}def {node['name']}({params}) -> {node.get('return_type', 'None')}:\n"
+            code = f"{space}def {node.name}({params}) -> {self._return_type(node)}:\n"
+            # The last statement's value is the kazi's result
             code += "".join(
-                self._transpile_node(stmt, indent + 4)
-                for stmt in node["body"]
+                self._transpile_statement(stmt, indent + 4, i == len(node.body) - 1)
+                for i, stmt in enumerate(node.body)
             )
-            return code
+            return code if node.body else f"{code}{space}    pass\n"
+
+        if isinstance(node, Return):
+            if node.value is None:
+                return f"{space}return None\n"
+            return f"{space}return {self._transpile_node(node.value)}\n"
             
-        # Pattern matching
-        if node["type"] == "PatternMatch":
-            expr = self._transpile_node(node["expression"])
-            code = f"{space}match {expr}:\n"
-            for case in node["cases"]:
-                pattern = "_" if case["pattern"] == "_" else self._transpile_node(case["pattern"])
-                code += f"{space}    case {pattern}:\n"
-                code += "".join(
-                    self._transpile_node(stmt, indent + 8)
-                    for stmt in case["body"]
-                )
+        # Pattern matching: the decision tree picks the case index
+        if isinstance(node, PatternMatch):
+            subject = f"_lingana{self._matches}"
+            index = f"_kesi{self._matches}"
+            self._matches += 1
+            tree = decision_tree(node.cases)
+            code = f"{space}{subject} = {self._transpile_node(node.expression)}\n"
+            code += "".join(f"{space}{line}\n" for line in tree.source(subject, index, self._constant))
+            code += f"{space}if {index} is None:\n{space}    raise ValueError('Hakuna mfano ulinganifu')\n"
+            branches = tree.split_indices()
+            if branches is not None:
+                code += self._transpile_cases(node, branches, subject, index, indent, tail)
             return code
+
+        # Patterns
+        if isinstance(node, Wildcard):
+            return "_"
+        if isinstance(node, Literal):
+            return repr(node.value)
+        if isinstance(node, Binding):
+            return node.name
             
         # Binary operations
-        if node["type"] == "BinaryOp":
-            left = self._transpile_node(node["left"])
-            right = self._transpile_node(node["right"])
-            return f"({left} {node['operator']} {right})"
+        if isinstance(node, BinaryOp):
+            left = self._transpile_node(node.left)
+            right = self._transpile_node(node.right)
+            return f"({left} {node.operator} {right})"
             
         # Function calls
-        if node["type"] == "FunctionCall":
-            args = ", ".join(self._transpile_node(arg) for arg in node["args"])
-            return f"{node['function']['name']}({args})"
+        if isinstance(node, FunctionCall):
+            args = ", ".join(self._transpile_node(arg) for arg in node.args)
+            return f"{self._transpile_node(node.function)}({args})"
             
         # Variables and literals
-        if node["type"] in ("Number", "String", "Var"):
-            return str(node["value"])
+        if isinstance(node, Number):
+            return str(node.value)
+        if isinstance(node, String):
+            return repr(node.value)
+        if isinstance(node, Var):
+            return node.name
+
+        raise NotImplementedError(f"Unsupported node type: {node.type}")
 
-        raise NotImplementedError(f"Unsupported node type: {node['type']}")
+    def _return_type(self, node: FunctionDef) -> str:
+        """Declared return type, else the one proven when specializing"""
+        if node.return_type:
+            return self._annotation(node.return_type)
+        if self.specialization is not None:
+            return self._annotation(self.specialization.return_type(node))
+        return 'Any'
 
-    def _generate_llvm_ir(self, node: Dict[str, Any]) -> None:
+    def _annotation(self, type_name: Optional[str]) -> str:
+        """Python annotation for an SPL type name"""
+        return PYTHON_TYPES.get((type_name or '').lower(), 'Any')
+
+    def _transpile_statement(self, node: Node, indent: int, tail: bool = False) -> str:
+        """A statement as complete lines; in tail position an expression
+        is returned, otherwise it stands bare"""
+        code = self._transpile_node(node, indent, tail)
+        if code.endswith("\n"):
+            return code
+        return f"{' ' * indent}{'return ' if tail else ''}{code}\n"
+
+    def _transpile_cases(self, node: PatternMatch, branches: Any, subject: str,
+                         index: str, indent: int, tail: bool = False) -> str:
+        """Nested < tests on the case index down to each arm's body"""
+        space = " " * indent
+        if isinstance(branches, int):
+            case = node.cases[branches]
+            code = ""
+            if isinstance(case.pattern, (Binding, TypedPattern)):
+                code += f"{space}{case.pattern.name} = {subject}\n"
+            code += "".join(
+                self._transpile_statement(stmt, indent, tail and i == len(case.body) - 1)
+                for i, stmt in enumerate(case.body)
+            )
+            return code or f"{space}pass\n"
+        pivot, below, rest = branches
+        return (f"{space}if {index} < {pivot}:\n"
+                + self._transpile_cases(node, below, subject, index, indent + 4, tail)
+                + f"{space}else:\n"
+                + self._transpile_cases(node, rest, subject, index, indent + 4, tail))
+
+    def _constant(self, value: Any) -> str:
+        """Expression for a decision tree table or tuple of types"""
+        if isinstance(value, tuple):
+            return f"({', '.join(kind.__name__ for kind in value)},)"
+        name = f"_JEDWALI{len(self._constants)}"
+        self._constants.append(f"{name} = {value!r}\n")
+        return name
+
+    def _generate_llvm_ir(self, node: Node) -> None:
         """LLVM IR generation with basic block management"""
-        if node["type"] == "FunctionDef":
-            ret_type = self._llvm_type_map(node.get("return_type", "int"))
-            param_types = [self._llvm_type_map(p["type"]) for p in node["params"]]
+        if isinstance(node, FunctionDef):
+            inferred = self.specialization.return_type(node) if self.specialization else None
+            ret_type = self._llvm_type_map(node.return_type or inferred or "int")
+            param_types = [self._llvm_type_map(p.annotation) for p in node.params]
             
             func_type = llir.FunctionType(ret_type, param_types)
-            function = llir.Function(self.module, func_type, name=node["name"])
+            function = llir.Function(self.module, func_type, name=node.name)
             
             entry_block = function.append_basic_block("entry")
             self.builder = llir.IRBuilder(entry_block)
             
             # Process function body
-            for stmt in node["body"]:
+            for stmt in node.body:
                 self._generate_llvm_ir(stmt)
                 
             # Add implicit return for void functions
             if not self.builder.block.is_terminated:
                 self.builder.ret(llir.Constant(ret_type, 0))
 
-        elif node["type"] == "BinaryOp":
-            left = self._generate_llvm_ir(node["left"])
-            right = self._generate_llvm_ir(node["right"])
-            op = node["operator"]
+        elif isinstance(node, BinaryOp):
+            left = self._generate_llvm_ir(node.left)
+            right = self._generate_llvm_ir(node.right)
+            op = node.operator
             
             if op == '+':
                 return self.builder.add(left, right, "addtmp")
@@ -136,11 +232,17 @@ class Compiler:
         """Compile SPL source to specified target format"""
         try:
             # Parse source code
-            lexer = Lexer(self.source)
-            parser = Parser(lexer.tokenize())
-            self.ast = parser.parse()
+            if self.jobs != 1:
+                self.ast, self.parse_timings = parse_parallel(self.source, self.jobs)
+            else:
+                lexer = Lexer(self.source)
+                parser = Parser(lexer.tokenize())
+                self.ast = parser.parse()
+            self.ast = optimize_ast(self.ast, self.optimize, self.optimization_report)
             
             self._validate_ast()
+            if self.specialization is not None:
+                self.specialization.analyze(self.ast)
             
             # Dispatch to compilation target
             if target == "python":
@@ -159,10 +261,13 @@ class Compiler:
         """Generate Python code with proper formatting"""
         header = "# Generated Python code from SPL\n\n"
         header += "from typing import Any, Match\n\n"
-        return header + "\n".join(
+        body = "\n".join(
             self._transpile_node(node) 
             for node in self.ast
         )
+        if self._constants:
+            header += "".join(self._constants) + "\n"
+        return header + body
 
     def _generate_llvm(self) -> str:
         """Generate LLVM IR with module validation"""
@@ -177,9 +282,9 @@ class Compiler:
         """Generate WebAssembly text format (WAT)"""
         wat = "(module\n"
         for node in self.ast:
-            if node["type"] == "FunctionDef":
-                wat += f'  (func ${node["name"]}\n'
-                wat += f'    (export "{node["name"]}")\n'
+            if isinstance(node, FunctionDef):
+                wat += f'  (func ${node.name}\n'
+                wat += f'    (export "{node.name}")\n'
                 # Add parameters and body here
                 wat += "  )\n"
         wat += ")"
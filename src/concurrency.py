@@ -2,11 +2,16 @@
 """
 SPL Concurrency Module - Enhanced
 """
+import itertools
+import os
 import threading
 import traceback
-from typing import Any, Callable, List, Optional, Dict
-from queue import Queue
-from time import sleep
+from collections import deque
+from heapq import heappop, heappush
+from math import frexp
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict
+from queue import Empty, Queue
+from time import monotonic, sleep
 import logging
 
 # Configure logging
@@ -14,6 +19,9 @@ logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] [%(threadName)s] %(message)s')
 logger = logging.getLogger(__name__)
 
+# Environment variable sizing the default pool; 0 means a thread per task
+WORKERS_ENV = 'SPL_WORKERS'
+
 class TaskResult:
     """Standardized result container for concurrent tasks"""
     __slots__ = ('value', 'exception', 'traceback')
@@ -28,24 +36,43 @@ class TaskResult:
     def successful(self) -> bool:
         return self.exception is None
 
-class Task(threading.Thread):
-    """Enhanced concurrent task with resource tracking"""
+class Task:
+    """Enhanced concurrent task with resource tracking.
+
+    A task runs once, either on its own thread (start) or on a pool
+    worker (run); whichever claims it first runs it. Callbacks added with
+    add_done_callback run on the thread that finishes it.
+    """
+    _names = itertools.count(1)
+
     def __init__(self, 
                  target: Callable,
                  args: tuple = (),
                  kwargs: Optional[Dict] = None,
                  *,
                  name: Optional[str] = None):
-        super().__init__(name=name, daemon=True)
+        self.name = name or f"Task-{next(self._names)}"
         self.target = target
         self.args = args
         self.kwargs = kwargs or {}
         self.result = TaskResult()
         self.resources = set()  # Track acquired resources
+        # Pool the task was submitted to, if any
+        self.pool: Optional['WorkStealingPool'] = None
         self._stop_event = threading.Event()
+        self._claim = threading.Lock()
+        self._done = threading.Event()
+        self._callbacks: List[Callable[['Task'], Any]] = []
+
+    def start(self) -> None:
+        """Run the task on a new thread of its own"""
+        threading.Thread(target=self.run, name=self.name, daemon=True).start()
 
     def run(self) -> None:
         """Execute the target function with enhanced safety"""
+        if not self.claim():
+            # Already run, or running, elsewhere
+            return
         try:
             if self._stop_event.is_set():
                 return
@@ -62,9 +89,58 @@ class Task(threading.Thread):
             logger.error(f"Task {self.name} failed: {str(e)}")
             
         finally:
-            self.release_resources()
+            self._finish()
             logger.debug(f"Task {self.name} completed")
 
+    def claim(self) -> bool:
+        """Take the task to run it somewhere else, such as another process;
+        False if it already started"""
+        return self._claim.acquire(blocking=False)
+
+    def set_result(self, result: TaskResult) -> None:
+        """Finish a task claimed with claim()"""
+        self.result = result
+        self._finish()
+
+    def _finish(self) -> None:
+        self.release_resources()
+        with _callback_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                logger.exception(f"Callback of task {self.name} failed")
+
+    def add_done_callback(self, callback: Callable[['Task'], Any]) -> None:
+        """Call callback(task) once the task finishes, now if it has"""
+        with _callback_lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def remove_done_callback(self, callback: Callable[['Task'], Any]) -> None:
+        with _callback_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the task to finish"""
+        if self.pool is not None and self.pool.in_worker():
+            # A worker waiting on a task still queued behind it would block
+            # the pool; it runs the task itself instead
+            self.run()
+        self._done.wait(timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def is_alive(self) -> bool:
+        """Started and not yet finished, as for a thread"""
+        return self._claim.locked() and not self._done.is_set()
+
     def stop(self) -> None:
         """Request graceful termination"""
         self._stop_event.set()
@@ -81,50 +157,379 @@ class Task(threading.Thread):
         """Release all tracked resources"""
         self.resources.clear()
 
+# Guards every task's callback list; held only to add, remove or swap one
+_callback_lock = threading.Lock()
+
+def default_worker_count() -> int:
+    """Workers for the default pool: SPL_WORKERS if set, else sized from the
+    CPU count with headroom for tasks blocked on I/O"""
+    configured = os.environ.get(WORKERS_ENV)
+    if configured:
+        try:
+            return max(int(configured), 0)
+        except ValueError:
+            logger.warning(f"Ignoring {WORKERS_ENV}={configured!r}: not a number")
+    return min(32, (os.cpu_count() or 1) + 4)
+
+class WorkStealingPool:
+    """Fixed set of worker threads, each with its own deque of tasks.
+
+    A task submitted from a worker goes on that worker's deque, which the
+    worker pops from the same end, so nested spawns run where they were
+    made, newest first. Tasks from other threads go on a shared injection
+    deque. An idle worker takes from the injection deque, then steals the
+    oldest task from another worker's deque. Workers start on first use.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.size = max(workers if workers is not None else default_worker_count(), 1)
+        self.deques = [deque() for _ in range(self.size)]
+        self.injected = deque()
+        self.workers: List[threading.Thread] = []
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._idle = 0
+        self._running = True
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, 'pool', None) is self
+
+    def submit(self, task: Task) -> None:
+        """Queue a task; it runs on some worker"""
+        if not self._running:
+            raise RuntimeError("Pool imesimamishwa")
+        task.pool = self
+        if self.in_worker():
+            self.deques[self._local.index].append(task)
+        else:
+            if not self.workers:
+                self._start()
+            self.injected.append(task)
+        with self._wakeup:
+            if self._idle:
+                self._wakeup.notify()
+
+    def _start(self) -> None:
+        with self._wakeup:
+            if self.workers:
+                return
+            for index in range(self.size):
+                worker = threading.Thread(
+                    name=f"Worker-{index}",
+                    target=self._worker_loop,
+                    args=(index,),
+                    daemon=True
+                )
+                worker.start()
+                self.workers.append(worker)
+
+    def _next(self, index: int) -> Optional[Task]:
+        try:
+            return self.deques[index].pop()
+        except IndexError:
+            pass
+        try:
+            return self.injected.popleft()
+        except IndexError:
+            pass
+        for offset in range(1, self.size):
+            try:
+                return self.deques[(index + offset) % self.size].popleft()
+            except IndexError:
+                pass
+        return None
+
+    def _pending(self) -> bool:
+        return bool(self.injected) or any(self.deques)
+
+    def _worker_loop(self, index: int) -> None:
+        """Run tasks until the pool shuts down"""
+        self._local.pool = self
+        self._local.index = index
+        while True:
+            task = self._next(index)
+            if task is not None:
+                task.run()
+                continue
+            with self._wakeup:
+                # Checked under the lock submit notifies with, so a task
+                # queued meanwhile is never missed
+                self._idle += 1
+                while self._running and not self._pending():
+                    self._wakeup.wait()
+                self._idle -= 1
+                if not self._running and not self._pending():
+                    return
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once the queued tasks have run"""
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify_all()
+        if wait:
+            for worker in self.workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+_default_pool: Optional[WorkStealingPool] = None
+_default_workers: Optional[int] = None
+_default_lock = threading.Lock()
+
+def set_default_workers(workers: Optional[int]) -> None:
+    """Size the default pool spawn uses: None for default_worker_count(),
+    0 for a new thread per task. Takes effect for pools not yet created."""
+    global _default_pool, _default_workers
+    with _default_lock:
+        if _default_pool is not None:
+            _default_pool.shutdown(wait=False)
+            _default_pool = None
+        _default_workers = workers
+
+def default_pool() -> Optional[WorkStealingPool]:
+    """Process-wide pool spawn uses, None when tasks get threads of their own"""
+    global _default_pool
+    pool = _default_pool
+    if pool is not None:
+        return pool
+    with _default_lock:
+        if _default_pool is None:
+            workers = _default_workers if _default_workers is not None else default_worker_count()
+            if workers == 0:
+                return None
+            _default_pool = WorkStealingPool(workers)
+        return _default_pool
+
+class PoolFullError(RuntimeError):
+    """A bounded ThreadPool queue is full and its policy is 'reject'"""
+
+# What submit does when a bounded ThreadPool queue is full
+OVERFLOW_POLICIES = ('block', 'reject', 'caller_runs')
+
+class Histogram:
+    """Durations counted in power-of-two buckets from 1 us up to ~8 s"""
+    BUCKETS = 24
+    UNIT = 1e-6
+
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        # frexp's exponent is the bucket whose upper bound is 2**e units
+        index = frexp(seconds / self.UNIT)[1] if seconds > self.UNIT else 0
+        self.counts[min(index, self.BUCKETS)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding that fraction of samples"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.UNIT * 2 ** index, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
 class ThreadPool:
-    """Managed pool of worker threads"""
-    def __init__(self, max_workers: int = 4):
-        self.max_workers = max_workers
-        self.task_queue = Queue()
+    """Managed pool of worker threads that grows and shrinks with its queue.
+
+    Between min_workers and max_workers threads run; a new one starts
+    when tasks are queued and no worker is idle, and workers above the
+    minimum exit after idle_timeout seconds without work. With max_queue
+    set, the queue is bounded and overflow decides what submit does when
+    it is full: wait for room ('block'), raise PoolFullError ('reject'),
+    or run the task on the submitting thread ('caller_runs').
+
+    Queued tasks run highest priority first, then earliest deadline, then
+    in submission order. A task still queued at its deadline is not run
+    and finishes with TimeoutError.
+    """
+    def __init__(self, max_workers: int = 4, min_workers: int = 0,
+                 max_queue: int = 0, overflow: str = 'block',
+                 idle_timeout: float = 1.0):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.max_workers = max(max_workers, 1)
+        self.min_workers = min(max(min_workers, 0), self.max_workers)
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.idle_timeout = idle_timeout
+        # (-priority, deadline, sequence, task, queued at)
+        self.queue: List[tuple] = []
         self.workers: List[threading.Thread] = []
-        self._running = False
+        self._sequence = itertools.count()
+        self._names = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._room = threading.Condition(self._lock)
+        self._idle = 0
+        self._active = 0
+        self._running = True
+        self.counters = dict.fromkeys(
+            ('submitted', 'completed', 'rejected', 'expired', 'caller_runs', 'cancelled'), 0)
+        self.wait_time = Histogram()
+        self.run_time = Histogram()
 
     def start(self) -> None:
-        """Start the worker threads"""
-        self._running = True
-        for i in range(self.max_workers):
-            worker = threading.Thread(
-                name=f"Worker-{i}",
-                target=self._worker_loop,
-                daemon=True
-            )
-            worker.start()
-            self.workers.append(worker)
+        """Start the minimum number of workers; submit starts the rest"""
+        with self._lock:
+            while len(self.workers) < self.min_workers:
+                self._add_worker()
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, 'pool', None) is self
+
+    def submit(self, task: Task, priority: int = 0, deadline: Optional[float] = None,
+               timeout: Optional[float] = None) -> None:
+        """
+        Queue a task
+        
+        Args:
+            task: Task to run
+            priority: Higher runs first
+            deadline: Seconds from now by which the task must have started
+            timeout: Longest wait for room under the 'block' policy
+        
+        Raises:
+            PoolFullError: The queue is full ('reject', or 'block' timed out)
+        """
+        now = monotonic()
+        due = float('inf') if deadline is None else now + deadline
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Pool imesimamishwa")
+            self.counters['submitted'] += 1
+            if self.max_queue and len(self.queue) >= self.max_queue:
+                if self.overflow == 'reject':
+                    self.counters['rejected'] += 1
+                    raise PoolFullError("Pool imejaa")
+                # A worker blocked on its own pool could wait forever
+                if self.overflow == 'caller_runs' or self.in_worker():
+                    self.counters['caller_runs'] += 1
+                    run_here = True
+                else:
+                    run_here = False
+                    if not self._room.wait_for(
+                            lambda: len(self.queue) < self.max_queue or not self._running, timeout):
+                        self.counters['rejected'] += 1
+                        raise PoolFullError("Pool imejaa")
+                    if not self._running:
+                        raise RuntimeError("Pool imesimamishwa")
+            else:
+                run_here = False
+            if not run_here:
+                task.pool = self
+                heappush(self.queue, (-priority, due, next(self._sequence), task, now))
+                if self._idle:
+                    self._work.notify()
+                if len(self.queue) > self._idle and len(self.workers) < self.max_workers:
+                    self._add_worker()
+                return
+        # Outside the lock: the caller's own thread is the backpressure
+        task.run()
+
+    def _add_worker(self) -> None:
+        worker = threading.Thread(
+            name=f"Worker-{next(self._names)}",
+            target=self._worker_loop,
+            daemon=True
+        )
+        self.workers.append(worker)
+        worker.start()
 
     def _worker_loop(self) -> None:
-        """Process tasks from the queue"""
-        while self._running:
-            task = self.task_queue.get()
-            if task is None:
-                break
-            task.run()
-            self.task_queue.task_done()
+        """Run queued tasks; exit when idle above the minimum, or at shutdown"""
+        self._local.pool = self
+        me = threading.current_thread()
+        lock = self._lock
+        while True:
+            with lock:
+                while not self.queue and self._running:
+                    self._idle += 1
+                    surplus = len(self.workers) > self.min_workers
+                    notified = self._work.wait(self.idle_timeout if surplus else None)
+                    self._idle -= 1
+                    if not notified and not self.queue and len(self.workers) > self.min_workers:
+                        self.workers.remove(me)
+                        return
+                if not self.queue:
+                    self.workers.remove(me)
+                    return
+                _, due, _, task, queued_at = heappop(self.queue)
+                self._room.notify()
+                self._active += 1
+            started = monotonic()
+            expired = started > due
+            if expired:
+                if task.claim():
+                    task.set_result(TaskResult(exception=TimeoutError("Kazi imepita muda wake")))
+            else:
+                task.run()
+            finished = monotonic()
+            with lock:
+                self._active -= 1
+                self.wait_time.record(started - queued_at)
+                if expired:
+                    self.counters['expired'] += 1
+                else:
+                    self.counters['completed'] += 1
+                    self.run_time.record(finished - started)
 
-    def submit(self, task: Task) -> None:
-        """Add a task to the queue"""
-        self.task_queue.put(task)
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, worker counts, task counters and histogram summaries"""
+        with self._lock:
+            return {
+                'queue_depth': len(self.queue),
+                'workers': len(self.workers),
+                'active_workers': self._active,
+                'idle_workers': self._idle,
+                **self.counters,
+                'wait_time': self.wait_time.snapshot(),
+                'run_time': self.run_time.snapshot(),
+            }
 
-    def shutdown(self, wait: bool = True) -> None:
-        """Stop the pool gracefully"""
-        self._running = False
-        for _ in range(self.max_workers):
-            self.task_queue.put(None)
-            
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """Stop the pool once queued tasks have run, or fail them with
+        cancel_pending; blocked submitters get RuntimeError"""
+        with self._lock:
+            self._running = False
+            if cancel_pending:
+                pending = [entry[3] for entry in self.queue]
+                self.queue.clear()
+                self.counters['cancelled'] += len(pending)
+            else:
+                pending = []
+            self._work.notify_all()
+            self._room.notify_all()
+            workers = list(self.workers)
+        for task in pending:
+            if task.claim():
+                task.set_result(TaskResult(exception=RuntimeError("Pool imesimamishwa")))
         if wait:
-            self.task_queue.join()
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
 
 def spawn(target: Callable, *args, 
-          pool: Optional[ThreadPool] = None,
+          pool: Optional[Any] = None,
           **kwargs) -> Task:
     """
     Spawn a new concurrent task with enhanced options
@@ -132,7 +537,8 @@ def spawn(target: Callable, *args,
     Args:
         target: Callable to execute
         args: Positional arguments
-        pool: Optional thread pool (default: new thread)
+        pool: Optional pool (default: default_pool(), or a new thread
+            when that is disabled)
         kwargs: Keyword arguments
         
     Returns:
@@ -140,6 +546,8 @@ def spawn(target: Callable, *args,
     """
     task = Task(target=target, args=args, kwargs=kwargs)
     
+    if pool is None:
+        pool = default_pool()
     if pool:
         pool.submit(task)
     else:
@@ -155,23 +563,68 @@ def join_all(tasks: List[Task],
     
     Args:
         tasks: List of Task objects
-        timeout: Maximum wait time in seconds
+        timeout: Maximum wait in seconds for the whole batch
         cancel_unfinished: Stop tasks that don't complete
         
     Returns:
         List of TaskResult objects
     """
+    deadline = None if timeout is None else monotonic() + timeout
     results = []
     for task in tasks:
-        task.join(timeout)
+        task.join(None if deadline is None else max(deadline - monotonic(), 0))
         
-        if task.is_alive() and cancel_unfinished:
+        if not task.done() and cancel_unfinished:
             task.stop()
             
         results.append(task.result)
         
     return results
 
+def _run_queued(tasks: List[Task]) -> None:
+    """From a pool worker, run one of tasks still queued, as join does,
+    so waiting on them cannot stall the pool"""
+    for task in tasks:
+        if task.pool is not None and task.pool.in_worker() and not task._claim.locked():
+            task.run()
+            return
+
+def as_completed(tasks: Iterable[Task], timeout: Optional[float] = None) -> Iterator[Task]:
+    """
+    Yield tasks as they finish, with one deadline for the whole batch
+    
+    Raises:
+        TimeoutError: timeout seconds passed with tasks still unfinished
+    """
+    tasks = list(tasks)
+    deadline = None if timeout is None else monotonic() + timeout
+    finished: Queue = Queue()
+    for task in tasks:
+        task.add_done_callback(finished.put)
+    try:
+        for remaining in range(len(tasks), 0, -1):
+            if finished.empty():
+                _run_queued(tasks)
+            try:
+                task = finished.get(timeout=None if deadline is None
+                                    else max(deadline - monotonic(), 0))
+            except Empty:
+                raise TimeoutError(f"{remaining} of {len(tasks)} tasks unfinished") from None
+            yield task
+    finally:
+        for task in tasks:
+            task.remove_done_callback(finished.put)
+
+def wait_any(tasks: Iterable[Task], timeout: Optional[float] = None) -> Optional[Task]:
+    """The first of tasks to finish, None if none does within timeout"""
+    completed = as_completed(tasks, timeout)
+    try:
+        return next(completed, None)
+    except TimeoutError:
+        return None
+    finally:
+        completed.close()
+
 class DeadlockDetector(threading.Thread):
     """Basic deadlock detection system (prototype)"""
     def __init__(self, interval: float = 5.0):
@@ -262,10 +715,11 @@ if __name__ == '__main__':
             print(f"Traceback:\n{result.traceback}")
 
     # Test thread pool
-    pool = ThreadPool(max_workers=2)
+    pool = ThreadPool(max_workers=2, max_queue=2, overflow='caller_runs')
     pool.start()
     
     for i in range(4):
-        pool.submit(Task(successful_task, (i,), name=f"PoolTask-{i}"))
+        pool.submit(Task(successful_task, (i * 0.1,), name=f"PoolTask-{i}"), priority=i)
         
-    pool.shutdown(wait=True)
\ No newline at end of file
+    pool.shutdown(wait=True)
+    print(pool.metrics())
\ No newline at end of file
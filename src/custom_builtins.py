@@ -9,7 +9,9 @@ import requests
 import readline
 import math
 import json
-from typing import Any, Iterable, Callable, List, Dict
+from typing import Any, Iterable, Iterator, Callable, List, Dict, Optional, Tuple
+
+from .concurrency import Task, as_completed, join_all, wait_any
 
 # Constants
 KWELI = True
@@ -77,6 +79,11 @@ def fungua(jina: str, hali: str = "r") -> Any:
     """Fungua - Open file"""
     return open(jina, hali)
 
+def soma_faili(jina: str) -> str:
+    """Soma Faili - Read a text file"""
+    with open(jina) as faili:
+        return faili.read()
+
 def andika(jina: str, yaliyomo: str) -> None:
     """Andika - Write to file"""
     with open(jina, "w") as faili:
@@ -107,6 +114,54 @@ def punguza(kitendo: Callable, iterable: Iterable, thamani_awali: Any = None) ->
     from functools import reduce
     return reduce(kitendo, iterable, thamani_awali) if thamani_awali else reduce(kitendo, iterable)
 
+# Tasks (the values of `t = anzisha { ... }`)
+def kazi_na_muda(hoja: tuple) -> Tuple[List[Task], Optional[float]]:
+    """Tasks passed one by one or as one list, then an optional timeout"""
+    muda = HAKUNA
+    if hoja and isinstance(hoja[-1], (int, float)) and not isinstance(hoja[-1], bool):
+        hoja, muda = hoja[:-1], hoja[-1]
+    if len(hoja) == 1 and isinstance(hoja[0], (list, tuple)):
+        hoja = tuple(hoja[0])
+    for kitu in hoja:
+        if not isinstance(kitu, Task):
+            raise TypeError(f"Si kazi iliyoanzishwa: {kitu!r}")
+    return list(hoja), muda
+
+def subiri(kazi: Task, muda: Optional[float] = HAKUNA) -> Any:
+    """Subiri - Wait for a task and return its value"""
+    kazi.join(muda)
+    return kazi.result.value
+
+def subiri_zote(*hoja: Any) -> List[Any]:
+    """Subiri Zote - Values of all tasks, one timeout for the batch"""
+    kazi, muda = kazi_na_muda(hoja)
+    return [matokeo.value for matokeo in join_all(kazi, muda)]
+
+def subiri_yoyote(*hoja: Any) -> Optional[Task]:
+    """Subiri Yoyote - The first task to finish"""
+    kazi, muda = kazi_na_muda(hoja)
+    return wait_any(kazi, muda)
+
+def zinapokamilika(*hoja: Any) -> Iterator[Any]:
+    """Zinapokamilika - Values of tasks as each finishes, for panga.
+
+    As with subiri_zote, a task unfinished at the timeout gives hakuna,
+    so there is still one value per task.
+    """
+    kazi, muda = kazi_na_muda(hoja)
+    zimekamilika = 0
+    try:
+        for iliyokamilika in as_completed(kazi, muda):
+            zimekamilika += 1
+            yield iliyokamilika.result.value
+    except TimeoutError:
+        for _ in range(len(kazi) - zimekamilika):
+            yield HAKUNA
+
+def ikikamilika(kazi: Task, kitendo: Callable) -> None:
+    """Ikikamilika - Call kitendo with the task's value once it finishes"""
+    kazi.add_done_callback(lambda iliyokamilika: kitendo(iliyokamilika.result.value))
+
 # Type Conversion
 def kamili(thamani: Any) -> int:
     """Kamili - Convert to integer"""
@@ -191,6 +246,7 @@ CUSTOM_BUILTINS = {
     
     # Files
     'fungua': fungua,
+    'soma_faili': soma_faili,
     'andika': andika,
     
     # Network
@@ -200,6 +256,13 @@ CUSTOM_BUILTINS = {
     'panga': panga,
     'chuja': chuja,
     'punguza': punguza,
+
+    # Tasks
+    'subiri': subiri,
+    'subiri_zote': subiri_zote,
+    'subiri_yoyote': subiri_yoyote,
+    'zinapokamilika': zinapokamilika,
+    'ikikamilika': ikikamilika,
     
     # Type Conversion
     'kamili': kamili,
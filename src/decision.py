@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+SPL Decision Trees - lingana cases compiled once into dispatch structures
+
+Cases are grouped into runs: consecutive literal cases become one hash
+table, consecutive typed cases one type switch, and a binding or
+wildcard ends the match as the default. dispatch() walks the few steps
+and returns the index of the first case that matches, exactly as trying
+the cases in order would, but in time independent of the number of arms.
+
+The Interpreter and the VM call dispatch() at run time; the JIT and the
+Python transpiler emit source() instead, with the tables hoisted out as
+constants, and pick the arm with split_indices().
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .ast_nodes import MatchCase, Literal, Wildcard, Binding, TypedPattern
+from .type_checker import TypeChecker
+
+TYPE_CHECKER = TypeChecker()
+TYPE_MAP = TYPE_CHECKER.type_map
+
+def python_types(annotation: str) -> Optional[tuple]:
+    """Types a TypedPattern accepts, None if the type is unknown (never matches).
+
+    A generic like orodha[int] switches on its container, as the type
+    switch caches by runtime type and cannot look at the elements.
+    """
+    name, bracket, _ = annotation.partition('[')
+    if bracket and TYPE_CHECKER.guard(annotation) is not None:
+        annotation = name
+    py_type = TYPE_MAP.get(annotation.lower())
+    if not py_type:
+        return None
+    return py_type if isinstance(py_type, tuple) else (py_type,)
+
+class LiteralTable:
+    """Literal cases: value -> first case index.
+
+    A dict lookup compares with == after hashing, as `literal == value`
+    does, and 1, 1.0 and kweli hash alike just as they compare equal.
+    """
+    __slots__ = ('table',)
+
+    def __init__(self):
+        self.table: Dict[Any, int] = {}
+
+    def match(self, value: Any) -> Optional[int]:
+        try:
+            return self.table.get(value)
+        except TypeError:
+            # Unhashable values (orodha, kamusi) equal no literal
+            return None
+
+class TypeSwitch:
+    """Typed cases, tried in order once per runtime type and then cached"""
+    __slots__ = ('arms', 'by_type')
+
+    def __init__(self):
+        self.arms: List[Tuple[int, tuple]] = []
+        self.by_type: Dict[type, Optional[int]] = {}
+
+    def match(self, value: Any) -> Optional[int]:
+        kind = type(value)
+        try:
+            return self.by_type[kind]
+        except KeyError:
+            pass
+        found = None
+        for index, types in self.arms:
+            if isinstance(value, types):
+                found = index
+                break
+        self.by_type[kind] = found
+        return found
+
+class Default:
+    """A binding or wildcard: matches anything"""
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def match(self, value: Any) -> int:
+        return self.index
+
+Step = Union[LiteralTable, TypeSwitch, Default]
+
+# split_indices() result: a case index, or (pivot, below, from pivot on)
+IndexTree = Union[int, Tuple[int, 'IndexTree', 'IndexTree']]
+
+class DecisionTree:
+    """Dispatch steps for the cases of one lingana"""
+    __slots__ = ('steps', 'reachable', 'dispatch')
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        # Case indices some step can return, in order
+        indices = set()
+        for step in steps:
+            if isinstance(step, LiteralTable):
+                indices.update(step.table.values())
+            elif isinstance(step, TypeSwitch):
+                indices.update(index for index, _ in step.arms)
+            else:
+                indices.add(step.index)
+        self.reachable = sorted(indices)
+        self.dispatch: Callable[[Any], Optional[int]] = (
+            steps[0].match if len(steps) == 1 else self.walk
+        )
+        if len(steps) == 2 and isinstance(steps[0], LiteralTable) and isinstance(steps[1], Default):
+            # Literals then a default, as in most recursive kazi: one lookup
+            table, default = steps[0].table, steps[1].index
+
+            def lookup(value: Any) -> int:
+                try:
+                    return table.get(value, default)
+                except TypeError:
+                    return default
+            self.dispatch = lookup
+
+    def walk(self, value: Any) -> Optional[int]:
+        for step in self.steps:
+            index = step.match(value)
+            if index is not None:
+                return index
+        return None
+
+    def source(self, subject: str, result: str, constant: Callable[[Any], str]) -> List[str]:
+        """Python lines setting result to the case index for subject, or None.
+
+        constant(value) returns an expression for a table or a tuple of
+        types, hoisted out of the lines.
+        """
+        lines = [f"{result} = None"]
+        for position, step in enumerate(self.steps):
+            guard = "" if position == 0 else f"if {result} is None: "
+            if isinstance(step, LiteralTable):
+                lines.append(f"{guard}{result} = {constant(step.table)}.get({subject}) "
+                             f"if type({subject}).__hash__ is not None else None")
+            elif isinstance(step, TypeSwitch):
+                chain = " else ".join(
+                    f"{index} if isinstance({subject}, {constant(types)})"
+                    for index, types in step.arms
+                )
+                lines.append(f"{guard}{result} = {chain} else None")
+            else:
+                lines.append(f"{guard}{result} = {step.index}")
+        return lines
+
+    def split_indices(self) -> Optional[IndexTree]:
+        """Reachable case indices as a balanced tree of < comparisons, so
+        generated code reaches any arm in O(log arms) tests"""
+        def split(indices: List[int]) -> IndexTree:
+            if len(indices) == 1:
+                return indices[0]
+            middle = len(indices) // 2
+            return (indices[middle], split(indices[:middle]), split(indices[middle:]))
+        return split(self.reachable) if self.reachable else None
+
+def decision_tree(cases: List[MatchCase]) -> DecisionTree:
+    """Build the dispatch steps for cases, keeping first-match order"""
+    steps: List[Step] = []
+    for index, case in enumerate(cases):
+        pattern = case.pattern
+        last = steps[-1] if steps else None
+        if isinstance(pattern, Literal):
+            if not isinstance(last, LiteralTable):
+                last = LiteralTable()
+                steps.append(last)
+            # An earlier equal literal already wins
+            last.table.setdefault(pattern.value, index)
+        elif isinstance(pattern, TypedPattern):
+            types = python_types(pattern.annotation)
+            if types is None:
+                continue
+            if not isinstance(last, TypeSwitch):
+                last = TypeSwitch()
+                steps.append(last)
+            last.arms.append((index, types))
+        elif isinstance(pattern, (Wildcard, Binding)):
+            steps.append(Default(index))
+            # Nothing after a default can match
+            break
+        else:
+            raise ValueError(f"Unsupported pattern: {pattern.type}")
+    if not steps:
+        steps.append(LiteralTable())
+    return DecisionTree(steps)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+SPL Event Loop Backend - anzisha blocks as coroutines on one asyncio loop
+
+I/O-bound blocks waste a thread each while they wait. On the async
+backend the VM runs the program and every anzisha block as coroutines
+on a single asyncio loop instead, so tens of thousands of waiting tasks
+cost one thread between them.
+
+The builtins the loop installs are the usual blocking ones, each with
+the coroutine function to await instead in its spl_async attribute.
+Only the VM's CALL looks at it: it yields a Suspend, which the loop
+awaits while other tasks run. Anything else that calls the builtin, such
+as panga, kumbuka or a block on a thread, gets the blocking function and
+its result.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, List, Optional, Set
+
+from . import custom_builtins
+from .concurrency import Task, TaskResult
+
+# Requests in flight at once per loop, below the usual limit of 1024
+# open descriptors
+MAX_CONNECTIONS = 256
+
+class Suspend:
+    """Yielded by the VM to wait on the loop instead of blocking"""
+    __slots__ = ('start', 'fallback', 'args')
+
+    def __init__(self, start: Callable, fallback: Callable, args: tuple):
+        self.start = start  # Coroutine function to await on the loop
+        self.fallback = fallback  # Blocking equivalent
+        self.args = args
+
+def complete(steps: Generator) -> Any:
+    """Run VM steps to the end, blocking wherever they suspend"""
+    try:
+        request = steps.send(None)
+        while True:
+            try:
+                value = request.fallback(*request.args)
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+def awaitable(blocking: Callable, coroutine: Callable) -> Callable:
+    """blocking as a builtin of its own, carrying coroutine as spl_async"""
+    @functools.wraps(blocking)
+    def builtin(*args: Any, **kwargs: Any) -> Any:
+        return blocking(*args, **kwargs)
+    builtin.spl_async = coroutine
+    return builtin
+
+class EventLoop:
+    """One asyncio loop for a program and every task it spawns"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread: Optional[threading.Thread] = None
+        self.pending: Set[asyncio.Task] = set()
+        self.connections = asyncio.Semaphore(MAX_CONNECTIONS)
+        # Threads for pakua, from its first request to the end of run()
+        self.requests: Optional[ThreadPoolExecutor] = None
+
+    def builtins(self) -> Dict[str, Callable]:
+        """Builtins replacing the blocking ones by name, each awaitable on
+        this loop through spl_async"""
+        return {
+            'pakua': awaitable(custom_builtins.pakua, self._pakua),
+            'simamisha': awaitable(custom_builtins.simamisha, asyncio.sleep),
+            'soma_faili': awaitable(custom_builtins.soma_faili, self._soma_faili),
+            'andika': awaitable(custom_builtins.andika, self._andika),
+            'subiri': awaitable(custom_builtins.subiri, self._subiri),
+            'subiri_zote': awaitable(custom_builtins.subiri_zote, self._subiri_zote),
+            'subiri_yoyote': awaitable(custom_builtins.subiri_yoyote, self._subiri_yoyote),
+            'zinapokamilika': awaitable(zinapokamilika, self._zinapokamilika),
+        }
+
+    def running(self) -> bool:
+        return self.loop.is_running()
+
+    def run(self, steps: Generator) -> Any:
+        """Run the program's steps on the loop, then wait for its tasks"""
+        async def main():
+            try:
+                result = await self.drive(steps)
+                while self.pending:
+                    await asyncio.wait(list(self.pending))
+                return result
+            finally:
+                # The program failed: end its tasks while the loop still
+                # runs their done callbacks, so waiters get a TaskResult
+                await self.cancel_pending()
+
+        self.thread = threading.current_thread()
+        try:
+            return self.loop.run_until_complete(main())
+        finally:
+            if self.pending:
+                # Interrupted before main() could cancel them
+                self.loop.run_until_complete(self.cancel_pending())
+            if self.requests is not None:
+                self.requests.shutdown(wait=False)
+                self.requests = None
+            self.thread = None
+
+    async def cancel_pending(self) -> None:
+        pending = list(self.pending)
+        for future in pending:
+            future.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def close(self) -> None:
+        self.loop.close()
+
+    async def drive(self, steps: Generator) -> Any:
+        """Run VM steps, awaiting each Suspend they yield"""
+        try:
+            request = steps.send(None)
+            while True:
+                try:
+                    value = await request.start(*request.args)
+                except Exception as e:
+                    request = steps.throw(e)
+                else:
+                    request = steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+    def spawn(self, steps: Generator) -> Task:
+        """Schedule steps as a coroutine; the Task finishes with it"""
+        task = Task(target=None)
+        task.claim()
+
+        def create() -> None:
+            future = self.loop.create_task(self.drive(steps), name=task.name)
+            self.pending.add(future)
+            future.add_done_callback(lambda future: self._finish(task, future))
+
+        if self.thread is None or threading.current_thread() is self.thread:
+            create()
+        else:
+            # Spawned from a block on the thread backend
+            self.loop.call_soon_threadsafe(create)
+        return task
+
+    def _finish(self, task: Task, future: asyncio.Task) -> None:
+        self.pending.discard(future)
+        if future.cancelled():
+            task.set_result(TaskResult(exception=asyncio.CancelledError()))
+            return
+        error = future.exception()
+        if error is not None:
+            print(f"Shida ya mtindo: {error}")
+            task.set_result(TaskResult(exception=error))
+        else:
+            task.set_result(TaskResult(value=future.result()))
+
+    def _future(self, task: Task) -> asyncio.Future:
+        """Future on this loop resolved with task when it finishes"""
+        future = self.loop.create_future()
+
+        def resolve() -> None:
+            if not future.done():
+                future.set_result(task)
+
+        # Tasks on the thread and process backends finish on other threads
+        task.add_done_callback(lambda task: self.loop.call_soon_threadsafe(resolve))
+        return future
+
+    def _futures(self, hoja: tuple) -> tuple:
+        tasks, muda = custom_builtins.kazi_na_muda(hoja)
+        return tasks, [self._future(task) for task in tasks], muda
+
+    async def _subiri(self, kazi: Task, muda: Optional[float] = None) -> Any:
+        await asyncio.wait([self._future(kazi)], timeout=muda)
+        return kazi.result.value
+
+    async def _subiri_zote(self, *hoja: Any) -> List[Any]:
+        tasks, futures, muda = self._futures(hoja)
+        if futures:
+            await asyncio.wait(futures, timeout=muda)
+        return [task.result.value for task in tasks]
+
+    async def _subiri_yoyote(self, *hoja: Any) -> Optional[Task]:
+        tasks, futures, muda = self._futures(hoja)
+        if not futures:
+            return None
+        done, _ = await asyncio.wait(futures, timeout=muda, return_when=asyncio.FIRST_COMPLETED)
+        return next(iter(done)).result() if done else None
+
+    async def _zinapokamilika(self, *hoja: Any) -> List[Any]:
+        tasks, futures, muda = self._futures(hoja)
+        values = []
+        try:
+            for next_done in asyncio.as_completed(futures, timeout=muda):
+                values.append((await next_done).result.value)
+        except asyncio.TimeoutError:
+            # One hakuna per unfinished task, as subiri_zote gives
+            values.extend([custom_builtins.HAKUNA] * (len(tasks) - len(values)))
+        return values
+
+    async def _soma_faili(self, jina: str) -> str:
+        # Regular files are always ready to the OS; only a thread keeps a
+        # slow disk off the loop
+        return await asyncio.to_thread(custom_builtins.soma_faili, jina)
+
+    async def _andika(self, jina: str, yaliyomo: str) -> None:
+        return await asyncio.to_thread(custom_builtins.andika, jina, yaliyomo)
+
+    async def _pakua(self, url: str, njia: str = "GET", **mazingira: Any) -> Any:
+        # The blocking pakua itself, so proxies, redirects, chunked bodies
+        # and errors behave the same on every backend
+        async with self.connections:
+            if self.requests is None:
+                self.requests = ThreadPoolExecutor(MAX_CONNECTIONS, thread_name_prefix='spl-pakua')
+            return await self.loop.run_in_executor(
+                self.requests, functools.partial(custom_builtins.pakua, url, njia, **mazingira))
+
+def zinapokamilika(*hoja: Any) -> List[Any]:
+    """Zinapokamilika - Values of tasks in the order they finish.
+
+    A list, not a lazy iterator, the same whether the loop awaits it or
+    panga calls it. Tasks unfinished at the timeout give hakuna at the
+    end, as with subiri_zote.
+    """
+    return list(custom_builtins.zinapokamilika(*hoja))
+
+if __name__ == '__main__':
+    def sleeper(seconds):
+        yield Suspend(asyncio.sleep, custom_builtins.simamisha, (seconds,))
+        return seconds
+
+    event_loop = EventLoop()
+    tasks = [event_loop.spawn(sleeper(0.1)) for _ in range(10000)]
+    event_loop.run(sleeper(0))
+    print(sum(task.result.value for task in tasks))
+    event_loop.close()
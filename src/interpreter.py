@@ -2,22 +2,36 @@
 """
 SPL Interpreter - Optimized Version
 """
+import operator
 import sys
 import traceback
 from pathlib import Path
-from threading import Thread
-from typing import Any, Dict, List, Optional
+from threading import RLock, Thread
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Import local modules
-from runtime import Sandbox 
+from .runtime import Sandbox
 from .concurrency import spawn
 from src.type_checker import TypeChecker
 from .custom_builtins import CUSTOM_BUILTINS
 from .lexer import Lexer
+from .ast_nodes import (
+    Node, NodeVisitor, Number, String, Var, BinaryOp, Assignment, FunctionCall,
+    FunctionDef, Print, Return, If, Spawn, PatternMatch, Binding, TypedPattern,
+    ensure_nodes
+)
+from .decision import decision_tree
+from .jit import JIT
+from .memo import Memoizer
+from .processes import CaptureError, default_backend, spawn_process
+from .resolver import Resolution, Resolver, Scope
+from .specialize import Specialization
 
 class SPLRuntimeError(Exception):
     """Base exception for SPL runtime errors"""
-    def __init__(self, message: str, node: Optional[Dict] = None):
+    def __init__(self, message: str, node: Optional[Node] = None):
         super().__init__(message)
         self.node = node
         self.stack_trace: List[str] = []
@@ -25,168 +39,624 @@ class SPLRuntimeError(Exception):
     def add_stack_frame(self, frame: str) -> None:
         self.stack_trace.append(frame)
 
+class ReturnSignal(Exception):
+    """Carries a rudisha value out of nested blocks to the calling kazi"""
+    def __init__(self, value: Any):
+        super().__init__()
+        self.value = value
+
+# Runtime checks are stateless, so every scope shares one checker
+TYPE_CHECKER = TypeChecker()
+
+def check_type(name: str, value: Any, var_type: str) -> None:
+    try:
+        TYPE_CHECKER.check(value, var_type)
+    except TypeError as e:
+        raise SPLRuntimeError(f"Aina si sahihi kwa {name}: {e}")
+
+@lru_cache(maxsize=1024)
+def parameter_guard(params: Tuple[Tuple[str, Optional[str]], ...]
+                    ) -> Optional[Callable[[tuple], None]]:
+    """One function checking call arguments against (name, annotation)
+    params, generated once per signature; None if nothing is checked.
+
+    Plain types become inline isinstance tests, generic ones like
+    orodha[int] a sampling predicate, and unknown ones a check_type call
+    that raises as before.
+    """
+    lines = ["def guard(args):", "    count = len(args)"]
+    namespace: Dict[str, Any] = {'check_type': check_type}
+    for index, (name, annotation) in enumerate(params):
+        if not annotation:
+            continue
+        py_type = TYPE_CHECKER.python_type(annotation)
+        if py_type is object:
+            continue
+        if py_type:
+            namespace[f"T{index}"] = py_type
+            test = f"not isinstance(args[{index}], T{index})"
+        elif TYPE_CHECKER.guard(annotation) is not None:
+            namespace[f"G{index}"] = TYPE_CHECKER.guard(annotation)
+            test = f"not G{index}(args[{index}])"
+        else:
+            test = "True"
+        lines.append(f"    if count > {index} and {test}:")
+        lines.append(f"        check_type({name!r}, args[{index}], {annotation!r})")
+    if len(lines) == 2:
+        return None
+    exec(compile("\n".join(lines) + "\n", "<guard>", "exec"), namespace)
+    return namespace['guard']
+
 class Environment:
     """Enhanced environment with type checking and scoping"""
+    __slots__ = ('vars', 'parent', 'sandbox', 'version')
+    type_checker = TYPE_CHECKER
+
     def __init__(self, parent: Optional['Environment'] = None, sandbox: bool = False):
         self.vars: Dict[str, Any] = {}
         self.parent = parent
         self.sandbox = Sandbox() if sandbox else None
-        self.type_checker = TypeChecker()
+        # Bumped when a name is rebound, invalidating inline caches that
+        # hold names from here; a new name cannot be in any cache yet
+        self.version = 0
 
     def get(self, name: str) -> Any:
-        current = self
-        while current:
-            if name in current.vars:
-                return current.vars[name]
-            current = current.parent
-        raise SPLRuntimeError(f"Kisichojulikana: {name}")
+        return lookup(self, name)
 
     def set(self, name: str, value: Any, var_type: Optional[str] = None) -> None:
         if self.sandbox and self.sandbox.is_restricted(name):
             raise SPLRuntimeError(f"Uvunjifu wa sheria: {name}")
             
         if var_type:
-            self.type_checker.validate(value, var_type)
+            check_type(name, value, var_type)
             
+        if name in self.vars:
+            self.version += 1
         self.vars[name] = value
 
-class Interpreter:
-    """Main interpreter class with enhanced features"""
-    def __init__(self, sandbox: bool = False):
+# Marks a slot whose name has not been stored yet in this frame
+UNSET = object()
+
+class Frame:
+    """Array-backed scope laid out by the Resolver"""
+    __slots__ = ('values', 'parent', 'scope', 'root')
+
+    def __init__(self, scope: Scope, parent: Any):
+        self.values = [UNSET] * len(scope.slots)
+        self.parent = parent
+        self.scope = scope
+        # The Environment at the bottom of the chain
+        self.root = parent.root if type(parent) is Frame else parent
+
+def lookup(scope: Any, name: str) -> Any:
+    """Find name by walking frames and environments outwards"""
+    while scope is not None:
+        if type(scope) is Frame:
+            slot = scope.scope.slots.get(name)
+            if slot is not None:
+                value = scope.values[slot]
+                if value is not UNSET:
+                    return value
+        elif name in scope.vars:
+            return scope.vars[name]
+        scope = scope.parent
+    raise SPLRuntimeError(f"Kisichojulikana: {name}")
+
+class TailCall:
+    """A call in tail position, returned to the calling kazi's trampoline
+    instead of being made, so tail recursion runs in constant Python stack"""
+    __slots__ = ('invoke', 'args', 'env')
+
+    def __init__(self, invoke: Callable[[tuple, Any], Any], args: tuple, env: Any):
+        self.invoke = invoke
+        self.args = args
+        self.env = env
+
+class CallSite:
+    """Monomorphic inline cache for the callee of one FunctionCall.
+
+    entry is (global Environment, its version, frame epoch, function),
+    replaced as a whole so anzisha threads never see half an update; it is
+    valid while the Environment's version and the Interpreter's frame
+    epoch are unchanged.
+    """
+    __slots__ = ('name', 'node', 'entry', 'hits', 'misses')
+
+    def __init__(self, name: str, node: FunctionCall):
+        self.name = name
+        self.node = node
+        self.entry = (None, -1, -1, None)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.hits + self.misses
+        location = self.node.location or {'start_line': 0, 'start_col': 0}
+        return {
+            'name': self.name, 'line': location['start_line'], 'column': location['start_col'],
+            'hits': self.hits,
+            'misses': self.misses, 'hit_rate': self.hits / calls if calls else 0.0,
+        }
+
+class Interpreter(NodeVisitor):
+    """Main interpreter: compiles each node to a closure once, then runs them.
+
+    compile_* handlers run ahead of execution and return a function of the
+    current scope, so evaluation is nested closure calls with operators,
+    literals, child closures and Resolver addresses already in place. The
+    top level runs in the global Environment; kazi bodies and blocks that
+    store names run in Frames.
+    """
+    visit_prefix = 'compile_'
+
+    def __init__(self, sandbox: bool = False, jit: Optional[JIT] = None,
+                 memo: Optional[Memoizer] = None, specialize: bool = False):
         self.global_env = Environment(sandbox=sandbox)
+        # Promotes hot kazi to generated Python when set
+        self.jit = jit
+        # Caches for kumbuka, and for pure kazi when memo.auto is set
+        self.memo = memo if memo is not None else Memoizer()
+        # Types KihakikiAina proves, when specializing
+        self.specialization = Specialization() if specialize else None
         self.global_env.vars.update(CUSTOM_BUILTINS)
+        # Builtins bound to this Interpreter; a worker process has its own
+        self.bound_builtins = self.memo.builtins()
+        self.global_env.vars.update(self.bound_builtins)
+        # Scope of the running code, read when a kazi is called from a builtin
         self.current_env = self.global_env
-
-    def interpret(self, ast: List[Dict], env: Optional[Environment] = None) -> Any:
+        # Addresses for the unit being compiled
+        self.resolution = Resolution(None)
+        # Every name any Frame layout holds; other names can only be in an
+        # Environment, so their lookups skip the frames
+        self.frame_names = set()
+        # Bumped when frame_names grows, since a name moving into frames
+        # can shadow the global an inline cache holds
+        self.frame_epoch = [0]
+        self.call_sites: List[CallSite] = []
+        self._compile_lock = RLock()
+
+    def interpret(self, ast: List[Node], env: Optional[Environment] = None) -> Any:
         """Execute AST nodes in specified environment"""
-        result = None
+        statements = list(ensure_nodes(ast))
+        self.memo.analyze(statements)
+        if self.specialization is not None:
+            self.specialization.analyze(statements)
+        block = self.compile_unit(statements, Resolver().resolve_module(statements))
         original_env = self.current_env
-        self.current_env = env or self.current_env
-        
         try:
-            for node in ast:
-                result = self.visit(node)
-            return result
+            return block(env or self.current_env)
         finally:
             self.current_env = original_env
 
-    def visit(self, node: Dict) -> Any:
-        """Dispatch node to appropriate method"""
-        method_name = f'visit_{node["type"]}'
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node)
-
-    def no_visit_method(self, node: Dict) -> None:
-        raise SPLRuntimeError(f"Hakuna njia ya {node['type']}", node)
-
-    # Node Visitors
-    def visit_Number(self, node: Dict) -> float:
-        return node['value']
-
-    def visit_String(self, node: Dict) -> str:
-        return node['value']
-
-    def visit_Variable(self, node: Dict) -> Any:
-        return self.current_env.get(node['name'])
-
-    def visit_Assignment(self, node: Dict) -> Any:
-        value = self.visit(node['value'])
-        var_type = node.get('type')
-        self.current_env.set(node['name'], value, var_type)
-        return value
-
-    def visit_BinaryOp(self, node: Dict) -> Any:
-        left = self.visit(node['left'])
-        right = self.visit(node['right'])
-        op = node['operator']
-
-        ops = {
-            '+': lambda a, b: a + b,
-            '-': lambda a, b: a - b,
-            '*': lambda a, b: a * b,
-            '/': lambda a, b: a / b,
-            '==': lambda a, b: a == b,
-            '!=': lambda a, b: a != b,
-            '<': lambda a, b: a < b,
-            '>': lambda a, b: a > b,
-        }
-
-        if op not in ops:
-            raise SPLRuntimeError(f"Operesheni isiyojulikana: {op}", node)
+    def compile(self, node: Node) -> Callable[[Any], Any]:
+        return self.visit(node)
+
+    def compile_unit(self, statements: List[Node], resolution: Resolution) -> Callable[[Any], Any]:
+        # Kazi bodies compile on first call, possibly in anzisha threads
+        with self._compile_lock:
+            names = set()
+            for scope in resolution.scopes.values():
+                names.update(scope.slots)
+            if resolution.root is not None:
+                names.update(resolution.root.slots)
+            if not names <= self.frame_names:
+                self.frame_names.update(names)
+                self.frame_epoch[0] += 1
+            outer, self.resolution = self.resolution, resolution
+            try:
+                return self.compile_block(statements)
+            finally:
+                self.resolution = outer
 
-        try:
-            return ops[op](left, right)
-        except TypeError as e:
-            raise SPLRuntimeError(f"Aina si sahihi: {e}", node)
+    def compile_block(self, statements: List[Node]) -> Callable[[Any], Any]:
+        """Closure running statements in order and returning the last value"""
+        compiled = tuple(self.visit(stmt) for stmt in statements)
+        if not compiled:
+            return lambda env: None
+        if len(compiled) == 1:
+            return compiled[0]
 
-    def visit_FunctionDef(self, node: Dict) -> None:
-        def function_wrapper(*args: Any) -> Any:
-            local_env = Environment(parent=self.current_env)
-            
-            # Handle parameters with optional type checking
-            for param, arg in zip(node['params'], args):
-                param_name = param['name']
-                param_type = param.get('type')
-                local_env.set(param_name, arg, param_type)
-
-            # Execute function body
-            old_env = self.current_env
-            self.current_env = local_env
+        def run_block(env: Any) -> Any:
             result = None
-            
+            for stmt in compiled:
+                result = stmt(env)
+            return result
+        return run_block
+
+    def compile_scoped(self, key: object, statements: List[Node]) -> Callable[[Any], Any]:
+        """Like compile_block, in a new Frame when the block stores names"""
+        block = self.compile_block(statements)
+        scope = self.resolution.scopes.get(key)
+        if scope is None:
+            # Nothing is stored in the block, so it shares the enclosing scope
+            return block
+        return lambda env: block(Frame(scope, env))
+
+    def compile_store(self, node: Node, name: str, var_type: Optional[str] = None
+                      ) -> Callable[[Any, Any], None]:
+        """Closure storing a value for node in the innermost scope"""
+        slot = self.resolution.stores.get(node)
+        if slot is None:
+            return lambda env, value: env.set(name, value, var_type)
+        if var_type:
+            def store_typed(env: Any, value: Any) -> None:
+                check_type(name, value, var_type)
+                env.values[slot] = value
+            return store_typed
+
+        def store(env: Any, value: Any) -> None:
+            env.values[slot] = value
+        return store
+
+    def tail_call(self, function: Any, args: tuple, env: Any) -> Any:
+        """Defer a call to a kazi as a TailCall; call anything else now"""
+        invoke = getattr(function, 'spl_invoke', None)
+        if invoke is None:
+            self.current_env = env
+            return function(*args)
+        return TailCall(invoke, args, env)
+
+    def generic_visit(self, node: Node) -> Callable[[Any], Any]:
+        def unsupported(env: Any) -> Any:
+            raise SPLRuntimeError(f"Hakuna njia ya {node.type}", node)
+        return unsupported
+
+    # Node compilers
+    def compile_Number(self, node: Number) -> Callable[[Any], Any]:
+        value = node.value
+        return lambda env: value
+
+    compile_String = compile_Number
+    compile_Literal = compile_Number
+
+    def compile_Var(self, node: Var) -> Callable[[Any], Any]:
+        name = node.name
+        frame_names = self.frame_names
+        address = self.resolution.reads.get(node)
+        candidates, outer = address if address is not None else ((), 0)
+
+        def load_outer(env: Any) -> Any:
+            if name not in frame_names:
+                return lookup(env.root if type(env) is Frame else env, name)
+            for _ in range(outer):
+                env = env.parent
+            return lookup(env, name)
+
+        if not candidates:
+            return load_outer
+
+        if len(candidates) == 1 and candidates[0][0] == 0:
+            slot = candidates[0][1]
+
+            def load_local(env: Frame) -> Any:
+                value = env.values[slot]
+                if value is not UNSET:
+                    return value
+                return load_outer(env)
+            return load_local
+
+        def load(env: Frame) -> Any:
+            for depth, slot in candidates:
+                frame = env
+                for _ in range(depth):
+                    frame = frame.parent
+                value = frame.values[slot]
+                if value is not UNSET:
+                    return value
+            return load_outer(env)
+        return load
+
+    def compile_Assignment(self, node: Assignment) -> Callable[[Any], Any]:
+        value_fn = self.visit(node.value)
+        store = self.compile_store(node, node.name, node.var_type)
+
+        def assign(env: Any) -> Any:
+            value = value_fn(env)
+            store(env, value)
+            return value
+        return assign
+
+    def compile_BinaryOp(self, node: BinaryOp) -> Callable[[Any], Any]:
+        left_fn = self.visit(node.left)
+        right_fn = self.visit(node.right)
+        op = BINARY_OPS.get(node.operator)
+
+        if op is None:
+            def unknown(env: Any) -> Any:
+                left_fn(env)
+                right_fn(env)
+                raise SPLRuntimeError(f"Operesheni isiyojulikana: {node.operator}", node)
+            return unknown
+
+        specialization = self.specialization
+        if specialization is not None and node in specialization.int_ops:
+            right = node.right
+            if isinstance(right, Number) and type(right.value) is int:
+                return int_handler(node.operator, right.value)(left_fn, right_fn)
+            return INT_HANDLERS[node.operator](left_fn, right_fn)
+
+        def binary(env: Any) -> Any:
+            left = left_fn(env)
+            right = right_fn(env)
             try:
-                for stmt in node['body']:
-                    result = self.visit(stmt)
-            finally:
-                self.current_env = old_env
+                return op(left, right)
+            except TypeError as e:
+                raise SPLRuntimeError(f"Aina si sahihi: {e}", node)
+        return binary
+
+    def compile_Print(self, node: Print) -> Callable[[Any], Any]:
+        value_fn = self.visit(node.value)
+
+        def print_value(env: Any) -> None:
+            print(value_fn(env))
+        return print_value
+
+    def compile_Return(self, node: Return) -> Callable[[Any], Any]:
+        value_fn = self.visit(node.value) if node.value is not None else (lambda env: None)
+
+        def return_value(env: Any) -> None:
+            raise ReturnSignal(value_fn(env))
+        return return_value
+
+    def compile_FunctionDef(self, node: FunctionDef) -> Callable[[Any], Any]:
+        interpreter = self
+        jit = self.jit
+        stats = jit.track(node) if jit is not None else None
+        # Resolved and compiled on first call, so a lazily skimmed body is
+        # parsed only then
+        body_fn = None
+        resolution = scope = slots = None
+        # Generated Python function once the JIT promotes this kazi
+        native = None
+
+        # Parameters every call is proven to pass correctly go unchecked
+        unchecked = (self.specialization.unchecked.get(node, ())
+                     if self.specialization is not None else ())
+        guard = parameter_guard(tuple(
+            (param.name, None if param.name in unchecked else param.annotation)
+            for param in node.params
+        ))
+
+        def prepare() -> None:
+            nonlocal body_fn, resolution, scope, slots
+            resolution = Resolver().resolve_function(node)
+            scope = resolution.root
+            slots = [scope.slots[param.name] for param in node.params]
+            body_fn = interpreter.compile_unit(node.body, resolution)
+
+        def run_interpreted(args: tuple, caller_env: Any) -> Any:
+            if body_fn is None:
+                prepare()
+            # The callee's scope hangs off the caller's
+            if guard is not None:
+                guard(args)
+            frame = Frame(scope, caller_env)
+            values = frame.values
+            for slot, arg in zip(slots, args):
+                values[slot] = arg
+            try:
+                return body_fn(frame)
+            except ReturnSignal as signal:
+                return signal.value
 
-            return result
+        # invoke runs the body once and may hand back a TailCall
+        if jit is None:
+            invoke = run_interpreted
+        else:
+            def invoke(args: tuple, caller_env: Any) -> Any:
+                nonlocal native
+                if native is not None:
+                    return native(caller_env, *args)
+                if stats.calls + 1 >= jit.threshold and stats.reason is None:
+                    if body_fn is None:
+                        prepare()
+                    native = jit.promote(node, resolution, interpreter, stats)
+                    if native is not None:
+                        return native(caller_env, *args)
+                stats.calls += 1
+                if not jit.timing:
+                    return run_interpreted(args, caller_env)
+                started = perf_counter()
+                try:
+                    return run_interpreted(args, caller_env)
+                finally:
+                    stats.interpreted_seconds += perf_counter() - started
 
-        self.current_env.set(node['name'], function_wrapper)
-
-    def visit_FunctionCall(self, node: Dict) -> Any:
-        func = self.visit(node['function'])
-        args = [self.visit(arg) for arg in node['args']]
-        return func(*args)
-
-    def visit_If(self, node: Dict) -> Any:
-        condition = self.visit(node['condition'])
-        branch = node['then'] if condition else node.get('else', [])
-        return self.interpret(branch, Environment(parent=self.current_env))
-
-    def visit_PatternMatch(self, node: Dict) -> Any:
-        value = self.visit(node['expression'])
-        
-        for case in node['cases']:
-            pattern = case['pattern']
-            if pattern == '_' or self.match_pattern(pattern, value):
-                return self.interpret(case['body'], Environment(parent=self.current_env))
-        
-        raise SPLRuntimeError("Hakuna mfano ulinganifu", node)
-
-    def match_pattern(self, pattern: Any, value: Any) -> bool:
-        """Enhanced pattern matching logic"""
-        if isinstance(pattern, dict):
-            return self.visit(pattern) == value
-        return pattern == value
-
-    def visit_Spawn(self, node: Dict) -> Any:
-        def task_wrapper():
+        def function_wrapper(*args: Any) -> Any:
+            caller_env = interpreter.current_env
             try:
-                return self.interpret(node['body'], Environment(parent=self.current_env))
-            except Exception as e:
-                print(f"Shida ya mtindo: {e}")
-
-        return spawn(task_wrapper)
+                result = invoke(args, caller_env)
+                # Trampoline: calls in tail position come back unmade
+                while type(result) is TailCall:
+                    result = result.invoke(result.args, result.env)
+                return result
+            finally:
+                # Calls in the body moved it; a builtin calling this kazi
+                # again must see its own caller's scope
+                interpreter.current_env = caller_env
+        function_wrapper.spl_invoke = invoke
+        function_wrapper.__name__ = node.name
+        if node in self.memo.pure:
+            function_wrapper = self.memo.wrap(node.name, function_wrapper,
+                                              arity=len(node.params), tail=True)
+        # Sent as its definition when an anzisha block runs in another process
+        function_wrapper.spl_node = node
+
+        store = self.compile_store(node, node.name)
+
+        def define(env: Any) -> None:
+            store(env, function_wrapper)
+        return define
+
+    def compile_FunctionCall(self, node: FunctionCall) -> Callable[[Any], Any]:
+        function_fn = self.compile_callee(node)
+        arg_fns = tuple(self.visit(arg) for arg in node.args)
+
+        if node in self.resolution.tail_calls:
+            tail_call = self.tail_call
+
+            def call_in_tail(env: Any) -> Any:
+                func = function_fn(env)
+                return tail_call(func, tuple(arg_fn(env) for arg_fn in arg_fns), env)
+            return call_in_tail
+
+        def call(env: Any) -> Any:
+            func = function_fn(env)
+            args = [arg_fn(env) for arg_fn in arg_fns]
+            self.current_env = env
+            return func(*args)
+        return call
+
+    def compile_callee(self, node: FunctionCall) -> Callable[[Any], Any]:
+        """Load of the called function, behind an inline cache when it names
+        a global: one that no frame layout holds"""
+        function = node.function
+        load = self.visit(function)
+        if not isinstance(function, Var) or function.name in self.frame_names:
+            return load
+        address = self.resolution.reads.get(function)
+        if address is not None and address.candidates:
+            return load
+        name = function.name
+        frame_names = self.frame_names
+        site = CallSite(name, node)
+        self.call_sites.append(site)
+        epoch = self.frame_epoch
+        global_env = self.global_env
+        builtin = CUSTOM_BUILTINS.get(name)
+        if builtin is not None and global_env.vars.get(name) is builtin:
+            # Builtins start cached, so even the first call skips the lookup
+            site.entry = (global_env, global_env.version, epoch[0], builtin)
+
+        def load_cached(env: Any) -> Any:
+            root = env.root if type(env) is Frame else env
+            cached_root, version, cached_epoch, function = site.entry
+            if root is cached_root and root.version == version and epoch[0] == cached_epoch:
+                site.hits += 1
+                return function
+            site.misses += 1
+            version, current_epoch = root.version, epoch[0]
+            function = load(env)
+            # Cacheable while the name is global only, in an Environment
+            # without parents whose version covers every binding
+            if root.parent is None and name not in frame_names:
+                site.entry = (root, version, current_epoch, function)
+            return function
+        return load_cached
+
+    def inline_cache_stats(self) -> List[Dict[str, Any]]:
+        """Hits and misses of every call site's inline cache"""
+        return [site.stats() for site in self.call_sites]
+
+    def compile_If(self, node: If) -> Callable[[Any], Any]:
+        condition_fn = self.visit(node.condition)
+        then_fn = self.compile_scoped((node, 'then'), node.then)
+        orelse_fn = self.compile_scoped((node, 'orelse'), node.orelse)
+
+        def branch(env: Any) -> Any:
+            if condition_fn(env):
+                return then_fn(env)
+            return orelse_fn(env)
+        return branch
+
+    def compile_PatternMatch(self, node: PatternMatch) -> Callable[[Any], Any]:
+        subject_fn = self.visit(node.expression)
+        dispatch = decision_tree(node.cases).dispatch
+        cases = tuple(
+            (self.compile_binding(case.pattern), self.compile_block(case.body),
+             self.resolution.scopes.get(case))
+            for case in node.cases
+        )
+
+        def match(env: Any) -> Any:
+            value = subject_fn(env)
+            index = dispatch(value)
+            if index is None:
+                raise SPLRuntimeError("Hakuna mfano ulinganifu", node)
+            bind, body_fn, scope = cases[index]
+            case_env = env if scope is None else Frame(scope, env)
+            if bind is not None:
+                bind(case_env, value)
+            return body_fn(case_env)
+        return match
+
+    def compile_binding(self, pattern: Node) -> Optional[Callable[[Any, Any], None]]:
+        """Store for the name a pattern binds, if any; the decision tree has
+        already checked the type of a TypedPattern"""
+        if isinstance(pattern, (Binding, TypedPattern)):
+            return self.compile_store(pattern, pattern.name)
+        return None
+
+    def compile_Spawn(self, node: Spawn) -> Callable[[Any], Any]:
+        body_fn = self.compile_scoped(node, node.body)
+
+        def start(env: Any) -> Any:
+            if (node.backend or default_backend()) == 'process':
+                try:
+                    return spawn_process(node.body, env, bound=self.bound_builtins)
+                except CaptureError as e:
+                    raise SPLRuntimeError(str(e), node)
+
+            def task_wrapper():
+                try:
+                    return body_fn(env)
+                except Exception as e:
+                    print(f"Shida ya mtindo: {e}")
+
+            return spawn(task_wrapper)
+        return start
+
+def format_inline_caches(stats: List[Dict[str, Any]]) -> str:
+    """Readable Interpreter.inline_cache_stats(), call sites never run left out"""
+    lines = ["inline caches:"]
+    for site in stats:
+        if site['hits'] or site['misses']:
+            where = f"{site['line']}:{site['column']}"
+            lines.append(f"  {site['name']:<20} {where:>8}  hits {site['hits']:>8}"
+                         f"  misses {site['misses']:>6}  ({site['hit_rate'] * 100:5.1f}%)")
+    return "\n".join(lines)
+
+BINARY_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+def int_handler(symbol: str, right: Optional[int] = None) -> Callable:
+    """Factory for BinaryOp closures over operands proven int: the operator
+    is written inline and nothing catches TypeError, which int operands
+    cannot raise; a constant right operand is written inline as well"""
+    operand = "right_fn(env)" if right is None else repr(right)
+    source = (
+        "def make(left_fn, right_fn):\n"
+        "    def int_op(env):\n"
+        f"        return left_fn(env) {symbol} {operand}\n"
+        "    return int_op\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<int {symbol}>", "exec"), namespace)
+    return namespace['make']
+
+INT_HANDLERS = {symbol: int_handler(symbol) for symbol in BINARY_OPS}
 
 def start_repl() -> None:
-    """Enhanced REPL with syntax highlighting"""
+    """Enhanced REPL with incremental lexing of the session"""
     from prompt_toolkit import PromptSession
-    from prompt_toolkit.lexers import PygmentsLexer
-    from .lexer import SPLexer
+    from .lexer import IncrementalLexer, Token
+    from .optimizer import optimize_ast
+    from .parser import Parser
 
-    session = PromptSession(lexer=PygmentsLexer(SPLexer()))
+    session = PromptSession()
     interpreter = Interpreter()
+    # The whole session is one document; each input only lexes its own lines
+    document = IncrementalLexer()
 
     print("SPL REPL (Andika 'saidia' au 'ondoka')")
     while True:
@@ -200,10 +670,10 @@ def start_repl() -> None:
                 show_help()
                 continue
                 
-            # TODO: Integrate with actual parser
-            from .parser import Parser
-            tokens = Lexer(code).tokenize()
-            ast = Parser(tokens).parse()
+            lines = document.append(code + '\n')
+            tokens = document.tokens_in(lines.start, lines.stop - 1)
+            tokens.append(Token('EOF', '', lines.stop, 1))
+            ast = optimize_ast(Parser(tokens).parse())
             result = interpreter.interpret(ast)
             if result is not None:
                 print(result)
@@ -213,20 +683,49 @@ def start_repl() -> None:
         except Exception as e:
             print(f"\033[91mShida: {e}\033[0m")
 
-def execute_file(filename: str, sandbox: bool = False) -> None:
-    """Execute SPL file with optional sandboxing"""
-    from .lexer import Lexer
-    from .parser import Parser
-
-    interpreter = Interpreter(sandbox=sandbox)
+def execute_file(filename: str, sandbox: bool = False, use_cache: bool = True,
+                 lazy: bool = False, jobs: int = 1, on_timings=None,
+                 optimize: int = 1, on_report=None, engine: str = 'tree',
+                 jit: Optional[JIT] = None, memo: Optional[Memoizer] = None,
+                 specialize: bool = False, on_inline_caches=None) -> None:
+    """Execute SPL source or a precompiled .splc file with optional sandboxing.
+
+    engine selects the tree-walking Interpreter ('tree') or the bytecode
+    VirtualMachine ('vm'); both run the same programs with the same results.
+    A JIT promotes hot kazi of the tree engine to generated Python, and
+    a Memoizer with auto set caches its kazi proven pure. specialize runs
+    KihakikiAina first and skips work its types prove unneeded.
+    on_inline_caches receives the tree engine's call site cache stats.
+    """
+    from . import splc
+
+    if engine == 'vm':
+        from .vm import VirtualMachine
+        interpreter = VirtualMachine(sandbox=sandbox)
+    elif engine == 'tree':
+        interpreter = Interpreter(sandbox=sandbox, jit=jit, memo=memo, specialize=specialize)
+    else:
+        raise SPLRuntimeError(f"Injini isiyojulikana: {engine}")
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            source = f.read()
-            tokens = Lexer(source).tokenize()
-            ast = Parser(tokens).parse()
+        if Path(filename).suffix == splc.SUFFIX:
+            ast = splc.load_precompiled(filename)
+        else:
+            # Unchanged sources load from __splcache__ without lexing or parsing
+            ast = splc.load_file(filename, optimize=optimize, use_cache=use_cache, lazy=lazy,
+                                 jobs=jobs, on_timings=on_timings, on_report=on_report)
+        try:
             interpreter.interpret(ast)
-            
+        finally:
+            if on_inline_caches is not None and engine == 'tree':
+                on_inline_caches(interpreter.inline_cache_stats())
+
+    except RecursionError:
+        # Tail calls are trampolined; other recursion nests closures
+        raise SPLRuntimeError("Kujirudia kumezidi kina cha Python; "
+                              "tumia rudisha kwa wito wa mwisho")
+    except splc.SPLCError as e:
+        raise SPLRuntimeError(f"Faili la .splc haliwezi kutumika: {filename} ({e})")
     except FileNotFoundError:
         raise SPLRuntimeError(f"Faili haipatikani: {filename}")
     except IsADirectoryError:
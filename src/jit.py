@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+SPL JIT - promote hot kazi from the closure tier to generated Python
+
+The Interpreter counts calls per kazi. At the threshold the body is turned
+into Python source, run through compile()/exec and swapped in as the
+callee. Generated code keeps SPL semantics: locals stay in Resolver frames
+so callees still see the caller's names, the last statement is the value,
+parameters and typed stores are checked and errors carry the same Swahili
+messages. Kazi using constructs the generator does not handle stay in the
+closure tier.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from .ast_nodes import (
+    Node, Number, String, Var, BinaryOp, Assignment, FunctionCall, FunctionDef,
+    Print, Return, If, PatternMatch, Literal, Binding, TypedPattern
+)
+from .decision import decision_tree
+from .resolver import Resolution
+
+DEFAULT_THRESHOLD = 50
+
+# Operators emitted inline; their TypeErrors become "Aina si sahihi"
+INLINE_OPERATORS = frozenset(('+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>='))
+
+class Unsupported(Exception):
+    """The kazi uses something the generator does not translate"""
+
+@dataclass
+class FunctionStats:
+    """Per-kazi counters; times are inclusive of nested calls"""
+    name: str
+    calls: int = 0
+    promoted: bool = False
+    reason: Optional[str] = None
+    compile_seconds: float = 0.0
+    interpreted_seconds: float = 0.0
+    native_seconds: float = 0.0
+    native_calls: int = 0
+
+class FunctionCodegen:
+    """Python source for one kazi body, three-address style.
+
+    Every operator gets its own line, so a TypeError raised on that line by
+    the generated frame itself can be mapped back to its BinaryOp.
+    """
+
+    def __init__(self, node: FunctionDef, resolution: Resolution,
+                 unchecked: Collection[str] = ()):
+        self.node = node
+        self.resolution = resolution
+        # Parameters proven correct at every call; no check_type for them
+        self.unchecked = unchecked
+        self.lines: List[str] = []
+        self.indent = 2
+        self.depth = 0
+        self.temps = 0
+        self.consts: List[Any] = []
+        self.scopes: List[Any] = []
+        # Generated line number -> BinaryOp on it
+        self.operator_lines: Dict[int, BinaryOp] = {}
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"t{self.temps}"
+
+    def const(self, value: Any) -> str:
+        if value is None or isinstance(value, (bool, int, str)):
+            return repr(value)
+        if isinstance(value, float) and value == value and value not in (float('inf'), float('-inf')):
+            return repr(value)
+        self.consts.append(value)
+        return f"K[{len(self.consts) - 1}]"
+
+    def scope(self, scope: Any) -> str:
+        self.scopes.append(scope)
+        return f"S[{len(self.scopes) - 1}]"
+
+    def generate(self) -> str:
+        from .interpreter import TYPE_CHECKER
+        root = self.resolution.root
+        params = [f"p{index}=UNSET" for index in range(len(self.node.params))]
+        header = [
+            "def make(interp, K, S, Frame, UNSET, lookup, check_type, frame_names, "
+            "no_match, tail_call):",
+            f"    def native({', '.join(['caller'] + params + ['*_'])}):",
+            "        f0 = Frame(S[0], caller)",
+            "        v0 = f0.values",
+            "        root = f0.root",
+        ]
+        self.scopes.append(root)
+        for index, param in enumerate(self.node.params):
+            self.emit(f"if p{index} is not UNSET:")
+            self.indent += 1
+            if param.annotation and param.name not in self.unchecked:
+                self.guard(TYPE_CHECKER, f"p{index}", param.name, param.annotation)
+            self.emit(f"v0[{root.slots[param.name]}] = p{index}")
+            self.indent -= 1
+        self.block(self.node.body, "result")
+        self.emit("return result")
+        footer = ["    return native"]
+        # Operator lines are numbered from the start of the whole source
+        offset = len(header)
+        self.operator_lines = {line + offset: node for line, node in self.operator_lines.items()}
+        return "\n".join(header + self.lines + footer) + "\n"
+
+    def guard(self, checker: Any, value: str, name: str, annotation: str) -> None:
+        """Inline parameter check; check_type only raises the error"""
+        py_type = checker.python_type(annotation)
+        if py_type is object:
+            return
+        if py_type:
+            test = f"not isinstance({value}, {self.const(py_type)})"
+        elif checker.guard(annotation) is not None:
+            test = f"not {self.const(checker.guard(annotation))}({value})"
+        else:
+            test = "True"
+        self.emit(f"if {test}: check_type({name!r}, {value}, {annotation!r})")
+
+    # Statements
+
+    def block(self, statements: List[Node], target: Optional[str]) -> None:
+        """Run statements; the last one's value goes to target"""
+        if not statements:
+            if target:
+                self.emit(f"{target} = None")
+            return
+        last = len(statements) - 1
+        for index, stmt in enumerate(statements):
+            self.statement(stmt, target if index == last else None)
+
+    def scoped(self, key: object, statements: List[Node], target: Optional[str],
+               bind: Optional[Callable[[], None]] = None) -> None:
+        scope = self.resolution.scopes.get(key)
+        if scope is None:
+            self.block(statements, target)
+            return
+        self.open_frame(scope)
+        if bind:
+            bind()
+        self.block(statements, target)
+        self.depth -= 1
+
+    def open_frame(self, scope: Any) -> None:
+        depth = self.depth + 1
+        self.emit(f"f{depth} = Frame({self.scope(scope)}, f{self.depth})")
+        self.emit(f"v{depth} = f{depth}.values")
+        self.depth = depth
+
+    def statement(self, node: Node, target: Optional[str]) -> None:
+        if isinstance(node, Assignment):
+            value = self.expression(node.value)
+            if node.var_type:
+                self.emit(f"check_type({node.name!r}, {value}, {node.var_type!r})")
+            self.store(node, value)
+            if target:
+                self.emit(f"{target} = {value}")
+        elif isinstance(node, Print):
+            value = self.expression(node.value)
+            self.emit(f"print({value})")
+            if target:
+                self.emit(f"{target} = None")
+        elif isinstance(node, Return):
+            value = self.expression(node.value) if node.value is not None else "None"
+            self.emit(f"return {value}")
+        elif isinstance(node, If):
+            condition = self.expression(node.condition)
+            self.emit(f"if {condition}:")
+            self.indent += 1
+            self.scoped((node, 'then'), node.then, target)
+            self.emit("pass")
+            self.indent -= 1
+            self.emit("else:")
+            self.indent += 1
+            self.scoped((node, 'orelse'), node.orelse, target)
+            self.emit("pass")
+            self.indent -= 1
+        elif isinstance(node, PatternMatch):
+            self.pattern_match(node, target)
+        else:
+            value = self.expression(node)
+            if target:
+                self.emit(f"{target} = {value}")
+
+    def store(self, node: Node, value: str) -> None:
+        slot = self.resolution.stores.get(node)
+        if slot is None:
+            raise Unsupported(f"store outside a frame: {node.type}")
+        self.emit(f"v{self.depth}[{slot}] = {value}")
+
+    def pattern_match(self, node: PatternMatch, target: Optional[str]) -> None:
+        subject = self.expression(node.expression)
+        tree = decision_tree(node.cases)
+        index = self.temp()
+        for line in tree.source(subject, index, self.const):
+            self.emit(line)
+        self.emit(f"if {index} is None: no_match({self.const(node)})")
+        branches = tree.split_indices()
+        if branches is not None:
+            self.case_branches(node, branches, subject, index, target)
+
+    def case_branches(self, node: PatternMatch, branches: Any, subject: str, index: str,
+                      target: Optional[str]) -> None:
+        """Nested < tests on the case index down to each arm's body"""
+        if isinstance(branches, int):
+            case = node.cases[branches]
+            pattern = case.pattern
+            bind = None
+            if isinstance(pattern, (Binding, TypedPattern)):
+                bind = lambda: self.store(pattern, subject)
+            self.scoped(case, case.body, target, bind)
+            self.emit("pass")
+            return
+        pivot, below, rest = branches
+        self.emit(f"if {index} < {pivot}:")
+        self.indent += 1
+        self.case_branches(node, below, subject, index, target)
+        self.indent -= 1
+        self.emit("else:")
+        self.indent += 1
+        self.case_branches(node, rest, subject, index, target)
+        self.indent -= 1
+
+    # Expressions: return an atom (a literal or a temp) after emitting lines
+
+    def expression(self, node: Node) -> str:
+        if isinstance(node, (Number, String, Literal)):
+            return self.const(node.value)
+        if isinstance(node, Var):
+            return self.load(node)
+        if isinstance(node, BinaryOp):
+            if node.operator not in INLINE_OPERATORS:
+                raise Unsupported(f"operator {node.operator}")
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            result = self.temp()
+            self.operator_lines[len(self.lines) + 1] = node
+            self.emit(f"{result} = {left} {node.operator} {right}")
+            return result
+        if isinstance(node, FunctionCall):
+            function = self.expression(node.function)
+            args = [self.expression(arg) for arg in node.args]
+            result = self.temp()
+            if node in self.resolution.tail_calls:
+                # Handed back to the caller's trampoline unmade
+                packed = "".join(f"{arg}, " for arg in args)
+                self.emit(f"{result} = tail_call({function}, ({packed}), f{self.depth})")
+                return result
+            self.emit(f"interp.current_env = f{self.depth}")
+            self.emit(f"{result} = {function}({', '.join(args)})")
+            return result
+        raise Unsupported(node.type)
+
+    def load(self, node: Var) -> str:
+        name = node.name
+        outer = f"(lookup(root, {name!r}) if {name!r} not in frame_names else lookup(caller, {name!r}))"
+        address = self.resolution.reads.get(node)
+        if address is None or not address.candidates:
+            result = self.temp()
+            self.emit(f"{result} = {outer}")
+            return result
+        result = self.temp()
+        for index, (depth, slot) in enumerate(address.candidates):
+            frame = self.depth - depth
+            if index == 0:
+                self.emit(f"{result} = v{frame}[{slot}]")
+            else:
+                self.emit(f"if {result} is UNSET: {result} = v{frame}[{slot}]")
+        self.emit(f"if {result} is UNSET: {result} = {outer}")
+        return result
+
+class JIT:
+    """Call counting, promotion and per-tier timings for one Interpreter"""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, timing: bool = False):
+        self.threshold = max(threshold, 1)
+        self.timing = timing
+        self.stats: List[FunctionStats] = []
+
+    def track(self, node: FunctionDef) -> FunctionStats:
+        stats = FunctionStats(node.name)
+        self.stats.append(stats)
+        return stats
+
+    def promoted(self) -> List[str]:
+        return [stats.name for stats in self.stats if stats.promoted]
+
+    def promote(self, node: FunctionDef, resolution: Resolution, interpreter: Any,
+                stats: FunctionStats) -> Optional[Callable]:
+        """Native function for node, or None if it must stay interpreted"""
+        from .interpreter import (
+            Frame, UNSET, SPLRuntimeError, check_type, lookup
+        )
+        started = time.perf_counter()
+        try:
+            specialization = interpreter.specialization
+            unchecked = specialization.unchecked.get(node, ()) if specialization is not None else ()
+            codegen = FunctionCodegen(node, resolution, unchecked)
+            source = codegen.generate()
+            namespace: Dict[str, Any] = {}
+            exec(compile(source, f"<jit {node.name}>", "exec"), namespace)
+        except (Unsupported, SyntaxError, RecursionError) as e:
+            stats.reason = str(e) or type(e).__name__
+            return None
+        finally:
+            stats.compile_seconds += time.perf_counter() - started
+
+        def no_match(match_node: Node) -> None:
+            raise SPLRuntimeError("Hakuna mfano ulinganifu", match_node)
+
+        native = namespace['make'](
+            interpreter, codegen.consts, codegen.scopes, Frame, UNSET, lookup,
+            check_type, interpreter.frame_names, no_match, interpreter.tail_call
+        )
+        operator_lines = codegen.operator_lines
+
+        def call_native(*args: Any) -> Any:
+            try:
+                return native(*args)
+            except TypeError as e:
+                # Only operators raised directly by the generated frame; a
+                # TypeError from a callee passes through as in the closure tier
+                tb = e.__traceback__.tb_next
+                if tb is not None and tb.tb_next is None and tb.tb_lineno in operator_lines:
+                    raise SPLRuntimeError(f"Aina si sahihi: {e}", operator_lines[tb.tb_lineno])
+                raise
+
+        stats.promoted = True
+        if self.timing:
+            return self.timed(stats, call_native)
+        return call_native
+
+    @staticmethod
+    def timed(stats: FunctionStats, native: Callable) -> Callable:
+        def timed_native(*args: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return native(*args)
+            finally:
+                stats.native_calls += 1
+                stats.native_seconds += time.perf_counter() - started
+        return timed_native
+
+    def report(self) -> str:
+        lines = [f"jit (threshold {self.threshold}):"]
+        for stats in self.stats:
+            if not (stats.calls or stats.promoted):
+                continue
+            tier = "native" if stats.promoted else f"interpreted ({stats.reason or 'cold'})"
+            line = (f"  {stats.name:<20} {tier:<24} compile {stats.compile_seconds * 1000:6.2f} ms"
+                    f"  interpreted {stats.calls:>7} calls")
+            if self.timing:
+                line += (f" {stats.interpreted_seconds * 1000:8.1f} ms"
+                         f"  native {stats.native_calls:>7} calls {stats.native_seconds * 1000:8.1f} ms")
+            lines.append(line)
+        return "\n".join(lines)
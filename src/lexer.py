@@ -2,9 +2,14 @@
 """
 SPL Lexer - Enhanced Version
 """
+import codecs
+import mmap
+import os
 import re
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 @dataclass
 class Token:
@@ -52,17 +57,221 @@ OPERATOR_MAP = {
     '|>': 'PIPE',
 }
 
+# Single master pattern for the regex engine. Alternatives are tried in
+# order, so two-character operators win over their one-character prefixes
+# and MISMATCH catches anything the language does not know about.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<WS>[ \t]+)
+  | (?P<NEWLINE>\r?\n|\r)
+  | (?P<COMMENT>\#[^\r\n]*)
+  | (?P<NAME>[^\W\d]\w*)
+  | (?P<NUMBER>\d+(?:\.\d*)?)
+  | (?P<STRING>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<OP2>==|!=|<=|>=|=>|->|\|>)
+  | (?P<OP1>[-+*/=<>!|])
+  | (?P<PUNCT>[(){}:,\[\]])
+  | (?P<MISMATCH>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Integer ids for the compact token representation (fits an unsigned byte)
+TOKEN_TYPES = (
+    'EOF', 'INDENT', 'DEDENT', 'IDENTIFIER', 'INTEGER', 'FLOAT', 'STRING', 'OPERATOR',
+    *SWAHILI_KEYWORDS.values(),
+    *OPERATOR_MAP.values(),
+    '(', ')', '{', '}', ':', ',', '[', ']',
+)
+TOKEN_TYPE_IDS = {name: i for i, name in enumerate(TOKEN_TYPES)}
+
+LEXER_ENGINES = ('regex', 'char')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RawToken = Tuple[str, int, int, int, int]
+
 class SPLexer:
-    def __init__(self, source: str):
+    def __init__(self, source: str, engine: str = 'regex'):
+        if engine not in LEXER_ENGINES:
+            raise ValueError(f"Unknown lexer engine '{engine}'")
         self.source = source
+        self.engine = engine
         self.pos = 0
         self.line = 1
         self.col = 1
         self.indent_stack = [0]
         self.tokens: List[Token] = []
         self.current_indent = 0
+        self.line_start = 0
+        self.at_line_start = True
 
     def tokenize(self) -> List[Token]:
+        if self.engine == 'regex':
+            try:
+                return self.tokenize_regex()
+            except LexerError:
+                # The character loop is the reference implementation: it
+                # produces the canonical diagnostic, or recovers input the
+                # master pattern classifies differently (exotic Unicode).
+                self.reset()
+        return self.tokenize_chars()
+
+    def reset(self):
+        self.pos = 0
+        self.line = 1
+        self.col = 1
+        self.indent_stack = [0]
+        self.tokens = []
+        self.current_indent = 0
+        self.line_start = 0
+        self.at_line_start = True
+
+    # Regex engine
+
+    def tokenize_regex(self) -> List[Token]:
+        """Tokenize the whole source with the precompiled master pattern"""
+        source = self.source
+        self.tokens = [
+            Token(type_, source[start:end], line, column)
+            for type_, start, end, line, column in self.scan()
+        ]
+        return self.tokens
+
+    def scan(self, final: bool = True, endpos: Optional[int] = None) -> Iterator[RawToken]:
+        """Yield (type, start, end, line, column) tuples from the current position.
+
+        With ``final=False`` scanning stops in front of a quote that has no
+        closing partner yet, so the caller can append more source and resume.
+        """
+        source = self.source
+        keywords = SWAHILI_KEYWORDS
+        operators = OPERATOR_MAP
+        indent_stack = self.indent_stack
+        line = self.line
+        line_start = self.line_start
+        at_line_start = self.at_line_start
+        pos = len(source) if endpos is None else endpos
+
+        for match in TOKEN_PATTERN.finditer(source, self.pos, pos):
+            kind = match.lastgroup
+
+            if kind == 'WS':
+                if at_line_start and '\t' in match.group():
+                    column = match.start() + match.group().index('\t') - line_start + 1
+                    raise LexerError("Tabs not allowed for indentation", line, column)
+                continue
+
+            if kind == 'NEWLINE':
+                if match.group()[-1] == '\n':
+                    line += 1
+                line_start = match.end()
+                at_line_start = True
+                continue
+
+            if kind == 'COMMENT':
+                continue
+
+            start = match.start()
+            if kind == 'MISMATCH':
+                char = match.group()
+                if char in ('"', "'"):
+                    if not final:
+                        pos = start
+                        break
+                    raise LexerError("Unterminated string literal", line, start - line_start + 1)
+                raise LexerError(f"Unexpected character '{char}'", line, start - line_start + 1)
+
+            column = start - line_start + 1
+            if at_line_start:
+                indent = column - 1
+                if indent > indent_stack[-1]:
+                    indent_stack.append(indent)
+                    yield ('INDENT', start, start, line, column)
+                else:
+                    while indent < indent_stack[-1]:
+                        indent_stack.pop()
+                        yield ('DEDENT', start, start, line, column)
+                at_line_start = False
+
+            end = match.end()
+            if kind == 'NAME':
+                yield (keywords.get(match.group(), 'IDENTIFIER'), start, end, line, column)
+            elif kind == 'PUNCT':
+                yield (match.group(), start, end, line, column)
+            elif kind == 'OP1':
+                yield ('OPERATOR', start, end, line, column)
+            elif kind == 'NUMBER':
+                yield ('FLOAT' if '.' in match.group() else 'INTEGER', start, end, line, column)
+            elif kind == 'OP2':
+                yield (operators[match.group()], start, end, line, column)
+            else:
+                yield ('STRING', start + 1, end - 1, line, column)
+                newlines = match.group().count('\n')
+                if newlines:
+                    line += newlines
+                    line_start = start + match.group().rindex('\n') + 1
+
+        self.pos = pos
+        self.line = line
+        self.line_start = line_start
+        self.at_line_start = at_line_start
+
+        if final:
+            while len(indent_stack) > 1:
+                indent_stack.pop()
+                yield ('DEDENT', pos, pos, line, 1)
+            yield ('EOF', pos, pos, line, 1)
+
+    # Streaming mode
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[Token]:
+        """Lazily tokenize text chunks, carrying line and indent state across them.
+
+        Only complete lines are scanned; the unscanned tail of each chunk
+        (a partial line or an open string literal) is carried into the next
+        one, so memory is bounded by the chunk size rather than the source.
+
+        Carrying the tail copies it, so new chunks are collected until they
+        are at least as long as the tail. A line or string longer than a
+        chunk is then copied a logarithmic number of times, not once per
+        chunk.
+        """
+        self.reset()
+        self.source = ''
+        pending: List[str] = []
+        pending_size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size < len(self.source) - self.pos:
+                continue
+            self.source = self.source[self.pos:] + ''.join(pending)
+            pending.clear()
+            pending_size = 0
+            self.line_start -= self.pos
+            self.pos = 0
+            cut = max(self.source.rfind('\n'), self.source.rfind('\r')) + 1
+            if cut:
+                yield from self._materialize(self.scan(final=False, endpos=cut))
+
+        self.source = self.source[self.pos:] + ''.join(pending)
+        self.line_start -= self.pos
+        self.pos = 0
+        yield from self._materialize(self.scan())
+
+    # Compact mode
+
+    def tokenize_compact(self) -> 'CompactTokens':
+        """Tokenize into parallel arrays instead of Token objects"""
+        return CompactTokens(self.source, self.scan())
+
+    def _materialize(self, raw_tokens: Iterator[RawToken]) -> Iterator[Token]:
+        source = self.source
+        for type_, start, end, line, column in raw_tokens:
+            yield Token(type_, source[start:end], line, column)
+
+    # Character loop engine (reference implementation and fallback)
+
+    def tokenize_chars(self) -> List[Token]:
+        """Tokenize the whole source one character at a time"""
         while self.pos < len(self.source):
             self.handle_line()
         
@@ -72,9 +281,15 @@ class SPLexer:
 
     def handle_line(self):
         self.current_indent = self.calculate_indent()
-        self.handle_indentation()
+        # Blank and comment-only lines do not take part in indentation
+        if not self.at_line_end() and self.peek() != '#':
+            self.handle_indentation()
         
-        while not self.is_newline():
+        while not self.at_line_end():
+            if self.peek() in (' ', '\t'):
+                self.advance()
+                continue
+
             if self.peek() == '#':
                 self.skip_comment()
                 break
@@ -125,7 +340,7 @@ class SPLexer:
         raise LexerError(f"Unexpected character '{char}'", self.line, self.col)
 
     def read_number(self) -> Token:
-        start = self.pos
+        start, line, col = self.pos, self.line, self.col
         is_float = False
         while self.peek().isdigit() or self.peek() == '.':
             if self.peek() == '.':
@@ -134,9 +349,10 @@ class SPLexer:
                 is_float = True
             self.advance()
         value = self.source[start:self.pos]
-        return self.make_token('FLOAT' if is_float else 'INTEGER', value)
+        return Token('FLOAT' if is_float else 'INTEGER', value, line, col)
 
     def read_string(self) -> Token:
+        line, col = self.line, self.col
         quote = self.peek()
         self.advance()
         start = self.pos
@@ -152,21 +368,18 @@ class SPLexer:
             elif char == quote:
                 value = self.source[start:self.pos]
                 self.advance()
-                return self.make_token('STRING', value)
+                return Token('STRING', value, line, col)
             
             self.advance()
         
         raise LexerError("Unterminated string literal", self.line, self.col)
 
     def read_identifier(self) -> Token:
-        start = self.pos
+        start, line, col = self.pos, self.line, self.col
         while self.peek().isalnum() or self.peek() == '_':
             self.advance()
         value = self.source[start:self.pos]
-        return self.make_token(
-            SWAHILI_KEYWORDS.get(value, 'IDENTIFIER'),
-            value
-        )
+        return Token(SWAHILI_KEYWORDS.get(value, 'IDENTIFIER'), value, line, col)
 
     def make_token(self, type_: str, value: str) -> Token:
         token = Token(type_, value, self.line, self.col)
@@ -175,7 +388,7 @@ class SPLexer:
         return token
 
     def skip_comment(self):
-        while self.peek() not in ('\n', '\r'):
+        while not self.at_line_end():
             self.advance()
 
     def advance(self):
@@ -194,6 +407,9 @@ class SPLexer:
     def is_newline(self) -> bool:
         return self.source[self.pos] in ('\n', '\r')
 
+    def at_line_end(self) -> bool:
+        return self.pos >= len(self.source) or self.is_newline()
+
     def peek(self) -> str:
         return self.source[self.pos] if self.pos < len(self.source) else ''
 
@@ -205,6 +421,268 @@ class SPLexer:
             self.indent_stack.pop()
             self.add_token('DEDENT', '')
 
+class TokenView:
+    """Token-compatible view into a CompactTokens stream; the value is sliced on access"""
+    __slots__ = ('stream', 'index')
+
+    def __init__(self, stream: 'CompactTokens', index: int):
+        self.stream = stream
+        self.index = index
+
+    @property
+    def type(self) -> str:
+        return TOKEN_TYPES[self.stream.types[self.index]]
+
+    @property
+    def value(self) -> str:
+        return self.stream.value_of(self.index)
+
+    @property
+    def line(self) -> int:
+        return self.stream.lines[self.index]
+
+    @property
+    def column(self) -> int:
+        return self.stream.column_of(self.index)
+
+    def __repr__(self):
+        return f"{self.type}:{self.value} ({self.line}:{self.column})"
+
+class CompactTokens:
+    """Token stream stored as parallel arrays of type ids, source offsets and lines.
+
+    No per-token objects or substrings are kept: values are sliced from the
+    source buffer and columns are derived on demand from the offset at which
+    each run of tokens sharing a line start begins (roughly one per line).
+    """
+    __slots__ = ('source', 'types', 'starts', 'ends', 'lines',
+                 'segment_tokens', 'segment_offsets')
+
+    def __init__(self, source: str, raw_tokens: Iterable[RawToken] = ()):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.segment_tokens = array('I')
+        self.segment_offsets = array('I')
+
+        type_ids = TOKEN_TYPE_IDS
+        string_id = type_ids['STRING']
+        line_offset = -1
+        for index, (type_, start, end, line, column) in enumerate(raw_tokens):
+            type_id = type_ids[type_]
+            self.types.append(type_id)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.lines.append(line)
+            # String starts point past the opening quote
+            offset = start - column + (type_id != string_id)
+            if offset != line_offset:
+                line_offset = offset
+                self.segment_tokens.append(index)
+                self.segment_offsets.append(offset)
+
+    @classmethod
+    def from_source(cls, source: str) -> 'CompactTokens':
+        return SPLexer(source).tokenize_compact()
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> TokenView:
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def type_of(self, index: int) -> str:
+        return TOKEN_TYPES[self.types[index]]
+
+    def value_of(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def column_of(self, index: int) -> int:
+        segment = bisect_right(self.segment_tokens, index) - 1
+        column = self.starts[index] - self.segment_offsets[segment] + 1
+        return column - 1 if self.types[index] == TOKEN_TYPE_IDS['STRING'] else column
+
+    def to_tokens(self) -> List[Token]:
+        return [Token(view.type, view.value, view.line, view.column) for view in self]
+
+    def nbytes(self) -> int:
+        """Memory held by the arrays (the source buffer is shared, not counted)"""
+        return sum(
+            len(arr) * arr.itemsize
+            for arr in (self.types, self.starts, self.ends, self.lines,
+                        self.segment_tokens, self.segment_offsets)
+        )
+
+def split_lines(text: str) -> List[str]:
+    """Split at '\\n' keeping line ends; the last line is the (possibly empty) tail"""
+    parts = text.split('\n')
+    return [part + '\n' for part in parts[:-1]] + [parts[-1]]
+
+Position = Tuple[int, int]
+
+class IncrementalLexer:
+    """Lexer for documents that change over time (REPL sessions, editors).
+
+    The document is kept as lines split at '\\n', so line ``i`` always carries
+    line number ``i + 1``. Each line records a checkpoint: the indent stack
+    at its start, or None when it starts inside a multi-line string. An edit
+    re-tokenizes from the nearest checkpoint and stops at the first line after
+    the edit whose checkpoint is unchanged, so the work done depends on the
+    size of the edit rather than the size of the document.
+    """
+    def __init__(self, source: str = ''):
+        self.lines: List[str] = ['']
+        self.states: List[Optional[Tuple[int, ...]]] = [(0,)]
+        self.line_tokens: List[List[Token]] = [[]]
+        self.final_stack: Tuple[int, ...] = (0,)
+        if source:
+            self.edit((1, 1), (1, 1), source)
+
+    @property
+    def source(self) -> str:
+        return ''.join(self.lines)
+
+    @property
+    def end(self) -> Position:
+        return (len(self.lines), len(self.lines[-1]) + 1)
+
+    def append(self, text: str) -> range:
+        return self.edit(self.end, self.end, text)
+
+    def edit(self, start: Position, end: Position, text: str) -> range:
+        """Replace the text between two 1-based (line, column) positions.
+
+        Returns the range of line numbers that were re-tokenized. On a
+        LexerError the document is left untouched.
+        """
+        first, last = start[0] - 1, end[0] - 1
+        if not (0 <= first <= last < len(self.lines)):
+            raise ValueError(f"Invalid edit range {start}-{end}")
+        region = ''.join(self.lines[first:last + 1])
+        begin = start[1] - 1
+        finish = len(region) - len(self.lines[last]) + end[1] - 1
+        if not (0 <= begin <= len(self.lines[first]) and begin <= finish <= len(region)):
+            raise ValueError(f"Invalid edit range {start}-{end}")
+
+        region = region[:begin] + text + region[finish:]
+        if last + 1 < len(self.lines) and not region.endswith('\n'):
+            # The edit removed a line break: the following line joins in
+            last += 1
+            region += self.lines[last]
+        new_lines = split_lines(region)
+        if last + 1 < len(self.lines):
+            new_lines.pop()  # the empty tail is the start of the next line
+
+        shift = (last + 1 - first) - len(new_lines)
+        edit_end = first + len(new_lines)
+        total = len(self.lines) - shift
+
+        def line_at(index: int) -> str:
+            if index < first:
+                return self.lines[index]
+            if index < edit_end:
+                return new_lines[index - first]
+            return self.lines[index + shift]
+
+        # Resume from the nearest checkpoint that is not inside a string
+        index = first
+        while self.states[index] is None:
+            index -= 1
+        resume = index
+        state = self.states[index]
+        new_states: List[Optional[Tuple[int, ...]]] = []
+        new_tokens: List[List[Token]] = []
+
+        while index < total:
+            if index >= edit_end and self.states[index + shift] == state:
+                break  # re-synchronized with the old token stream
+
+            lexer = SPLexer(line_at(index))
+            lexer.line = index + 1
+            lexer.indent_stack = list(state)
+            tokens = list(lexer._materialize(lexer.scan(final=False)))
+            new_states.append(state)
+            new_tokens.append(tokens)
+            index += 1
+
+            while lexer.pos < len(lexer.source):
+                # Open string literal: keep pulling lines in until it closes
+                if index >= total:
+                    raise LexerError(
+                        "Unterminated string literal", lexer.line, lexer.pos - lexer.line_start + 1
+                    )
+                lexer.source += line_at(index)
+                tokens.extend(lexer._materialize(lexer.scan(final=False)))
+                new_states.append(None)
+                new_tokens.append([])
+                index += 1
+
+            state = tuple(lexer.indent_stack)
+
+        if index >= total:
+            self.final_stack = state
+        self.lines[first:last + 1] = new_lines
+        self.states[resume:index + shift] = new_states
+        self.line_tokens[resume:index + shift] = new_tokens
+        return range(resume + 1, index + 1)
+
+    def tokens_in(self, first_line: int, last_line: int) -> List[Token]:
+        """Tokens of a line range, with line numbers shifted by earlier edits fixed up"""
+        result = []
+        for index in range(first_line - 1, min(last_line, len(self.lines))):
+            tokens = self.line_tokens[index]
+            if tokens and tokens[0].line != index + 1:
+                delta = index + 1 - tokens[0].line
+                for token in tokens:
+                    token.line += delta
+            result.extend(tokens)
+        return result
+
+    def eof_tokens(self) -> List[Token]:
+        line = len(self.lines)
+        return [Token('DEDENT', '', line, 1) for _ in self.final_stack[1:]] + [Token('EOF', '', line, 1)]
+
+    @property
+    def tokens(self) -> List[Token]:
+        return self.tokens_in(1, len(self.lines)) + self.eof_tokens()
+
+# Default entry point: regex engine with the character loop as fallback
+Lexer = SPLexer
+
+def read_chunks(source: Any, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text chunks from a path, mmap, bytes buffer or file object"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from read_chunks(mapped, chunk_size)
+        return
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    if isinstance(source, (mmap.mmap, bytes, bytearray, memoryview)):
+        for offset in range(0, len(source), chunk_size):
+            yield decoder.decode(source[offset:offset + chunk_size])
+    else:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def stream_tokens(source: Any, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Token]:
+    """Lazily tokenize a file without reading it into memory first"""
+    return SPLexer('').stream(read_chunks(source, chunk_size))
+
 if __name__ == '__main__':
     sample_code = """
 kazi jumla(a: nambari, b: nambari) -> nambari {
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+SPL Memoization - purity analysis and bounded caches for kazi results
+
+pure_functions() proves which top-level kazi compute their result from
+their arguments alone: no chapisha, no anzisha, no I/O builtins, and no
+read of a name that is not a parameter, a local already stored, a pure
+builtin or another pure kazi. Stores in a kazi always land in its own
+frame, so outer variables cannot change. A Memoizer wraps such kazi in
+an LRU cache keyed by argument values.
+
+Impure but slow kazi can opt in explicitly from SPL with
+kumbuka(kitendo, muda), which caches for muda seconds; kumbukumbu()
+returns the hit and miss counters of every cache.
+"""
+import time
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .ast_nodes import (
+    Node, Var, Assignment, FunctionCall, FunctionDef, Print, Return, If, Spawn,
+    PatternMatch, Binding, TypedPattern
+)
+
+DEFAULT_CACHE_SIZE = 256
+
+# Builtins whose result depends only on their arguments and is immutable;
+# orodha, kamusi and gawa build a fresh list or dict per call, which a
+# cache would hand out shared between callers
+PURE_BUILTINS = frozenset((
+    'urefu', 'jumlisha', 'kiasi', 'kipeo', 'mzizi',
+    'unganisha', 'herufi_kubwa', 'herufi_ndogo', 'kamili', 'desimali', 'mshono',
+    'kweli', 'sikweli', 'hakuna'
+))
+
+def bound_names(statements: List[Node]) -> Optional[Set[str]]:
+    """Every name stored anywhere in statements, nested blocks included, or
+    None if a lazily parsed kazi body hides some of them"""
+    names = set()
+    stack = list(statements)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Assignment, FunctionDef)):
+            names.add(node.name)
+        if isinstance(node, FunctionDef):
+            names.update(param.name for param in node.params)
+            if node.lazy_body is not None:
+                return None
+        elif isinstance(node, (Binding, TypedPattern)):
+            names.add(node.name)
+        for field in node.fields:
+            value = getattr(node, field, None)
+            if isinstance(value, Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, Node))
+    return names
+
+class PurityChecker:
+    """Decide whether one kazi body is pure, given which names are"""
+
+    def __init__(self, pure_names: Set[str]):
+        self.pure_names = pure_names
+
+    def check(self, node: FunctionDef) -> bool:
+        return self.block(node.body, {param.name for param in node.params})
+
+    def block(self, statements: List[Node], bound: Set[str]) -> bool:
+        # Names stored in a block are visible only after the store, and only
+        # inside it; reading one earlier would fall through to the caller
+        bound = set(bound)
+        for stmt in statements:
+            if isinstance(stmt, (Print, Spawn, FunctionDef)):
+                return False
+            if isinstance(stmt, Assignment):
+                if not self.expression(stmt.value, bound):
+                    return False
+                bound.add(stmt.name)
+            elif isinstance(stmt, Return):
+                if stmt.value is not None and not self.expression(stmt.value, bound):
+                    return False
+            elif isinstance(stmt, If):
+                if not (self.expression(stmt.condition, bound)
+                        and self.block(stmt.then, bound) and self.block(stmt.orelse, bound)):
+                    return False
+            elif isinstance(stmt, PatternMatch):
+                if not self.expression(stmt.expression, bound):
+                    return False
+                for case in stmt.cases:
+                    pattern = case.pattern
+                    names = {pattern.name} if isinstance(pattern, (Binding, TypedPattern)) else set()
+                    if not self.block(case.body, bound | names):
+                        return False
+            elif not self.expression(stmt, bound):
+                return False
+        return True
+
+    def expression(self, node: Node, bound: Set[str]) -> bool:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Var):
+                if node.name not in bound and node.name not in self.pure_names:
+                    return False
+            elif isinstance(node, FunctionCall):
+                # Only named callees; a parameter could be any kazi
+                function = node.function
+                if not isinstance(function, Var) or function.name in bound:
+                    return False
+                stack.append(function)
+                stack.extend(node.args)
+            elif isinstance(node, (Print, Spawn, FunctionDef, Assignment, If, PatternMatch)):
+                return False
+            else:
+                for field in node.fields:
+                    value = getattr(node, field, None)
+                    if isinstance(value, Node):
+                        stack.append(value)
+                    elif isinstance(value, list):
+                        stack.extend(item for item in value if isinstance(item, Node))
+        return True
+
+def single_definitions(statements: List[Node]
+                       ) -> Optional[Tuple[Dict[str, FunctionDef], Set[str]]]:
+    """Top-level kazi whose name is stored nowhere else, so every use of
+    the name reaches that one definition, and every other stored name;
+    None if a lazily parsed kazi body hides some stores"""
+    definitions: Dict[str, List[FunctionDef]] = {}
+    bodies: List[Node] = []
+    for stmt in statements:
+        if isinstance(stmt, FunctionDef):
+            definitions.setdefault(stmt.name, []).append(stmt)
+            if stmt.lazy_body is not None:
+                # Parsing it now would defeat --lazy; its stores are unknown
+                return None
+            bodies.extend(stmt.body)
+        else:
+            bodies.append(stmt)
+    # Stored anywhere other than one top-level kazi definition
+    rebound = bound_names(bodies)
+    if rebound is None:
+        return None
+    rebound.update(param.name for nodes in definitions.values() for node in nodes
+                   for param in node.params)
+    single = {
+        name: nodes[0] for name, nodes in definitions.items()
+        if len(nodes) == 1 and name not in rebound
+    }
+    rebound.update(name for name in definitions if name not in single)
+    return single, rebound
+
+def pure_functions(statements: List[Node]) -> Set[FunctionDef]:
+    """Top-level kazi proven pure, assuming nothing else rebinds their names.
+
+    Candidates come from single_definitions(). Starting from all of them,
+    kazi that fail the check or call one that failed are dropped until
+    nothing changes.
+    """
+    found = single_definitions(statements)
+    if found is None:
+        return set()
+    candidates, rebound = found
+    candidates = dict(candidates)
+    builtins = {name for name in PURE_BUILTINS if name not in rebound and name not in candidates}
+    while True:
+        checker = PurityChecker(builtins | set(candidates))
+        impure = [name for name, node in candidates.items() if not checker.check(node)]
+        if not impure:
+            return set(candidates.values())
+        for name in impure:
+            del candidates[name]
+
+class LRUCache:
+    """Thread-safe mapping bounded by entry count and optionally by age"""
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_CACHE_SIZE, ttl: Optional[float] = None):
+        # None means unbounded
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: 'OrderedDict[Any, Tuple[Any, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._lock = Lock()
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, stored = entry
+                if self.ttl is None or time.monotonic() - stored < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+                self.expired += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            if self.maxsize is not None and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+            'expired': self.expired, 'size': len(self.entries),
+        }
+
+def cache_key(args: tuple) -> Optional[tuple]:
+    """Hashable key for args, or None; 1, 1.0 and kweli stay distinct"""
+    key = tuple((type(arg), arg) for arg in args)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+def arity_key(args: tuple, arity: Optional[int]) -> Optional[tuple]:
+    """cache_key(args), or None when a cache for arity arguments skips them"""
+    if arity is not None and len(args) != arity:
+        return None
+    return cache_key(args)
+
+class Memoizer:
+    """Caches of one interpreter, one per wrapped kazi"""
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_CACHE_SIZE, auto: bool = False):
+        self.maxsize = maxsize
+        # Memoize kazi pure_functions() proves pure
+        self.auto = auto
+        self.pure: Set[FunctionDef] = set()
+        # (name, cache) per wrap(); kazi sharing a name keep their own
+        # entries and counts
+        self.caches: List[Tuple[str, LRUCache]] = []
+
+    def analyze(self, statements: List[Node]) -> None:
+        if self.auto:
+            self.pure |= pure_functions(statements)
+
+    def wrap(self, name: str, function: Callable, arity: Optional[int] = None,
+             maxsize: Optional[int] = None, ttl: Optional[float] = None,
+             tail: bool = False) -> Callable:
+        """function behind a cache; calls with other than arity arguments,
+        or with unhashable ones, go straight through"""
+        cache = LRUCache(self.maxsize if maxsize is None else maxsize, ttl)
+        self.caches.append((name, cache))
+
+        def memoized(*args: Any) -> Any:
+            key = arity_key(args, arity)
+            if key is None:
+                return function(*args)
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = function(*args)
+            cache.put(key, value)
+            return value
+        memoized.__name__ = name
+        if tail:
+            memoized.spl_invoke = self.settle(cache, function.spl_invoke, arity)
+        return memoized
+
+    def settle(self, cache: LRUCache, invoke: Callable, arity: Optional[int]) -> Callable:
+        """spl_invoke for a cached kazi: runs a chain of tail calls to the
+        end, looking each cached call up first and storing the final value
+        under every one that missed, since all of them return it"""
+        from .interpreter import TailCall
+
+        def cached_invoke(args: tuple, env: Any) -> Any:
+            pending = []
+            result = TailCall(cached_invoke, args, env)
+            while type(result) is TailCall:
+                memo = getattr(result.invoke, 'spl_memo', None)
+                if memo is None:
+                    result = result.invoke(result.args, result.env)
+                    continue
+                # A tail call to this or another cached kazi
+                owner, inner, owner_arity = memo
+                key = arity_key(result.args, owner_arity)
+                if key is not None:
+                    found, value = owner.get(key)
+                    if found:
+                        result = value
+                        break
+                    pending.append((owner, key))
+                result = inner(result.args, result.env)
+            for owner, key in pending:
+                owner.put(key, result)
+            return result
+        cached_invoke.spl_memo = (cache, invoke, arity)
+        return cached_invoke
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counts per cache, by name; repeated names get #1, #2, ... in
+        definition order"""
+        totals = Counter(name for name, _ in self.caches)
+        seen: Counter = Counter()
+        result = {}
+        for name, cache in self.caches:
+            if totals[name] > 1:
+                seen[name] += 1
+                name = f"{name}#{seen[name]}"
+            result[name] = cache.stats()
+        return result
+
+    def builtins(self) -> Dict[str, Callable]:
+        """kumbuka and kumbukumbu, bound to this Memoizer"""
+        def kumbuka(kitendo: Callable, muda: Optional[float] = None,
+                    ukubwa: Optional[int] = None) -> Callable:
+            """Kumbuka - Cache results of kitendo, for muda seconds if given"""
+            name = getattr(kitendo, '__name__', repr(kitendo))
+            return self.wrap(name, kitendo, maxsize=ukubwa, ttl=muda)
+
+        def kumbukumbu() -> Dict[str, Dict[str, int]]:
+            """Kumbukumbu - Hit and miss counts of every cache"""
+            return self.stats()
+        return {'kumbuka': kumbuka, 'kumbukumbu': kumbukumbu}
+
+    def report(self) -> str:
+        lines = [f"memo (size {self.maxsize or 'unbounded'}):"]
+        for name, stats in self.stats().items():
+            calls = stats['hits'] + stats['misses']
+            rate = stats['hits'] / calls * 100 if calls else 0.0
+            lines.append(f"  {name:<20} hits {stats['hits']:>8}  misses {stats['misses']:>8}"
+                         f"  ({rate:5.1f}%)  evictions {stats['evictions']:>6}"
+                         f"  expired {stats['expired']:>6}")
+        return "\n".join(lines)
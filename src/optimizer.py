@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+SPL Optimizer - AST passes run between Parser.parse() and execution
+
+Levels: 0 leaves the tree alone, 1 runs the passes that never change
+behaviour (constant folding, dead kama branches, lingana pruning), 2 also
+drops unused pure expression statements, assuming variable reads and
+operators in them do not fail.
+"""
+import operator
+from typing import Any, Dict, List, Optional
+
+from .ast_nodes import (
+    Node, NodeTransformer, Number, String, Var, BinaryOp, Assignment,
+    FunctionDef, If, PatternMatch, Literal, Wildcard, Binding,
+    iter_nodes
+)
+
+OPTIMIZATION_LEVELS = (0, 1, 2)
+
+FOLDABLE_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+# Folded strings longer than this stay as expressions, like CPython's limit
+MAX_FOLDED_STRING = 4096
+
+def count_nodes(node: Any) -> int:
+    return sum(1 for _ in iter_nodes(node))
+
+def constant_value(node: Node) -> Any:
+    """(True, value) for literal nodes, (False, None) otherwise"""
+    if isinstance(node, (Number, String)):
+        return True, node.value
+    return False, None
+
+def binds_names(statements: List[Node]) -> bool:
+    """Whether running statements directly would define names in the block scope"""
+    return any(isinstance(stmt, (Assignment, FunctionDef)) for stmt in statements)
+
+class OptimizerPass(NodeTransformer):
+    """Base pass: counts removed nodes and leaves unparsed lazy bodies alone"""
+    name = 'pass'
+
+    def __init__(self):
+        self.removed = 0
+
+    def run(self, ast: List[Node]) -> List[Node]:
+        return self.visit_block(ast)
+
+    def visit_FunctionDef(self, node: FunctionDef) -> FunctionDef:
+        if node.parsed:
+            node.body = self.visit_block(node.body)
+        return node
+
+class ConstantFolder(OptimizerPass):
+    """Evaluate operators whose operands are literals"""
+    name = 'constant_folding'
+
+    def visit_BinaryOp(self, node: BinaryOp) -> Node:
+        # Walk the left spine iteratively: generated chains can be very long
+        spine = []
+        while isinstance(node, BinaryOp):
+            spine.append(node)
+            node = node.left
+        left = self.visit(node)
+        for op_node in reversed(spine):
+            op_node.left = left
+            op_node.right = self.visit(op_node.right)
+            left = self.fold(op_node)
+        return left
+
+    def fold(self, node: BinaryOp) -> Node:
+        is_left, left = constant_value(node.left)
+        is_right, right = constant_value(node.right)
+        if not (is_left and is_right):
+            return node
+        try:
+            value = FOLDABLE_OPS[node.operator](left, right)
+        except (KeyError, ArithmeticError, TypeError, ValueError):
+            # Leave the error to happen at run time, with its location
+            return node
+        if isinstance(value, str):
+            if len(value) > MAX_FOLDED_STRING:
+                return node
+            folded = String(value, node.loc)
+        else:
+            folded = Number(value, node.loc)
+        self.removed += 2
+        return folded
+
+class DeadBranchEliminator(OptimizerPass):
+    """Drop the branch of a kama whose condition is a literal"""
+    name = 'dead_branches'
+
+    def visit_block(self, statements: List[Node]) -> List[Node]:
+        result = []
+        last = len(statements) - 1
+        for index, stmt in enumerate(statements):
+            new = self.visit(stmt)
+            if isinstance(new, If):
+                new = self.eliminate(new, index == last)
+            if isinstance(new, list):
+                result.extend(new)
+            elif new is not None:
+                result.append(new)
+        return result
+
+    def eliminate(self, node: If, is_last: bool) -> Any:
+        is_constant, value = constant_value(node.condition)
+        if not is_constant:
+            return node
+        taken, dead = (node.then, node.orelse) if value else (node.orelse, node.then)
+        self.removed += count_nodes(dead)
+        # Branches run in their own scope and a block's last statement is its
+        # value, so inline only when neither can be observed
+        if binds_names(taken) or (is_last and not taken):
+            node.then, node.orelse = taken, []
+            if not value:
+                node.condition = Number(True, node.condition.loc)
+            return node
+        self.removed += 1 + count_nodes(node.condition)
+        return taken
+
+class MatchPruner(OptimizerPass):
+    """Remove lingana arms that can never be selected"""
+    name = 'match_pruning'
+
+    def visit_PatternMatch(self, node: PatternMatch) -> Node:
+        self.generic_visit(node)
+        is_constant, subject = constant_value(node.expression)
+        kept = []
+        seen_literals = []
+        for case in node.cases:
+            pattern = case.pattern
+            if isinstance(pattern, Literal):
+                # Unreachable after an equal literal; with a literal subject
+                # the comparison is known now
+                if any(pattern.value == seen for seen in seen_literals):
+                    continue
+                if is_constant and pattern.value != subject:
+                    continue
+                seen_literals.append(pattern.value)
+                kept.append(case)
+                if is_constant:
+                    break
+            else:
+                kept.append(case)
+                if isinstance(pattern, (Wildcard, Binding)):
+                    break
+        kept_ids = {id(case) for case in kept}
+        self.removed += sum(count_nodes(case) for case in node.cases if id(case) not in kept_ids)
+        node.cases = kept
+        return node
+
+class UnusedExpressionRemover(OptimizerPass):
+    """Drop expression statements whose value is never used (level 2)"""
+    name = 'unused_expressions'
+
+    def visit_block(self, statements: List[Node]) -> List[Node]:
+        statements = self.visit_list(statements)
+        last = len(statements) - 1
+        result = []
+        for index, stmt in enumerate(statements):
+            # The last statement is the block's value
+            if index != last and self.is_pure(stmt):
+                self.removed += count_nodes(stmt)
+                continue
+            result.append(stmt)
+        return result
+
+    def is_pure(self, node: Node) -> bool:
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, BinaryOp):
+                stack.append(item.left)
+                stack.append(item.right)
+            elif not isinstance(item, (Number, String, Var)):
+                return False
+        return True
+
+PASSES = {
+    1: (ConstantFolder, DeadBranchEliminator, MatchPruner),
+    2: (ConstantFolder, DeadBranchEliminator, MatchPruner, UnusedExpressionRemover),
+}
+
+def optimize_ast(ast: List[Node], level: int = 1,
+                 report: Optional[Dict[str, int]] = None) -> List[Node]:
+    """Optimize a parsed program in place and return it.
+
+    When report is given it receives the number of nodes each pass removed.
+    """
+    if level not in OPTIMIZATION_LEVELS:
+        raise ValueError(f"Unknown optimization level: {level}")
+    for pass_class in PASSES.get(level, ()):
+        optimizer_pass = pass_class()
+        ast = optimizer_pass.run(ast)
+        if report is not None:
+            report[optimizer_pass.name] = report.get(optimizer_pass.name, 0) + optimizer_pass.removed
+    return ast
+
+def format_report(report: Dict[str, int]) -> str:
+    if not report:
+        return "optimizer: no passes run"
+    parts = ", ".join(f"{name} -{count}" for name, count in report.items())
+    return f"optimizer: {parts} (total -{sum(report.values())} nodes)"
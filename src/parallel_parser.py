@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+SPL Parallel Parser - parse top-level segments of large files in a process pool
+"""
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple
+
+from . import splc
+from .ast_nodes import Node
+from .lexer import SWAHILI_KEYWORDS, SPLexer
+from .parser import Parser
+
+# Keywords that always begin a statement; after a top-level '}' they start
+# a new top-level statement, so the file can be cut in front of them
+SPLIT_KEYWORDS = frozenset(('FUNCTION', 'PRINT', 'IF', 'SPAWN', 'MATCH', 'RETURN'))
+
+# Boundary scan: far fewer matches than tokens. Strings and comments are
+# matched whole so brackets and keywords inside them are ignored.
+SPLIT_PATTERN = re.compile(r"""
+    (?P<STRING>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<COMMENT>\#[^\r\n]*)
+  | (?P<OPEN>[{(\[])
+  | (?P<CLOSE>[})\]])
+  | (?P<KEYWORD>\b(?:%s)\b)
+""" % "|".join(word for word, kind in SWAHILI_KEYWORDS.items() if kind in SPLIT_KEYWORDS),
+    re.VERBOSE | re.DOTALL)
+
+# Segments per worker, so uneven segments still balance across the pool
+SEGMENTS_PER_JOB = 4
+# Below this many characters a pool costs more than it saves
+MIN_PARALLEL_SIZE = 64 * 1024
+
+class SplitPoint(NamedTuple):
+    """Lexer state at the first token of a top-level statement"""
+    offset: int
+    line: int
+    line_start: int
+    at_line_start: bool
+
+class Segment(NamedTuple):
+    start: SplitPoint
+    end: int
+
+@dataclass
+class ParseTimings:
+    """Wall-clock seconds per phase of a parallel parse"""
+    jobs: int
+    segments: int = 0
+    split: float = 0.0
+    parse: float = 0.0
+    merge: float = 0.0
+    serial: bool = False
+
+    def format(self) -> str:
+        mode = "serial" if self.serial else f"{self.segments} segments on {self.jobs} workers"
+        total = self.split + self.parse + self.merge
+        return (f"parse ({mode}): split {self.split * 1000:.1f} ms, "
+                f"parse {self.parse * 1000:.1f} ms, merge {self.merge * 1000:.1f} ms, "
+                f"total {total * 1000:.1f} ms")
+
+def find_split_points(source: str) -> List[SplitPoint]:
+    """Statement starts that begin a line after a top-level '}'.
+
+    Only whitespace and comments may separate the two, so the keyword cannot
+    be the unbraced body of a kama/anzisha/kazi and the lexer state there is
+    fully determined by the text: line count and the preceding line break.
+    """
+    points = [SplitPoint(0, 1, 0, True)]
+    depth = 0
+    # End of the top-level '}' a split may follow, or -1
+    close_end = -1
+    gap_start = 0
+    line, counted = 1, 0
+    for match in SPLIT_PATTERN.finditer(source):
+        kind = match.lastgroup
+        start = match.start()
+        if kind == 'COMMENT':
+            if close_end >= 0 and not source[gap_start:start].isspace() and gap_start != start:
+                close_end = -1
+            gap_start = match.end()
+            continue
+        if kind == 'KEYWORD' and depth == 0 and close_end >= 0:
+            gap = source[gap_start:start]
+            # The last line break after the '}' starts the keyword's line
+            line_start = max(source.rfind('\n', close_end, start),
+                             source.rfind('\r', close_end, start)) + 1
+            if (not gap or gap.isspace()) and line_start:
+                line += source.count('\n', counted, start)
+                counted = start
+                points.append(SplitPoint(start, line, line_start, True))
+        close_end = -1
+        if kind == 'OPEN':
+            depth += 1
+        elif kind == 'CLOSE':
+            depth -= 1
+            if depth == 0 and match.group() == '}':
+                close_end = gap_start = match.end()
+    return points
+
+def plan_segments(points: List[SplitPoint], size: int, count: int) -> List[Segment]:
+    """Group split points into about count segments of similar length"""
+    target = max(size // max(count, 1), 1)
+    segments = []
+    current = points[0]
+    for point in points[1:]:
+        if point.offset - current.offset >= target:
+            segments.append(Segment(current, point.offset))
+            current = point
+    segments.append(Segment(current, size))
+    return segments
+
+_worker_source: Optional[str] = None
+
+def _init_worker(source: str) -> None:
+    # Sent once per worker instead of once per segment
+    global _worker_source
+    _worker_source = source
+
+def parse_segment(source: str, segment: Segment) -> List[Node]:
+    """Lex and parse one segment with the lexer state of its first token"""
+    start, end = segment
+    lexer = SPLexer(source)
+    lexer.pos = start.offset
+    lexer.line = start.line
+    lexer.line_start = start.line_start
+    lexer.at_line_start = start.at_line_start
+    tokens = list(lexer._materialize(lexer.scan(endpos=end)))
+    return Parser(tokens).parse()
+
+def _parse_segment_job(segment: Segment) -> bytes:
+    # Flat .splc encoding: cheap to transfer and safe for deep trees
+    return splc.dumps(parse_segment(_worker_source, segment), bytes(32))
+
+def parse_serial(source: str) -> List[Node]:
+    return Parser(SPLexer(source).tokenize()).parse()
+
+def parse_parallel(source: str, jobs: Optional[int] = None) -> Tuple[List[Node], ParseTimings]:
+    """Parse source across jobs worker processes, merging segments in order.
+
+    Small inputs, single segments and any segment failure fall back to the
+    serial parser, which also produces the canonical error for bad input.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    timings = ParseTimings(jobs)
+
+    started = time.perf_counter()
+    segments = []
+    if jobs > 1 and len(source) >= MIN_PARALLEL_SIZE:
+        try:
+            points = find_split_points(source)
+        except Exception:
+            points = []
+        if len(points) > 1:
+            segments = plan_segments(points, len(source), jobs * SEGMENTS_PER_JOB)
+    timings.split = time.perf_counter() - started
+    timings.segments = len(segments)
+
+    if len(segments) < 2:
+        return _timed_serial(source, timings)
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(min(jobs, len(segments)), initializer=_init_worker,
+                                 initargs=(source,)) as pool:
+            encoded = list(pool.map(_parse_segment_job, segments))
+    except Exception:
+        return _timed_serial(source, timings)
+    timings.parse = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ast = []
+    for data in encoded:
+        ast.extend(splc.loads(data))
+    timings.merge = time.perf_counter() - started
+    return ast, timings
+
+def _timed_serial(source: str, timings: ParseTimings) -> Tuple[List[Node], ParseTimings]:
+    started = time.perf_counter()
+    ast = parse_serial(source)
+    timings.parse = time.perf_counter() - started
+    timings.serial = True
+    return ast, timings
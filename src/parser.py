@@ -2,8 +2,18 @@
 """
 SPL Parser - Enhanced Version
 """
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Any, Optional
+
+from .ast_nodes import (
+    Node, Number, String, Var, BinaryOp, Assignment, FunctionCall, Param,
+    FunctionDef, Print, Return, If, Spawn, MatchCase, PatternMatch,
+    Literal, Wildcard, Binding, TypedPattern, pack_loc
+)
+
+# Names after anzisha selecting where the block runs
+SPAWN_BACKENDS = {'uzi': 'thread', 'mchakato': 'process'}
 
 @dataclass
 class Token:
@@ -20,24 +30,101 @@ class ParserError(Exception):
         )
         self.token = token
 
-class Parser:
+class TokenWindow:
+    """Indexable view over a lazy token iterator with bounded lookahead.
+
+    The parser only moves forward and reports its position with release(),
+    so tokens before it are dropped and memory stays proportional to the
+    lookahead, not the file. Lookahead itself never drops anything.
+    """
+    def __init__(self, tokens: Iterable[Token]):
+        self._tokens = iter(tokens)
+        self._window = deque()
+        self._offset = 0
+
+    def release(self, index: int) -> None:
+        """Drop the tokens before index; they are never read again"""
+        window = self._window
+        while self._offset < index and window:
+            window.popleft()
+            self._offset += 1
+
+    def __getitem__(self, index: int) -> Token:
+        window = self._window
+        position = index - self._offset
+        if position < 0:
+            raise IndexError(f"token {index} was already released")
+        while position >= len(window):
+            try:
+                window.append(next(self._tokens))
+            except StopIteration:
+                raise IndexError("token index out of range") from None
+        return window[position]
+
+# Layout tokens carry no meaning in the brace-delimited grammar
+LAYOUT_TOKENS = frozenset(('INDENT', 'DEDENT', 'NEWLINE'))
+
+def token_kind(token: Token) -> str:
+    """Key used by the Pratt tables: operator text for OPERATOR tokens, else the type"""
+    return token.value if token.type == 'OPERATOR' else token.type
+
+class LazyBody:
+    """Token range of a skimmed function body, parsed on demand"""
+    __slots__ = ('tokens',)
+
     def __init__(self, tokens: List[Token]):
+        # From the opening '{' through the matching '}'
         self.tokens = tokens
+
+    def parse(self) -> List[Node]:
+        last = self.tokens[-1]
+        tokens = self.tokens + [Token('EOF', '', last.line, last.column)]
+        return Parser(tokens, lazy=True).parse_braced_block()
+
+class Parser:
+    def __init__(self, tokens: Iterable[Token], lazy: bool = False):
+        # Lists are indexed directly; generators (stream_tokens) get a window
+        self.tokens = tokens if hasattr(tokens, '__getitem__') else TokenWindow(tokens)
+        # Told the parser's position so a window keeps tokens from there on
+        self.release = getattr(self.tokens, 'release', None)
+        # Lazy parsers only skim braced kazi bodies; see skim_block
+        self.lazy = lazy
         self.pos = 0
         self.current_line = 1
         self.current_column = 1
+        self.skip_layout()
 
     @property
     def current_token(self) -> Token:
         return self.tokens[self.pos]
 
     def advance(self) -> Token:
-        token = self.current_token
-        self.pos += 1
+        tokens = self.tokens
+        token = tokens[self.pos]
+        pos = self.pos + 1
+        while tokens[pos].type in LAYOUT_TOKENS:
+            pos += 1
+        self.pos = pos
+        if self.release is not None:
+            self.release(pos)
         self.current_line = token.line
         self.current_column = token.column
         return token
 
+    def peek(self) -> Token:
+        """The token after the current one"""
+        tokens = self.tokens
+        pos = self.pos + 1
+        while tokens[pos].type in LAYOUT_TOKENS:
+            pos += 1
+        return tokens[pos]
+
+    def skip_layout(self):
+        while self.tokens[self.pos].type in LAYOUT_TOKENS:
+            self.pos += 1
+        if self.release is not None:
+            self.release(self.pos)
+
     def consume(self, expected_type: str, expected_value: Optional[str] = None) -> Token:
         token = self.current_token
         if token.type != expected_type:
@@ -54,258 +141,309 @@ class Parser:
             
         return self.advance()
 
-    def parse(self) -> List[Dict[str, Any]]:
+    def parse(self) -> List[Node]:
         """Parse complete program into AST"""
         ast = []
         while self.current_token.type != 'EOF':
             ast.append(self.parse_statement())
         return ast
 
-    def parse_statement(self) -> Dict[str, Any]:
-        """Parse top-level statements"""
-        token = self.current_token
-        
-        if token.type == 'KEYWORD':
-            return {
-                'kazi': self.parse_function_def,
-                'chapisha': self.parse_print,
-                'lingana': self.parse_pattern_match,
-            }[token.value]()
-            
+    # Statements
+
+    def parse_statement(self) -> Node:
+        """Parse one statement, dispatching on the leading token type"""
+        parselet = STATEMENT_PARSELETS.get(self.current_token.type)
+        if parselet is not None:
+            return parselet(self)
         return self.parse_expression_statement()
 
-    def parse_function_def(self) -> Dict[str, Any]:
+    def parse_function_def(self) -> FunctionDef:
         """Parse function definition with full type support"""
-        start_token = self.consume('KEYWORD', 'kazi')
+        start_token = self.consume('FUNCTION')
         name = self.consume('IDENTIFIER').value
         params = self.parse_parameter_list()
         return_type = self.parse_return_type()
+        if self.lazy and self.current_token.type == '{':
+            lazy_body = LazyBody(self.skim_block())
+            return FunctionDef(name, params, return_type, [], self.get_location(start_token), lazy_body)
         body = self.parse_block()
-        
-        return {
-            'type': 'FunctionDef',
-            'name': name,
-            'params': params,
-            'return_type': return_type,
-            'body': body,
-            'loc': self.get_location(start_token)
-        }
-
-    def parse_parameter_list(self) -> List[Dict[str, str]]:
-        """Parse typed parameter list"""
-        self.consume('LPAREN')
+        return FunctionDef(name, params, return_type, body, self.get_location(start_token))
+
+    def parse_parameter_list(self) -> List[Param]:
+        """Parse parameter list with optional type annotations"""
+        self.consume('(')
         params = []
         
-        while self.current_token.type != 'RPAREN':
-            name = self.consume('IDENTIFIER').value
-            self.consume('COLON')
-            param_type = self.parse_type()
-            params.append({'name': name, 'type': param_type})
+        while self.current_token.type != ')':
+            name_token = self.consume('IDENTIFIER')
+            param_type = None
+            if self.current_token.type == ':':
+                self.advance()
+                param_type = self.parse_type()
+            params.append(Param(name_token.value, param_type, self.get_location(name_token)))
             
-            if self.current_token.type != 'COMMA':
+            if self.current_token.type != ',':
                 break
-            self.consume('COMMA')
+            self.advance()
             
-        self.consume('RPAREN')
+        self.consume(')')
         return params
 
     def parse_return_type(self) -> Optional[str]:
         """Parse optional return type annotation"""
-        if self.current_token.type == 'OPERATOR' and self.current_token.value == '->':
+        if self.current_token.type == 'THIN_ARROW':
             self.advance()
             return self.parse_type()
         return None
 
     def parse_type(self) -> str:
-        """Parse type annotations"""
-        if self.current_token.type == 'IDENTIFIER':
-            return self.advance().value
-        raise ParserError("Invalid type specification", self.current_token)
+        """Parse type annotations such as nambari or orodha[int]"""
+        if self.current_token.type != 'IDENTIFIER':
+            raise ParserError("Invalid type specification", self.current_token)
+        name = self.advance().value
+        if self.current_token.type == '[':
+            self.advance()
+            inner = self.parse_type()
+            self.consume(']')
+            return f"{name}[{inner}]"
+        return name
 
-    def parse_print(self) -> Dict[str, Any]:
+    def parse_print(self) -> Print:
         """Parse print statement with expression"""
-        start_token = self.consume('KEYWORD', 'chapisha')
+        start_token = self.consume('PRINT')
         value = self.parse_expression()
-        self.consume_newlines()
-        return {
-            'type': 'Print',
-            'value': value,
-            'loc': self.get_location(start_token)
-        }
-
-    def parse_pattern_match(self) -> Dict[str, Any]:
+        return Print(value, self.get_location(start_token))
+
+    def parse_return(self) -> Return:
+        """Parse return statement with optional value"""
+        start_token = self.consume('RETURN')
+        value = None
+        token = self.current_token
+        # Newlines are not tokens: a value must start on the rudisha line
+        if token.line == start_token.line and token_kind(token) in PREFIX_PARSELETS:
+            value = self.parse_expression()
+        return Return(value, self.get_location(start_token))
+
+    def parse_if(self) -> If:
+        """Parse kama/vinginevyo conditional"""
+        start_token = self.consume('IF')
+        condition = self.parse_expression()
+        then = self.parse_block()
+        otherwise = []
+        if self.current_token.type == 'ELSE':
+            self.advance()
+            otherwise = self.parse_block()
+        return If(condition, then, otherwise, self.get_location(start_token))
+
+    def parse_spawn(self) -> Spawn:
+        """Parse anzisha block, optionally naming its backend (uzi, mchakato)"""
+        return self.parse_spawn_body(self.consume('SPAWN'))
+
+    def parse_spawn_body(self, start_token: Token) -> Spawn:
+        # Also a prefix parselet: `t = anzisha { ... }` keeps the Task
+        backend = None
+        token = self.current_token
+        # Only before a brace; otherwise it starts an unbraced statement
+        if token.type == 'IDENTIFIER' and token.value in SPAWN_BACKENDS:
+            if self.peek().type == '{':
+                backend = SPAWN_BACKENDS[self.advance().value]
+        body = self.parse_block()
+        return Spawn(body, backend, self.get_location(start_token))
+
+    def parse_pattern_match(self) -> PatternMatch:
         """Parse pattern matching with full block support"""
-        start_token = self.consume('KEYWORD', 'lingana')
+        start_token = self.consume('MATCH')
         subject = self.parse_expression()
         cases = []
         
-        self.consume('LBRACE')
-        while self.current_token.type != 'RBRACE':
+        self.consume('{')
+        while self.current_token.type not in ('}', 'EOF'):
+            case_token = self.current_token
             pattern = self.parse_pattern()
-            self.consume('OPERATOR', '=>')
-            body = self.parse_block() if self.current_token.type == 'LBRACE' \
-                else [self.parse_statement()]
-            cases.append({'pattern': pattern, 'body': body})
-            self.consume_newlines()
+            self.consume('FAT_ARROW')
+            body = self.parse_block()
+            cases.append(MatchCase(pattern, body, self.get_location(case_token)))
             
-        self.consume('RBRACE')
-        return {
-            'type': 'PatternMatch',
-            'expression': subject,
-            'cases': cases,
-            'loc': self.get_location(start_token)
-        }
-
-    def parse_pattern(self) -> Dict[str, Any]:
+        self.consume('}')
+        return PatternMatch(subject, cases, self.get_location(start_token))
+
+    def parse_pattern(self) -> Node:
         """Parse match patterns with type support"""
         token = self.current_token
         
-        if token.type == 'NUMBER':
-            return {'type': 'Literal', 'value': self.advance().value}
+        if token.type in ('INTEGER', 'FLOAT'):
+            value = NUMBER_TYPES[token.type](self.advance().value)
+            return Literal(value, self.get_location(token))
             
         if token.type == 'STRING':
-            return {'type': 'Literal', 'value': self.advance().value}
-            
-        if token.value == '_':
-            self.advance()
-            return {'type': 'Wildcard'}
+            return Literal(self.advance().value, self.get_location(token))
             
         if token.type == 'IDENTIFIER':
             name = self.advance().value
-            if self.current_token.type == 'COLON':
-                self.consume('COLON')
+            if name == '_':
+                return Wildcard(self.get_location(token))
+            if self.current_token.type == ':':
+                self.advance()
                 pattern_type = self.parse_type()
-                return {'type': 'TypedPattern', 'name': name, 'annotation': pattern_type}
-            return {'type': 'Binding', 'name': name}
+                return TypedPattern(name, pattern_type, self.get_location(token))
+            return Binding(name, self.get_location(token))
             
         raise ParserError("Invalid pattern syntax", token)
 
-    def parse_block(self) -> List[Dict[str, Any]]:
+    def parse_block(self) -> List[Node]:
         """Parse statement blocks with proper scope handling"""
-        if self.current_token.type == 'LBRACE':
+        if self.current_token.type == '{':
             return self.parse_braced_block()
         return [self.parse_statement()]
 
-    def parse_braced_block(self) -> List[Dict[str, Any]]:
+    def parse_braced_block(self) -> List[Node]:
         """Parse { ... } block with multiple statements"""
-        self.consume('LBRACE')
+        self.consume('{')
         statements = []
         
-        while self.current_token.type not in ('RBRACE', 'EOF'):
+        while self.current_token.type not in ('}', 'EOF'):
             statements.append(self.parse_statement())
-            self.consume_newlines()
             
-        self.consume('RBRACE')
+        self.consume('}')
         return statements
 
-    def parse_expression_statement(self) -> Dict[str, Any]:
-        """Parse expression as statement"""
-        expr = self.parse_expression()
-        self.consume_newlines()
-        return expr
+    def skim_block(self) -> List[Token]:
+        """Collect a brace-balanced { ... } token range without parsing it.
 
-    def parse_expression(self) -> Dict[str, Any]:
-        """Parse full expression with operator precedence"""
-        return self.parse_binary_expression(0)
-
-    def parse_binary_expression(self, precedence: int) -> Dict[str, Any]:
-        """Handle operator precedence using precedence climbing"""
-        ops_precedence = {
-            '+': 2, '-': 2,
-            '*': 3, '/': 3,
-            '==': 1, '!=': 1,
-            '>': 1, '<': 1, '>=': 1, '<=': 1
-        }
-        
-        left = self.parse_primary()
-        
+        Syntax errors inside the range surface when the body is first parsed.
+        """
+        tokens = self.tokens
+        pos = self.pos
+        depth = 0
+        block = []
         while True:
-            token = self.current_token
-            if token.type != 'OPERATOR' or ops_precedence.get(token.value, 0) <= precedence:
+            token = tokens[pos]
+            kind = token.type
+            if kind == '{':
+                depth += 1
+            elif kind == '}':
+                depth -= 1
+            elif kind == 'EOF':
+                raise ParserError("Unterminated block", token)
+            block.append(token)
+            pos += 1
+            if depth == 0:
                 break
-                
-            op = self.advance().value
-            right = self.parse_binary_expression(ops_precedence[op])
-            left = {
-                'type': 'BinaryOp',
-                'operator': op,
-                'left': left,
-                'right': right,
-                'loc': self.get_location(token)
-            }
-            
-        return left
+        # Consume the closing brace through advance() to keep positions current
+        self.pos = pos - 1
+        self.advance()
+        return block
+
+    def parse_expression_statement(self) -> Node:
+        """Parse expression as statement"""
+        return self.parse_expression()
 
-    def parse_primary(self) -> Dict[str, Any]:
-        """Parse primary expressions with location tracking"""
+    # Expressions (Pratt engine driven by the module-level tables below)
+
+    def parse_expression(self, min_power: int = 0) -> Node:
+        """Parse an expression whose operators all bind tighter than min_power.
+
+        Operators of equal or lower power end the inner call and are picked
+        up by the loop of the caller, so left-associative chains of any
+        length are folded iteratively instead of recursing per operator.
+        """
         token = self.current_token
-        loc = self.get_location(token)
-        
-        if token.type == 'NUMBER':
-            return self.parse_number(loc)
-            
-        if token.type == 'STRING':
-            return self.parse_string(loc)
-            
-        if token.type == 'IDENTIFIER':
-            return self.parse_identifier(loc)
-            
-        if token.type == 'LPAREN':
-            return self.parse_parenthesized(loc)
-            
-        raise ParserError("Unexpected expression", token)
+        prefix = PREFIX_PARSELETS.get(token_kind(token))
+        if prefix is None:
+            raise ParserError("Unexpected expression", token)
+        left = prefix(self, self.advance())
 
-    def parse_number(self, loc: Dict) -> Dict[str, Any]:
-        value = self.advance().value
-        return {'type': 'Number', 'value': value, 'loc': loc}
+        infix_table = INFIX_PARSELETS
+        while True:
+            token = self.tokens[self.pos]
+            entry = infix_table.get(token.value if token.type == 'OPERATOR' else token.type)
+            if entry is None or entry[0] <= min_power:
+                return left
+            left = entry[1](self, left, self.advance())
 
-    def parse_string(self, loc: Dict) -> Dict[str, Any]:
-        value = self.advance().value
-        return {'type': 'String', 'value': value, 'loc': loc}
+    def parse_number(self, token: Token) -> Number:
+        return Number(NUMBER_TYPES[token.type](token.value), self.get_location(token))
 
-    def parse_identifier(self, loc: Dict) -> Dict[str, Any]:
-        name = self.advance().value
-        
-        if self.current_token.type == 'LPAREN':
-            return self.parse_function_call(name, loc)
-            
-        return {'type': 'Var', 'name': name, 'loc': loc}
+    def parse_string(self, token: Token) -> String:
+        return String(token.value, self.get_location(token))
+
+    def parse_identifier(self, token: Token) -> Var:
+        # kweli/sikweli/hakuna are keywords but resolve like builtin names
+        return Var(token.value, self.get_location(token))
+
+    def parse_parenthesized(self, token: Token) -> Node:
+        expr = self.parse_expression()
+        self.consume(')')
+        return expr
+
+    def parse_binary(self, left: Node, token: Token) -> BinaryOp:
+        right = self.parse_expression(BINDING_POWER[token_kind(token)])
+        return BinaryOp(token.value, left, right, self.get_location(token))
 
-    def parse_function_call(self, name: str, loc: Dict) -> Dict[str, Any]:
-        self.consume('LPAREN')
+    def parse_assignment(self, left: Node, token: Token) -> Assignment:
+        if not isinstance(left, Var):
+            raise ParserError("Invalid assignment target", token)
+        # Right associative: a = b = c
+        value = self.parse_expression(BINDING_POWER['='] - 1)
+        return Assignment(left.name, value, loc=left.loc)
+
+    def parse_function_call(self, left: Node, token: Token) -> FunctionCall:
         args = []
         
-        while self.current_token.type != 'RPAREN':
+        while self.current_token.type != ')':
             args.append(self.parse_expression())
-            if self.current_token.type != 'COMMA':
+            if self.current_token.type != ',':
                 break
-            self.consume('COMMA')
+            self.advance()
             
-        self.consume('RPAREN')
-        return {
-            'type': 'FunctionCall',
-            'function': {'type': 'Var', 'name': name, 'loc': loc},
-            'args': args,
-            'loc': loc
-        }
-
-    def parse_parenthesized(self, loc: Dict) -> Dict[str, Any]:
-        self.consume('LPAREN')
-        expr = self.parse_expression()
-        self.consume('RPAREN')
-        return expr
+        self.consume(')')
+        return FunctionCall(left, args, left.loc)
 
     def consume_newlines(self):
         """Consume trailing newlines"""
         while self.current_token.type == 'NEWLINE':
             self.advance()
 
-    def get_location(self, token: Token) -> Dict[str, int]:
-        return {
-            'start_line': token.line,
-            'start_col': token.column,
-            'end_line': self.current_line,
-            'end_col': self.current_column
-        }
+    def get_location(self, token: Token) -> int:
+        """Packed span from token to the last consumed token (see ast_nodes.pack_loc)"""
+        return pack_loc(token.line, token.column, self.current_line, self.current_column)
+
+NUMBER_TYPES = {'INTEGER': int, 'FLOAT': float}
+
+# Binding power per token kind; higher binds tighter
+BINDING_POWER = {
+    '=': 1,
+    'EQ': 2, 'NEQ': 2, '<': 2, '>': 2, 'LTE': 2, 'GTE': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+    '(': 5,
+}
+
+# Pratt tables, built once at import: token kind -> parselet
+PREFIX_PARSELETS = {
+    'INTEGER': Parser.parse_number,
+    'FLOAT': Parser.parse_number,
+    'STRING': Parser.parse_string,
+    'IDENTIFIER': Parser.parse_identifier,
+    'TRUE': Parser.parse_identifier,
+    'FALSE': Parser.parse_identifier,
+    'NONE': Parser.parse_identifier,
+    '(': Parser.parse_parenthesized,
+    'SPAWN': Parser.parse_spawn_body,
+}
+
+INFIX_PARSELETS = {
+    kind: (power, Parser.parse_binary)
+    for kind, power in BINDING_POWER.items()
+}
+INFIX_PARSELETS['='] = (BINDING_POWER['='], Parser.parse_assignment)
+INFIX_PARSELETS['('] = (BINDING_POWER['('], Parser.parse_function_call)
 
-# Example usage remains similar but with proper Token class
\ No newline at end of file
+STATEMENT_PARSELETS = {
+    'FUNCTION': Parser.parse_function_def,
+    'PRINT': Parser.parse_print,
+    'RETURN': Parser.parse_return,
+    'IF': Parser.parse_if,
+    'SPAWN': Parser.parse_spawn,
+    'MATCH': Parser.parse_pattern_match,
+}
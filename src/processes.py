@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+SPL Process Backend - anzisha blocks on pre-started worker processes
+
+Threads share one GIL, so CPU-bound anzisha blocks gain nothing from
+running on them. A block spawned on the process backend is sent to a
+worker process instead: its AST, the kazi it can reach as FunctionDef
+nodes, and a snapshot of every other captured value, which must pickle.
+The worker runs it with a fresh Interpreter and the result, or the
+error, comes back through the Task's TaskResult.
+
+Workers are started once per ProcessPool and reused. Blocks choose the
+backend with `anzisha mchakato { ... }` or `anzisha uzi { ... }`; plain
+`anzisha` uses the global default, set with set_default_backend().
+"""
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .ast_nodes import FunctionDef, Node, Var, iter_nodes
+from .concurrency import Task, TaskResult
+from .custom_builtins import CUSTOM_BUILTINS
+
+# 'async' runs blocks on one event loop; see event_loop.py
+BACKENDS = ('thread', 'process', 'async')
+# Environment variables for the defaults
+BACKEND_ENV = 'SPL_SPAWN_BACKEND'
+PROCESSES_ENV = 'SPL_PROCESSES'
+
+class CaptureError(Exception):
+    """A captured value that cannot be sent to a worker process"""
+
+Definitions = List[Tuple[str, FunctionDef]]
+
+def read_names(statements: List[Node]) -> Set[str]:
+    """Every name the statements read, kazi called by name included"""
+    return {node.name for node in iter_nodes(statements) if isinstance(node, Var)}
+
+def is_builtin(name: str, value: Any, bound: Dict[str, Any]) -> bool:
+    """Whether a worker's own Interpreter already has value under name.
+
+    bound holds the builtins bound to the spawning engine, like kumbuka;
+    a worker binds its own. Anything else made in src, such as the
+    function kumbuka returns, is a value like any other.
+    """
+    return value is CUSTOM_BUILTINS.get(name) or value is bound.get(name)
+
+def capture(statements: List[Node], env: Any, bound: Optional[Dict[str, Any]] = None
+            ) -> Tuple[Definitions, Dict[str, Any]]:
+    """Kazi and values the statements can reach from env.
+
+    Kazi go by their FunctionDef, and the names their bodies read are
+    captured too, since free names resolve in the caller. Names that are
+    not bound yet, like the block's own locals, are left out.
+    """
+    bound = bound or {}
+    from .interpreter import SPLRuntimeError, lookup
+
+    definitions: Definitions = []
+    values: Dict[str, Any] = {}
+    pending = list(read_names(statements))
+    seen: Set[str] = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            value = lookup(env, name)
+        except SPLRuntimeError:
+            continue
+        node = getattr(value, 'spl_node', None)
+        if node is not None:
+            definitions.append((name, node))
+            params = {param.name for param in node.params}
+            pending.extend(read_names(node.body) - params)
+            continue
+        if is_builtin(name, value, bound):
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception as e:
+            raise CaptureError(
+                f"Thamani ya '{name}' ({type(value).__name__}) haiwezi kutumwa "
+                f"kwa mchakato mwingine: {e}"
+            ) from None
+        values[name] = value
+    return definitions, values
+
+def run_block(statements: List[Node], definitions: Definitions, values: Dict[str, Any]) -> Any:
+    """Worker side: run a block with a fresh Interpreter"""
+    from .interpreter import Interpreter
+
+    interpreter = Interpreter()
+    env = interpreter.global_env
+    env.vars.update(values)
+    try:
+        interpreter.interpret([node for _, node in definitions])
+        for name, node in definitions:
+            env.vars[name] = env.vars[node.name]
+        return interpreter.interpret(statements)
+    finally:
+        # The parent shares the terminal; print before the result arrives
+        sys.stdout.flush()
+
+def _context():
+    # Forking a parent that already runs pool threads can copy held locks
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+class ProcessPool:
+    """Worker processes started up front and reused for every block"""
+
+    def __init__(self, processes: Optional[int] = None):
+        self.size = max(processes or default_process_count(), 1)
+        self.pool = _context().Pool(self.size)
+
+    def submit(self, task: Task, statements: List[Node], definitions: Definitions,
+               values: Dict[str, Any]) -> None:
+        task.claim()
+
+        def done(value: Any) -> None:
+            task.set_result(TaskResult(value=value))
+
+        def failed(error: BaseException) -> None:
+            print(f"Shida ya mtindo: {error}")
+            task.set_result(TaskResult(exception=error))
+
+        self.pool.apply_async(run_block, (statements, definitions, values),
+                              callback=done, error_callback=failed)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.close()
+        if wait:
+            self.pool.join()
+
+def default_process_count() -> int:
+    """SPL_PROCESSES if set, else one worker per CPU"""
+    configured = os.environ.get(PROCESSES_ENV)
+    if configured and configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return os.cpu_count() or 1
+
+_default_backend = os.environ.get(BACKEND_ENV) if os.environ.get(BACKEND_ENV) in BACKENDS else 'thread'
+_default_pool: Optional[ProcessPool] = None
+_default_processes: Optional[int] = None
+_default_lock = threading.Lock()
+
+def set_default_backend(backend: str, processes: Optional[int] = None) -> None:
+    """Backend for anzisha blocks that do not name one; choosing 'process'
+    starts the worker processes now"""
+    global _default_backend, _default_processes
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    _default_backend = backend
+    if processes is not None:
+        _default_processes = processes
+    if backend == 'process':
+        default_pool()
+
+def default_backend() -> str:
+    return _default_backend
+
+def default_pool() -> ProcessPool:
+    """Process-wide pool for the process backend, started on first use"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ProcessPool(_default_processes)
+        return _default_pool
+
+def spawn_process(statements: List[Node], env: Any, pool: Optional[ProcessPool] = None,
+                  bound: Optional[Dict[str, Any]] = None) -> Task:
+    """Run statements on a worker process; CaptureError if a captured
+    value cannot be sent"""
+    definitions, values = capture(statements, env, bound)
+    task = Task(target=None)
+    (pool or default_pool()).submit(task, statements, definitions, values)
+    return task
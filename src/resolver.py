@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+SPL Resolver - lexical (depth, slot) addresses for names before execution
+
+A unit is the top level of a program or one kazi body. Each block in it
+that stores names gets a Scope, laid out as one array-backed Frame at run
+time; blocks that store nothing get no frame. Reads try the slots of the
+enclosing scopes that declare the name, innermost first, and only then
+fall back to a lookup by name in the caller's scopes (kazi see their
+caller's names) or the global Environment.
+"""
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .ast_nodes import (
+    Node, NodeVisitor, Assignment, FunctionCall, FunctionDef, If, PatternMatch,
+    Return, Spawn, Binding, TypedPattern, Var
+)
+
+class Scope:
+    """Slot layout of one frame"""
+    __slots__ = ('slots', 'parent')
+
+    def __init__(self, parent: Optional['Scope'] = None):
+        self.slots: Dict[str, int] = {}
+        self.parent = parent
+
+    def declare(self, name: str) -> int:
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+        return self.slots[name]
+
+    @property
+    def size(self) -> int:
+        return len(self.slots)
+
+    def __repr__(self) -> str:
+        return f"Scope({list(self.slots)})"
+
+class Address(NamedTuple):
+    """Where a read looks: (depth, slot) candidates, innermost first, then
+    a lookup by name outer frames up"""
+    candidates: Tuple[Tuple[int, int], ...]
+    outer: int
+
+class Resolution:
+    """Side tables for one unit, keyed by node"""
+    __slots__ = ('root', 'scopes', 'reads', 'stores', 'tail_calls')
+
+    def __init__(self, root: Optional[Scope]):
+        self.root = root
+        # Block key -> Scope, only for blocks that get a frame. Keys are the
+        # owning node, or (If node, 'then' / 'orelse') for kama branches
+        self.scopes: Dict[object, Scope] = {}
+        self.reads: Dict[Var, Address] = {}
+        # Assignment, FunctionDef, Binding and TypedPattern -> slot in the
+        # innermost frame, or None to store by name in the Environment
+        self.stores: Dict[Node, Optional[int]] = {}
+        # Calls whose result is the kazi's result (see tail_calls)
+        self.tail_calls: Set[FunctionCall] = set()
+
+def tail_calls(body: List[Node]) -> Set[FunctionCall]:
+    """Calls in a kazi body whose value becomes the kazi's return value.
+
+    That is the value of a rudisha, or the last statement of the body,
+    reached through the last statements of kama branches and lingana arms.
+    anzisha bodies and nested kazi are separate and never count.
+    """
+    calls = set()
+    stack = [(body, True)]
+    while stack:
+        statements, tail = stack.pop()
+        for index, stmt in enumerate(statements):
+            last = tail and index == len(statements) - 1
+            if isinstance(stmt, Return):
+                if isinstance(stmt.value, FunctionCall):
+                    calls.add(stmt.value)
+            elif isinstance(stmt, FunctionCall):
+                if last:
+                    calls.add(stmt)
+            elif isinstance(stmt, If):
+                stack.append((stmt.then, last))
+                stack.append((stmt.orelse, last))
+            elif isinstance(stmt, PatternMatch):
+                stack.extend((case.body, last) for case in stmt.cases)
+    return calls
+
+def declared_names(statements: List[Node]) -> List[str]:
+    """Names the statements store directly in their own scope"""
+    return [stmt.name for stmt in statements if isinstance(stmt, (Assignment, FunctionDef))]
+
+class Resolver(NodeVisitor):
+    """Compute a Resolution for a unit; nested kazi are resolved separately"""
+    visit_prefix = 'resolve_'
+
+    def __init__(self):
+        self.resolution: Optional[Resolution] = None
+        self.scope: Optional[Scope] = None
+
+    def resolve_module(self, statements: List[Node]) -> Resolution:
+        """Top-level names live in the global Environment, not in slots"""
+        self.resolution = Resolution(None)
+        self.scope = None
+        self.resolve_block(statements)
+        return self.resolution
+
+    def resolve_function(self, node: FunctionDef) -> Resolution:
+        root = Scope()
+        for param in node.params:
+            root.declare(param.name)
+        for name in declared_names(node.body):
+            root.declare(name)
+        self.resolution = Resolution(root)
+        self.resolution.tail_calls = tail_calls(node.body)
+        self.scope = root
+        self.resolve_block(node.body)
+        return self.resolution
+
+    def resolve_block(self, statements: List[Node]) -> None:
+        for stmt in statements:
+            self.visit(stmt)
+
+    def resolve_scoped(self, key: object, statements: List[Node],
+                       bound: Optional[str] = None) -> None:
+        """Resolve a block that runs in a child scope, if it stores anything"""
+        names = declared_names(statements)
+        if bound is not None:
+            names.insert(0, bound)
+        if not names:
+            self.resolve_block(statements)
+            return
+        scope = Scope(self.scope)
+        for name in names:
+            scope.declare(name)
+        self.resolution.scopes[key] = scope
+        outer, self.scope = self.scope, scope
+        try:
+            self.resolve_block(statements)
+        finally:
+            self.scope = outer
+
+    def store(self, node: Node, name: str) -> None:
+        self.resolution.stores[node] = self.scope.slots[name] if self.scope else None
+
+    def resolve_Var(self, node: Var) -> None:
+        candidates = []
+        depth = 0
+        scope = self.scope
+        while scope is not None:
+            slot = scope.slots.get(node.name)
+            if slot is not None:
+                candidates.append((depth, slot))
+            scope = scope.parent
+            depth += 1
+        self.resolution.reads[node] = Address(tuple(candidates), depth)
+
+    def resolve_Assignment(self, node: Assignment) -> None:
+        self.visit(node.value)
+        self.store(node, node.name)
+
+    def resolve_FunctionDef(self, node: FunctionDef) -> None:
+        # The body is its own unit, resolved on first call
+        self.store(node, node.name)
+
+    def resolve_If(self, node: If) -> None:
+        self.visit(node.condition)
+        self.resolve_scoped((node, 'then'), node.then)
+        self.resolve_scoped((node, 'orelse'), node.orelse)
+
+    def resolve_PatternMatch(self, node: PatternMatch) -> None:
+        self.visit(node.expression)
+        for case in node.cases:
+            pattern = case.pattern
+            bound = pattern.name if isinstance(pattern, (Binding, TypedPattern)) else None
+            self.resolve_scoped(case, case.body, bound)
+            if bound is not None:
+                self.resolution.stores[pattern] = self.resolution.scopes[case].slots[bound]
+
+    def resolve_Spawn(self, node: Spawn) -> None:
+        self.resolve_scoped(node, node.body)
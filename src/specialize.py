@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+SPL Specialization - static types from KihakikiAina put to work at run time
+
+Specialization.analyze() runs the checker over a whole program in laini
+mode, so a node it cannot type is any rather than a failed check. The
+engines use two facts drawn from its per-node types:
+
+- int_ops: BinaryOps with both operands proven int, which the Interpreter
+  compiles with the operator and any constant right operand inlined,
+  and no TypeError handling, instead of calling through BINARY_OPS;
+- unchecked: annotated parameters that every call proves correct, whose
+  runtime check_type the Interpreter and the JIT leave out.
+
+A parameter counts as proven only for a kazi from single_definitions()
+whose name is used nowhere but as the callee of direct calls, each
+passing every argument with a type the annotation accepts. Anything
+typed any keeps the generic path.
+"""
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from .ast_nodes import BinaryOp, FunctionCall, FunctionDef, Node, Return, Var, iter_nodes
+from .memo import single_definitions
+from .type_checker import Aina, KihakikiAina, TypeChecker
+
+TYPE_CHECKER = TypeChecker()
+TYPE_MAP = TYPE_CHECKER.type_map
+
+# Python type of each concrete type the checker infers
+INFERRED_TYPES = {'int': int, 'float': float, 'str': str}
+
+def accepts(annotation: str, aina: Optional[Aina]) -> bool:
+    """Whether check_type(annotation) passes for every value of type aina"""
+    expected = TYPE_MAP.get(annotation.lower())
+    inferred = INFERRED_TYPES.get(aina.jina) if aina is not None else None
+    if expected is None or inferred is None:
+        return expected is object
+    if inferred is int and not TYPE_CHECKER.guard(annotation)(True):
+        # The checker types comparisons int, and they give bools
+        return False
+    return issubclass(inferred, expected)
+
+class Specialization:
+    """Inferred types of one program and what the engines may skip"""
+
+    def __init__(self):
+        self.types: Dict[Node, Aina] = {}
+        self.int_ops: Set[BinaryOp] = set()
+        self.unchecked: Dict[FunctionDef, FrozenSet[str]] = {}
+
+    def analyze(self, statements: List[Node]) -> None:
+        found = single_definitions(statements)
+        if found is None:
+            # Lazily parsed bodies stay unparsed and unspecialized
+            return
+        checker = KihakikiAina(laini=True)
+        checker.hakiki(statements)
+        self.types.update(checker.aina_za_nodi)
+
+        for node in iter_nodes(statements):
+            if isinstance(node, BinaryOp) and self.is_int(node.left) and self.is_int(node.right):
+                self.int_ops.add(node)
+        self.unchecked.update(self.proven_parameters(statements, found[0]))
+
+    def is_int(self, node: Node) -> bool:
+        aina = self.types.get(node)
+        return aina is not None and aina.jina == 'int'
+
+    def proven_parameters(self, statements: List[Node], candidates: Dict[str, FunctionDef]
+                          ) -> Dict[FunctionDef, FrozenSet[str]]:
+        calls: Dict[str, List[FunctionCall]] = {name: [] for name in candidates}
+        callees = set()
+        for node in iter_nodes(statements):
+            if isinstance(node, FunctionCall) and isinstance(node.function, Var):
+                if node.function.name in calls:
+                    calls[node.function.name].append(node)
+                    callees.add(node.function)
+        for node in iter_nodes(statements):
+            if isinstance(node, Var) and node not in callees:
+                # Passed around as a value, it can be called with anything
+                calls.pop(node.name, None)
+
+        proven = {}
+        for name, sites in calls.items():
+            definition = candidates[name]
+            params = definition.params
+            if not sites or any(len(site.args) != len(params) for site in sites):
+                continue
+            names = frozenset(
+                param.name for index, param in enumerate(params)
+                if param.annotation
+                and all(accepts(param.annotation, self.types.get(site.args[index])) for site in sites)
+            )
+            if names:
+                proven[definition] = names
+        return proven
+
+    def return_type(self, node: FunctionDef) -> Optional[str]:
+        """Concrete type of every value the kazi can return, if proven"""
+        if not node.body:
+            return None
+        results = [self.types.get(node.body[-1])]
+        stack = list(node.body)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, FunctionDef):
+                continue
+            if isinstance(item, Return):
+                results.append(self.types.get(item.value) if item.value is not None else None)
+            for field in item.fields:
+                value = getattr(item, field, None)
+                if isinstance(value, Node):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack.extend(child for child in value if isinstance(child, Node))
+        names = {aina.jina if aina is not None else None for aina in results}
+        if len(names) == 1:
+            name = names.pop()
+            if name in INFERRED_TYPES:
+                return name
+        return None
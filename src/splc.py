@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+SPL Precompiled Programs - .splc serialization and the __splcache__ directory
+"""
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple, Optional, Union
+
+from .ast_nodes import NODE_CLASSES, Node
+from .version import __version__
+
+MAGIC = b'SPLC'
+# Bump whenever node classes or the encoding below change
+FORMAT_VERSION = 3
+CACHE_DIR = '__splcache__'
+SUFFIX = '.splc'
+
+# magic, format, optimize level, constant ref typecode, SPL version, source
+# sha256, then the lengths of the sections that follow (see SECTIONS)
+HEADER = struct.Struct('<4sHBc16s32sIIIIII')
+BIG_ENDIAN = sys.byteorder == 'big'
+
+# Program encoding: a post-order opcode stream rebuilt with a value stack.
+# Opcodes below len(NODE_TYPES) build a node from its fields, OP_LIST packs
+# the next list size worth of values into a list and OP_CONST pushes the
+# next constant from the deduplicated pool. Packed locations are stored as
+# start line plus the 48-bit span, since line numbers are unbounded. Every
+# section but the pool is a flat little-endian array, used in place on load.
+NODE_TYPES = tuple(NODE_CLASSES.values())
+NODE_IDS = {cls: i for i, cls in enumerate(NODE_TYPES)}
+OP_LIST = len(NODE_TYPES)
+OP_CONST = OP_LIST + 1
+SECTIONS = ('ops', 'sizes', 'refs', 'lines', 'spans')
+SPAN_MASK = (1 << 48) - 1
+
+class SPLCError(Exception):
+    """Raised for unreadable, foreign or stale .splc data"""
+
+class SPLCHeader(NamedTuple):
+    format: int
+    optimize: int
+    ref_type: str
+    version: str
+    source_hash: bytes
+    op_count: int
+    size_count: int
+    ref_count: int
+    line_count: int
+    span_count: int
+    pool_bytes: int
+
+def source_digest(data: Union[bytes, mmap.mmap]) -> bytes:
+    return hashlib.sha256(data).digest()
+
+class Encoded(NamedTuple):
+    ops: array
+    sizes: array
+    refs: array
+    lines: array
+    spans: array
+    pool: tuple
+
+def encode(ast: List[Node]) -> Encoded:
+    """Flatten a program into opcode, list size, constant ref and location arrays"""
+    ops = array('B')
+    sizes = array('I')
+    refs = []
+    lines = array('I')
+    spans = array('Q')
+    pool = {}
+    stack = [(ast, False)]
+    while stack:
+        item, children_done = stack.pop()
+        if children_done:
+            if isinstance(item, list):
+                ops.append(OP_LIST)
+                sizes.append(len(item))
+            else:
+                ops.append(NODE_IDS[item.__class__])
+                lines.append(item.loc >> 48)
+                spans.append(item.loc & SPAN_MASK)
+            continue
+        if isinstance(item, Node):
+            children = [getattr(item, name) for name in item.fields]
+        elif isinstance(item, list):
+            children = item
+        else:
+            ops.append(OP_CONST)
+            # Keyed by type too, so 1, 1.0 and True stay distinct
+            refs.append(pool.setdefault((type(item), item), len(pool)))
+            continue
+        stack.append((item, True))
+        stack.extend((child, False) for child in reversed(children))
+    ref_type = 'H' if len(pool) <= 0xFFFF else 'I'
+    return Encoded(ops, sizes, array(ref_type, refs), lines, spans,
+                   tuple(value for _, value in pool))
+
+def decode(ops, sizes, refs, lines, spans, pool) -> List[Node]:
+    """Rebuild a program from the sections produced by encode()"""
+    node_types = NODE_TYPES
+    arity = [len(cls.fields) for cls in node_types]
+    stack: List[Any] = []
+    push = stack.append
+    size_index = ref_index = loc_index = 0
+    for op in ops:
+        if op == OP_CONST:
+            push(pool[refs[ref_index]])
+            ref_index += 1
+        elif op == OP_LIST:
+            count = sizes[size_index]
+            size_index += 1
+            if count:
+                items = stack[-count:]
+                del stack[-count:]
+            else:
+                items = []
+            push(items)
+        else:
+            count = arity[op]
+            if count:
+                values = stack[-count:]
+                del stack[-count:]
+            else:
+                values = ()
+            push(node_types[op](*values, lines[loc_index] << 48 | spans[loc_index]))
+            loc_index += 1
+    if len(stack) != 1:
+        raise SPLCError("Corrupt program data")
+    return stack[0]
+
+def dumps(ast: List[Node], source_hash: bytes, optimize: int = 0) -> bytes:
+    encoded = encode(ast)
+    arrays = [getattr(encoded, name) for name in SECTIONS]
+    if BIG_ENDIAN:
+        for values in arrays:
+            values.byteswap()
+    pool_data = marshal.dumps(encoded.pool)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, optimize, encoded.refs.typecode.encode(),
+        __version__.encode(), source_hash,
+        *(len(values) for values in arrays), len(pool_data)
+    )
+    return b''.join([header, *(values.tobytes() for values in arrays), pool_data])
+
+def read_header(data) -> SPLCHeader:
+    if len(data) < HEADER.size:
+        raise SPLCError("Truncated .splc header")
+    magic, fmt, optimize, ref_type, version, *rest = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SPLCError("Not a .splc file")
+    if ref_type not in (b'H', b'I'):
+        raise SPLCError("Corrupt .splc header")
+    return SPLCHeader(fmt, optimize, ref_type.decode(), version.rstrip(b'\0').decode(), *rest)
+
+def loads(data, source_hash: Optional[bytes] = None,
+          optimize: Optional[int] = None) -> List[Node]:
+    """Load a program, rejecting data built by another SPL version or for other inputs"""
+    header = read_header(data)
+    if header.format != FORMAT_VERSION or header.version != __version__:
+        raise SPLCError(f"Built for SPL {header.version} (format {header.format})")
+    if source_hash is not None and header.source_hash != source_hash:
+        raise SPLCError("Source has changed")
+    if optimize is not None and header.optimize != optimize:
+        raise SPLCError(f"Built with -O{header.optimize}")
+
+    layout = (
+        ('B', header.op_count), ('I', header.size_count),
+        (header.ref_type, header.ref_count), ('I', header.line_count),
+        ('Q', header.span_count),
+    )
+    expected = HEADER.size + header.pool_bytes + sum(
+        array(typecode).itemsize * count for typecode, count in layout
+    )
+    if len(data) != expected:
+        raise SPLCError("Truncated .splc data")
+
+    # Array sections are cast in place over the file contents, not copied
+    view = memoryview(data)
+    offset = HEADER.size
+    sections = []
+    for typecode, count in layout:
+        size = array(typecode).itemsize * count
+        chunk = view[offset:offset + size]
+        sections.append(_swapped(typecode, chunk) if BIG_ENDIAN else chunk.cast(typecode))
+        offset += size
+    try:
+        pool = marshal.loads(view[offset:])
+        return decode(*sections, pool)
+    except (EOFError, ValueError, TypeError, IndexError) as e:
+        raise SPLCError(f"Corrupt program data: {e}") from None
+
+def _swapped(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    values.byteswap()
+    return values
+
+def cache_path(source: Union[str, Path], optimize: int = 0) -> Path:
+    """__splcache__/<name>.spl-<version>.O<level>.splc next to the source"""
+    source = Path(source)
+    return source.parent / CACHE_DIR / f"{source.stem}.spl-{__version__}.O{optimize}{SUFFIX}"
+
+def _hash_file(path: Path) -> bytes:
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return source_digest(mapped)
+        except ValueError:
+            # Empty files cannot be mapped
+            return source_digest(b'')
+
+def _load_mapped(path: Path, source_hash: Optional[bytes] = None,
+                 optimize: Optional[int] = None) -> List[Node]:
+    """loads() over a read-only map of path, so the sections are cast over
+    the page cache instead of a copy of the file"""
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SPLCError("Empty .splc file") from None
+    try:
+        return loads(mapped, source_hash, optimize)
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            # A failed load's traceback still holds views into the map;
+            # it is unmapped once they are freed
+            pass
+
+def _parse_file(path: Path, lazy: bool = False, jobs: int = 1,
+                on_timings: Optional[Callable] = None) -> List[Node]:
+    if jobs != 1:
+        # Parallel parsing builds whole bodies, so it ignores lazy
+        from .parallel_parser import parse_parallel
+        ast, timings = parse_parallel(path.read_text(encoding='utf-8'), jobs)
+        if on_timings:
+            on_timings(timings)
+        return ast
+    from .lexer import stream_tokens
+    from .parser import Parser
+    return Parser(stream_tokens(path), lazy=lazy).parse()
+
+def _optimize(ast: List[Node], optimize: int, on_report: Optional[Callable]) -> List[Node]:
+    if not optimize:
+        return ast
+    from .optimizer import optimize_ast
+    report = {}
+    ast = optimize_ast(ast, optimize, report)
+    if on_report:
+        on_report(report)
+    return ast
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def load_file(path: Union[str, Path], optimize: int = 0, use_cache: bool = True,
+              lazy: bool = False, jobs: int = 1,
+              on_timings: Optional[Callable] = None,
+              on_report: Optional[Callable] = None) -> List[Node]:
+    """Parse an SPL source file, going through __splcache__ when possible.
+
+    With lazy=True kazi bodies are only skimmed. A valid cache entry is still
+    used, but a fresh lazy parse is not written back since serializing it
+    would force every body. jobs other than 1 parses in a process pool (0
+    means one worker per CPU) and passes ParseTimings to on_timings. Fresh
+    parses are optimized at level optimize and the per-pass counts of removed
+    nodes go to on_report; cache entries are kept per level.
+    """
+    path = Path(path)
+    if not use_cache:
+        return _optimize(_parse_file(path, lazy, jobs, on_timings), optimize, on_report)
+
+    source_hash = _hash_file(path)
+    cached = cache_path(path, optimize)
+    try:
+        return _load_mapped(cached, source_hash, optimize)
+    except (OSError, SPLCError):
+        pass
+
+    ast = _optimize(_parse_file(path, lazy, jobs, on_timings), optimize, on_report)
+    if lazy and jobs == 1:
+        return ast
+    try:
+        write_atomic(cached, dumps(ast, source_hash, optimize))
+    except OSError:
+        # Read-only trees still run, just without a cache
+        pass
+    return ast
+
+def load_precompiled(path: Union[str, Path]) -> List[Node]:
+    """Load a standalone .splc file produced by `spl compile --target splc`"""
+    return _load_mapped(Path(path))
+
+def compile_file(source: Union[str, Path], output: Union[str, Path], optimize: int = 0,
+                 jobs: int = 1, on_timings: Optional[Callable] = None,
+                 on_report: Optional[Callable] = None) -> Path:
+    """Write a standalone .splc file for source"""
+    source, output = Path(source), Path(output)
+    ast = _optimize(_parse_file(source, jobs=jobs, on_timings=on_timings), optimize, on_report)
+    write_atomic(output, dumps(ast, _hash_file(source), optimize))
+    return output
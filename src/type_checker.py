@@ -3,28 +3,91 @@
 SPL Type Checker - Enhanced
 """
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .ast_nodes import (
+    Node, NodeVisitor, Number, String, Var, Assignment, BinaryOp, FunctionDef,
+    FunctionCall, Print, Return, If, PatternMatch, Literal, Binding, TypedPattern, Spawn,
+    ensure_nodes, from_dict
+)
 
 
 class TypeChecker:
     """SPL Type Validation System"""
     def __init__(self):
         self.type_map = {
-            'nambari': float,
+            'nambari': (int, float),
             'neno': str,
             'orodha': list,
-            'kamusi': dict
+            'kamusi': dict,
+            # Names shared with KihakikiAina and the compiler
+            'int': int,
+            'float': (int, float),
+            'str': str,
+            'any': object
         }
+        # Python's bool is an int, but kweli and sikweli are no nambari
+        self.not_bool = {'nambari'}
     
+        # Type name -> predicate, built once per name
+        self.guards: Dict[str, Optional[Callable[[Any], bool]]] = {}
+
     def check(self, value, expected_type: str):
         """Verify value matches expected SPL type"""
-        py_type = self.type_map.get(expected_type.lower())
-        if not py_type:
+        guard = self.guard(expected_type)
+        if guard is None:
             raise TypeError(f"Undefined type: {expected_type}")
         
-        if not isinstance(value, py_type):
+        if not guard(value):
             raise TypeError(f"Expected {expected_type}, got {type(value).__name__}")
 
+    def python_type(self, expected_type: str) -> Any:
+        """Python type or tuple of types for a plain type name, else None;
+        also None for a name isinstance alone cannot check"""
+        name = expected_type.lower()
+        if name in self.not_bool:
+            return None
+        return self.type_map.get(name)
+
+    def guard(self, expected_type: str) -> Optional[Callable[[Any], bool]]:
+        """Predicate for values of expected_type, None if the type is unknown"""
+        try:
+            return self.guards[expected_type]
+        except KeyError:
+            pass
+        guard = self.build_guard(expected_type)
+        self.guards[expected_type] = guard
+        return guard
+
+    def build_guard(self, expected_type: str) -> Optional[Callable[[Any], bool]]:
+        py_type = self.python_type(expected_type)
+        if py_type is object:
+            return lambda value: True
+        if py_type:
+            return lambda value: isinstance(value, py_type)
+        if expected_type.lower() in self.not_bool:
+            numeric = self.type_map[expected_type.lower()]
+            return lambda value: isinstance(value, numeric) and value.__class__ is not bool
+        name, bracket, inner = expected_type.partition('[')
+        if not bracket or not inner.endswith(']'):
+            return None
+        container = self.python_type(name)
+        element = self.guard(inner[:-1])
+        if container not in (list, dict) or element is None:
+            return None
+
+        def generic(value: Any) -> bool:
+            # Elements are sampled, not scanned: the first, middle and last
+            # items of an orodha, the first value of a kamusi
+            if not isinstance(value, container):
+                return False
+            if not value:
+                return True
+            if container is dict:
+                return element(next(iter(value.values())))
+            return element(value[0]) and element(value[len(value) // 2]) and element(value[-1])
+        return generic
+
 class KosaAina(Exception):
     """Custom type error with Swahili messages and location info"""
     def __init__(self, ujumbe: str, eneo: Optional[Dict] = None):
@@ -77,8 +140,19 @@ class MazingiraAina:
     def fungua_kitundu(self) -> 'MazingiraAina':
         return MazingiraAina(self)
 
-class KihakikiAina:
-    def __init__(self):
+class KihakikiAina(NodeVisitor):
+    """Static type inference over the AST.
+
+    With laini set, a node the checker cannot type gets any instead of
+    failing the whole check, and kazi bodies see only their own names, as
+    free names resolve in the caller at run time. aina_za_nodi keeps the
+    type of every node visited.
+    """
+    visit_prefix = 'tembelea_'
+
+    def __init__(self, laini: bool = False):
+        self.laini = laini
+        self.aina_za_nodi: Dict[Node, Aina] = {}
         self.mazingira = MazingiraAina()
         self.aina_ya_msingi = {
             'int': AinaKamili('int'),
@@ -87,51 +161,84 @@ class KihakikiAina:
             'any': AinaKamili('any'),
             'Task': AinaKamili('Task')
         }
+        # Majina ya Kiswahili; nambari inakubali int na float kama float
+        self.aina_ya_msingi['nambari'] = self.aina_ya_msingi['float']
+        self.aina_ya_msingi['neno'] = self.aina_ya_msingi['str']
 
-    def hakiki(self, ast: List[Dict]) -> List[Aina]:
+    def hakiki(self, ast: List[Node]) -> List[Aina]:
         matokeo = []
-        for kitu in ast:
+        for kitu in ensure_nodes(ast):
             matokeo.append(self.tembelea(kitu))
         return matokeo
 
-    def tembelea(self, kitu: Dict) -> Aina:
-        njia = getattr(self, f"tembelea_{kitu['type']}", None)
-        if not njia:
-            raise KosaAina(f"Hakuna uhandisi wa aina kwa {kitu['type']}", kitu.get('loc'))
-        return njia(kitu)
+    def tembelea(self, kitu: Node) -> Aina:
+        try:
+            aina = self.visit(kitu)
+        except KosaAina:
+            if not self.laini:
+                raise
+            aina = AinaKamili('any', kitu.location)
+        self.aina_za_nodi[kitu] = aina
+        return aina
+
+    def tembelea_kitalu(self, kauli: List[Node], majina: Optional[Dict[str, Aina]] = None) -> Aina:
+        """Hakiki kitalu; majina kinachoweka hayaonekani nje yake"""
+        mazingira_ya_awali = self.mazingira
+        self.mazingira = mazingira_ya_awali.fungua_kitundu()
+        for jina, aina in (majina or {}).items():
+            self.mazingira.weka(jina, aina)
+        aina_matokeo = AinaKamili('none')
+        try:
+            for stmt in kauli:
+                aina_matokeo = self.tembelea(stmt)
+        finally:
+            self.mazingira = mazingira_ya_awali
+        return aina_matokeo
 
-    def tembelea_Number(self, kitu: Dict) -> Aina:
-        thamani = kitu['value']
-        aina = 'float' if isinstance(thamani, float) else 'int'
-        return AinaKamili(aina, kitu.get('loc'))
+    def unganisha_aina(self, a: Aina, b: Aina) -> Aina:
+        """Aina ya thamani inayoweza kuwa a au b"""
+        return a if a.jina == b.jina else AinaKamili('any')
 
-    def tembelea_String(self, kitu: Dict) -> Aina:
-        return AinaKamili('str', kitu.get('loc'))
+    def generic_visit(self, kitu: Node) -> Aina:
+        raise KosaAina(f"Hakuna uhandisi wa aina kwa {kitu.type}", kitu.location)
 
-    def tembelea_Var(self, kitu: Dict) -> Aina:
-        jina = kitu['name']
+    def tembelea_Number(self, kitu: Number) -> Aina:
+        aina = 'float' if isinstance(kitu.value, float) else 'int'
+        return AinaKamili(aina, kitu.location)
+
+    def tembelea_String(self, kitu: String) -> Aina:
+        return AinaKamili('str', kitu.location)
+
+    def tembelea_Literal(self, kitu: Literal) -> Aina:
+        if isinstance(kitu.value, str):
+            return AinaKamili('str', kitu.location)
+        aina = 'float' if isinstance(kitu.value, float) else 'int'
+        return AinaKamili(aina, kitu.location)
+
+    def tembelea_Var(self, kitu: Var) -> Aina:
+        jina = kitu.name
         try:
             return self.mazingira.pata(jina)
         except KosaAina as k:
-            raise KosaAina(f"Kigezo '{jina}' hakijafafanuliwa", kitu.get('loc')) from k
+            raise KosaAina(f"Kigezo '{jina}' hakijafafanuliwa", kitu.location) from k
 
-    def tembelea_Assignment(self, kitu: Dict) -> Aina:
-        jina = kitu['name']
-        aina_ya_thamani = self.tembelea(kitu['value'])
+    def tembelea_Assignment(self, kitu: Assignment) -> Aina:
+        jina = kitu.name
+        aina_ya_thamani = self.tembelea(kitu.value)
         self.mazingira.weka(jina, aina_ya_thamani)
         return aina_ya_thamani
 
-    def tembelea_BinaryOp(self, kitu: Dict) -> Aina:
-        op = kitu['operator']
-        aina_kushoto = self.tembelea(kitu['left'])
-        aina_kulia = self.tembelea(kitu['right'])
-        eneo = kitu.get('loc')
+    def tembelea_BinaryOp(self, kitu: BinaryOp) -> Aina:
+        op = kitu.operator
+        aina_kushoto = self.tembelea(kitu.left)
+        aina_kulia = self.tembelea(kitu.right)
+        eneo = kitu.location
 
         # Ukaguzi wa aina kwa kila kiendeshazi
         if op in {'+', '-', '*', '/'}:
             if not self.aina_linganipo(aina_kushoto, aina_kulia, ['int', 'float']):
                 raise KosaAina(f"Kiendeshazi '{op}' haifanyi kazi kwa {aina_kushoto.jina} na {aina_kulia.jina}", eneo)
-            return self.aina_ya_matokeo(aina_kushoto, aina_kulia)
+            return self.aina_ya_matokeo(aina_kushoto, aina_kulia, op)
         
         if op in {'==', '!=', '<', '>', '<=', '>='}:
             if not self.aina_linganipo(aina_kushoto, aina_kulia):
@@ -151,47 +258,78 @@ class KihakikiAina:
             return False
         return a.jina == b.jina or 'any' in {a.jina, b.jina}
 
-    def aina_ya_matokeo(self, a: Aina, b: Aina) -> Aina:
+    def aina_ya_matokeo(self, a: Aina, b: Aina, op: str = '+') -> Aina:
         """Amua aina ya matokeo ya kiendeshazi"""
-        if a.jina == 'float' or b.jina == 'float':
+        if 'any' in {a.jina, b.jina}:
+            return AinaKamili('any')
+        if op == '/' or a.jina == 'float' or b.jina == 'float':
             return AinaKamili('float')
         return AinaKamili('int')
 
-    def tembelea_FunctionDef(self, kitu: Dict) -> Aina:
-        jina = kitu['name']
-        eneo = kitu.get('loc')
+    def tembelea_FunctionDef(self, kitu: FunctionDef) -> Aina:
+        jina = kitu.name
+        eneo = kitu.location
         
         # Pata aina za vigezo
-        aina_param = [self.tafsiri_aina(p.get('type', 'any')) for p in kitu['params']]
+        aina_param = [self.tafsiri_aina(p.annotation or 'any') for p in kitu.params]
         
         # Pata aina ya kurudi
-        aina_kurudi = self.tafsiri_aina(kitu.get('return_type', 'any'))
+        aina_kurudi = self.tafsiri_aina(kitu.return_type or 'any')
         
-        # Fungua mazingira mapya
-        mazingira_ya_kazi = self.mazingira.fungua_kitundu()
-        for param, aina in zip(kitu['params'], aina_param):
-            mazingira_ya_kazi.weka(param['name'], aina)
+        # Fungua mazingira mapya; kwa laini majina huru ni ya mwitaji
+        mazingira_ya_kazi = MazingiraAina() if self.laini else self.mazingira.fungua_kitundu()
+        for param, aina in zip(kitu.params, aina_param):
+            mazingira_ya_kazi.weka(param.name, aina)
         
         # Badili mazingira na uhakiki mwili
         mazingira_ya_awali = self.mazingira
         self.mazingira = mazingira_ya_kazi
         
         aina_mwili = AinaKamili('any')
-        for stmt in kitu['body']:
-            aina_mwili = self.tembelea(stmt)
+        try:
+            for stmt in kitu.body:
+                aina_mwili = self.tembelea(stmt)
+        finally:
+            self.mazingira = mazingira_ya_awali
         
-        self.mazingira = mazingira_ya_awali
+        # Angalia kila rudisha, hata ndani ya kama na lingana, kabla ya
+        # kuhifadhi kazi
+        aina_zote = self.aina_za_kurudi(kitu.body) + [aina_mwili]
+        for aina in aina_zote:
+            if not self.aina_linganipo(aina, aina_kurudi):
+                raise KosaAina(f"Aina ya kurudi {aina.jina} hailingani na {aina_kurudi.jina}", eneo)
+        
+        # Kwa laini, miito inapata aina ambayo mwili unathibitisha, si
+        # ile iliyotangazwa tu
+        if self.laini:
+            aina_kurudi = aina_zote[0]
+            for aina in aina_zote[1:]:
+                aina_kurudi = self.unganisha_aina(aina_kurudi, aina)
         
         # Uhifadhi aina ya kazi
         aina_kazi = AinaKazi(aina_param, aina_kurudi, eneo)
         self.mazingira.weka(jina, aina_kazi)
         
-        # Angalia ufanisi wa aina ya kurudi
-        if not self.aina_linganipo(aina_mwili, aina_kurudi):
-            raise KosaAina(f"Aina ya kurudi {aina_mwili.jina} hailingani na {aina_kurudi.jina}", eneo)
-        
         return aina_kazi
 
+    def aina_za_kurudi(self, kauli: List[Node]) -> List[Aina]:
+        """Aina za rudisha zote ndani ya kauli, bila za kazi za ndani"""
+        matokeo = []
+        stack = list(kauli)
+        while stack:
+            kitu = stack.pop()
+            if isinstance(kitu, FunctionDef):
+                continue
+            if isinstance(kitu, Return) and kitu in self.aina_za_nodi:
+                matokeo.append(self.aina_za_nodi[kitu])
+            for field in kitu.fields:
+                thamani = getattr(kitu, field, None)
+                if isinstance(thamani, Node):
+                    stack.append(thamani)
+                elif isinstance(thamani, list):
+                    stack.extend(mtoto for mtoto in thamani if isinstance(mtoto, Node))
+        return matokeo
+
     def tafsiri_aina(self, jina_aina: str) -> Aina:
         """Badili jina la aina kuwa kitu cha Aina"""
         if jina_aina.startswith('orodha['):
@@ -199,16 +337,16 @@ class KihakikiAina:
             return AinaOrodha(self.tafsiri_aina(ndani), {})
         return self.aina_ya_msingi.get(jina_aina, AinaKamili(jina_aina))
 
-    def tembelea_FunctionCall(self, kitu: Dict) -> Aina:
-        aina_kazi = self.tembelea(kitu['function'])
-        eneo = kitu.get('loc')
+    def tembelea_FunctionCall(self, kitu: FunctionCall) -> Aina:
+        aina_kazi = self.tembelea(kitu.function)
+        eneo = kitu.location
+        
+        # Pata aina za hoja, ili zihifadhiwe hata kama mwito haueleweki
+        aina_hoja = [self.tembelea(arg) for arg in kitu.args]
         
         if not isinstance(aina_kazi, AinaKazi):
             raise KosaAina("Huwezi kuita kitu ambacho si kazi", eneo)
         
-        # Pata aina za hoja
-        aina_hoja = [self.tembelea(arg) for arg in kitu['args']]
-        
         # Linganisha na aina za vigezo
         if len(aina_hoja) != len(aina_kazi.param):
             raise KosaAina(f"Idadi ya hoja si sahihi: {len(aina_hoja)} badala ya {len(aina_kazi.param)}", eneo)
@@ -219,40 +357,54 @@ class KihakikiAina:
         
         return aina_kazi.kurudi
 
-    def tembelea_Print(self, kitu: Dict) -> Aina:
+    def tembelea_Print(self, kitu: Print) -> Aina:
         # Chapisha inaruhusu aina zozote
-        self.tembelea(kitu['value'])
-        return AinaKamili('none', kitu.get('loc'))
+        self.tembelea(kitu.value)
+        return AinaKamili('none', kitu.location)
+
+    def tembelea_Return(self, kitu: Return) -> Aina:
+        if kitu.value is None:
+            return AinaKamili('none', kitu.location)
+        return self.tembelea(kitu.value)
+
+    def tembelea_If(self, kitu: If) -> Aina:
+        self.tembelea(kitu.condition)
+        # Kila tawi ni kitalu chake
+        return self.unganisha_aina(self.tembelea_kitalu(kitu.then),
+                                   self.tembelea_kitalu(kitu.orelse))
 
-    def tembelea_PatternMatch(self, kitu: Dict) -> Aina:
-        aina_ya_linganisho = self.tembelea(kitu['expression'])
+    def tembelea_PatternMatch(self, kitu: PatternMatch) -> Aina:
+        aina_ya_linganisho = self.tembelea(kitu.expression)
         aina_matokeo = None
         
-        for kesi in kitu['cases']:
+        for kesi in kitu.cases:
             # Hakiki muundo
-            muundo = kesi['pattern']
-            if muundo['type'] == 'Literal':
+            muundo = kesi.pattern
+            if isinstance(muundo, Literal):
                 if not self.aina_linganipo(aina_ya_linganisho, self.tembelea(muundo)):
-                    raise KosaAina(f"Muundo {muundo['value']} haufanani na {aina_ya_linganisho.jina}", kesi.get('loc'))
-            elif muundo['type'] == 'TypedPattern':
-                aina_ya_muundo = self.tafsiri_aina(muundo['annotation'])
+                    raise KosaAina(f"Muundo {muundo.value} haufanani na {aina_ya_linganisho.jina}", kesi.location)
+            elif isinstance(muundo, TypedPattern):
+                aina_ya_muundo = self.tafsiri_aina(muundo.annotation)
                 if not self.aina_linganipo(aina_ya_linganisho, aina_ya_muundo):
-                    raise KosaAina(f"Muundo {aina_ya_muundo.jina} haufanani na {aina_ya_linganisho.jina}", kesi.get('loc'))
+                    raise KosaAina(f"Muundo {aina_ya_muundo.jina} haufanani na {aina_ya_linganisho.jina}", kesi.location)
             
-            # Hakiki mwili wa kesi
-            for stmt in kesi['body']:
-                aina_kesi = self.tembelea(stmt)
-                if aina_matokeo is None:
-                    aina_matokeo = aina_kesi
-                elif not self.aina_linganipo(aina_matokeo, aina_kesi):
-                    aina_matokeo = AinaKamili('any')
+            # Hakiki mwili wa kesi, pamoja na jina muundo unalofunga
+            majina = {}
+            if isinstance(muundo, TypedPattern):
+                majina[muundo.name] = self.tafsiri_aina(muundo.annotation)
+            elif isinstance(muundo, Binding):
+                majina[muundo.name] = aina_ya_linganisho
+            aina_kesi = self.tembelea_kitalu(kesi.body, majina)
+            if aina_matokeo is None:
+                aina_matokeo = aina_kesi
+            elif not self.aina_linganipo(aina_matokeo, aina_kesi):
+                aina_matokeo = AinaKamili('any')
         
         return aina_matokeo or AinaKamili('none')
 
-    def tembelea_Spawn(self, kitu: Dict) -> Aina:
-        for stmt in kitu['body']:
-            self.tembelea(stmt)
-        return AinaKamili('Task', kitu.get('loc'))
+    def tembelea_Spawn(self, kitu: Spawn) -> Aina:
+        self.tembelea_kitalu(kitu.body)
+        return AinaKamili('Task', kitu.location)
 
 if __name__ == '__main__':
     # Jaribio la kuhakiki aina
@@ -283,7 +435,7 @@ if __name__ == '__main__':
 
     hakiki = KihakikiAina()
     try:
-        matokeo = hakiki.hakiki(ast_mfano)
+        matokeo = hakiki.hakiki(from_dict(ast_mfano))
         print("Hakiki ya Aina Imefanikiwa!")
     except KosaAina as k:
         print(k)
\ No newline at end of file
@@ -6,6 +6,8 @@ Vidokezo vya Udhibiti wa Maonyesho ya Miundo ya Data
 import graphviz
 from typing import Union, Dict, List, Optional
 
+from .ast_nodes import Node
+
 class Kivizulia:
     def __init__(self):
         self.chati = graphviz.Digraph('AST', format='png',
@@ -32,8 +34,26 @@ class Kivizulia:
         self.id_ya_node += 1
         return kitambulisho
 
-    def _safiri_ast(self, nodi: Union[Dict, List], kitambulisho_mzazi: Optional[str] = None):
+    def _safiri_ast(self, nodi: Union[Node, Dict, List], kitambulisho_mzazi: Optional[str] = None):
         """Safiri muundo wa AST na uunde michoro"""
+        if isinstance(nodi, Node):
+            maudhui = "\n".join(
+                f"{ufunguo}: {getattr(nodi, ufunguo)}"
+                for ufunguo in ('name', 'value', 'operator')
+                if ufunguo in nodi.fields
+            )
+            kitambulisho = self._unda_node(nodi.type, maudhui)
+
+            if kitambulisho_mzazi:
+                self.chati.edge(kitambulisho_mzazi, kitambulisho)
+
+            for ufunguo in nodi.fields:
+                thamani = getattr(nodi, ufunguo)
+                if ufunguo in ('name', 'value', 'operator') and not isinstance(thamani, Node):
+                    continue
+                self._chora_kivinjari(thamani, kitambulisho, ufunguo)
+            return kitambulisho
+
         if isinstance(nodi, dict):
             aina = nodi.get('aina', 'Haijulikani')
             maudhui = self._fanya_maudhui(nodi)
@@ -46,6 +66,7 @@ class Kivizulia:
                 if ufunguo in ['aina', 'thamani', 'jina']:
                     continue
                 self._chora_kivinjari(thamani, kitambulisho, ufunguo)
+            return kitambulisho
 
         elif isinstance(nodi, list):
             for kipengele in nodi:
@@ -53,12 +74,13 @@ class Kivizulia:
 
     def _chora_kivinjari(self, data, kitambulisho_mzazi: str, ufunguo: str):
         """Chora viungo kwa nodi za mtoto"""
-        if isinstance(data, dict):
-            kitambulisho = self._safiri_ast(data, kitambulisho_mzazi)
+        if isinstance(data, (Node, dict)):
+            # Ukingo wenye lebo unachorwa hapa, si ndani ya _safiri_ast
+            kitambulisho = self._safiri_ast(data)
             self.chati.edge(kitambulisho_mzazi, kitambulisho, label=ufunguo)
         elif isinstance(data, list):
             for i, kipengele in enumerate(data):
-                kitambulisho = self._safiri_ast(kipengele, kitambulisho_mzazi)
+                kitambulisho = self._safiri_ast(kipengele)
                 self.chati.edge(kitambulisho_mzazi, kitambulisho, label=f"{ufunguo}[{i}]")
         else:
             kitambulisho = self._unda_node('Thamani', str(data))
@@ -72,7 +94,7 @@ class Kivizulia:
                 vipengele.append(f"{ufunguo}: {nodi[ufunguo]}")
         return "\n".join(vipengele)
 
-    def onyesha_ast(self, ast: Dict, jina_la_faili: str = "ast") -> str:
+    def onyesha_ast(self, ast: Union[Node, Dict, List], jina_la_faili: str = "ast") -> str:
         """
         Tengeneza na uonyeshe mchoro wa AST
         
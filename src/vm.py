@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""
+SPL Virtual Machine - bytecode compiler and stack VM execution engine
+
+Programs compile to CodeObjects: (opcode, operand) pairs in an array plus
+constant, name and node pools. VirtualMachine runs them with the same
+semantics and errors as the tree-walking Interpreter.
+"""
+import operator
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from .ast_nodes import (
+    Node, NodeVisitor, FunctionDef, Binding, TypedPattern, Number, String,
+    ensure_nodes
+)
+from .concurrency import spawn
+from .decision import decision_tree
+from .custom_builtins import CUSTOM_BUILTINS
+from .event_loop import EventLoop, Suspend, complete
+from .interpreter import Environment, ReturnSignal, SPLRuntimeError, lookup, parameter_guard
+from .memo import Memoizer
+from .optimizer import binds_names
+from .processes import CaptureError, default_backend, spawn_process
+from .resolver import tail_calls
+
+# Opcodes, in the groups the loop tells apart with one comparison each
+LOAD_NAME = 0
+LOAD_LOCAL = 1
+LOAD_CONST = 2
+BINARY_CONST = 3
+BINARY_ADD = 4
+BINARY_SUB = 5
+BINARY_MUL = 6
+BINARY_DIV = 7
+BINARY_EQ = 8
+BINARY_NE = 9
+BINARY_LT = 10
+BINARY_GT = 11
+BINARY_LE = 12
+BINARY_GE = 13
+CALL = 14
+TAIL_CALL = 15
+RETURN_VALUE = 16
+JUMP_IF_FALSE = 17
+JUMP = 18
+POP_TOP = 19
+DISPATCH = 20
+STORE_NAME = 21
+STORE_TYPED = 22
+PUSH_SCOPE = 23
+POP_SCOPE = 24
+BIND_NAME = 25
+NO_MATCH = 26
+PRINT = 27
+MAKE_FUNCTION = 28
+SPAWN = 29
+RAISE_RETURN = 30
+UNKNOWN_OP = 31
+
+OPNAMES = [name for name, value in sorted(
+    ((name, value) for name, value in globals().items()
+     if name.isupper() and isinstance(value, int)),
+    key=lambda item: item[1])]
+
+# What each operator opcode computes; BINARY_ADD is also inlined
+BINARY_FUNCTIONS = {
+    BINARY_ADD: operator.add,
+    BINARY_SUB: operator.sub,
+    BINARY_MUL: operator.mul,
+    BINARY_DIV: operator.truediv,
+    BINARY_EQ: operator.eq,
+    BINARY_NE: operator.ne,
+    BINARY_LT: operator.lt,
+    BINARY_GT: operator.gt,
+    BINARY_LE: operator.le,
+    BINARY_GE: operator.ge,
+}
+
+BINARY_OPCODES = {
+    '+': BINARY_ADD,
+    '-': BINARY_SUB,
+    '*': BINARY_MUL,
+    '/': BINARY_DIV,
+    '==': BINARY_EQ,
+    '!=': BINARY_NE,
+    '<': BINARY_LT,
+    '>': BINARY_GT,
+    '<=': BINARY_LE,
+    '>=': BINARY_GE,
+}
+
+class CodeObject:
+    """Compiled block: instruction pairs and the pools their operands index"""
+    __slots__ = ('name', 'kind', 'code', 'ops', 'consts', 'names', 'nodes', 'local_names')
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        # 'module', 'function' or 'block' (anzisha bodies)
+        self.kind = kind
+        self.code = array('l')
+        # What the VM reads: (opcode, operand) at each instruction's offset
+        # in code, so jump targets index both; one tuple unpack per step
+        # is cheaper than two array reads
+        self.ops: List[Optional[tuple]] = []
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        self.nodes: List[Node] = []
+        # Names this code may store outside the Environment it started in
+        self.local_names: Set[str] = set()
+
+    def seal(self) -> None:
+        """Build ops from code; done again after code is patched"""
+        code = self.code
+        ops: List[Optional[tuple]] = [None] * len(code)
+        for pc in range(0, len(code), 2):
+            ops[pc] = (code[pc], code[pc + 1])
+        self.ops = ops
+
+    def __repr__(self) -> str:
+        return f"<CodeObject {self.name} ({len(self.code) // 2} instructions)>"
+
+def disassemble(code: CodeObject) -> str:
+    """Readable listing of a CodeObject, one instruction per line"""
+    lines = [f"{code.kind} {code.name}:"]
+    for pc in range(0, len(code.code), 2):
+        op, arg = code.code[pc], code.code[pc + 1]
+        if op in (LOAD_NAME, LOAD_LOCAL, STORE_NAME, BIND_NAME):
+            detail = code.names[arg]
+        elif op == BINARY_CONST:
+            function, value, _ = code.consts[arg]
+            detail = f"{function.__name__} {value!r}"
+        elif op in (LOAD_CONST, STORE_TYPED, MAKE_FUNCTION, SPAWN):
+            detail = repr(code.consts[arg])
+        elif op == DISPATCH:
+            _, targets = code.consts[arg]
+            detail = "-> " + " ".join(str(target // 2) for target in targets)
+        else:
+            detail = ""
+        lines.append(f"  {pc // 2:>5} {OPNAMES[op]:<14} {arg:>5} {detail}")
+    return "\n".join(lines)
+
+class BytecodeCompiler(NodeVisitor):
+    """Compile AST nodes into a CodeObject; each statement leaves one value"""
+
+    def __init__(self, name: str = "<module>", kind: str = 'module', tail=frozenset()):
+        self.code = CodeObject(name, kind)
+        self._consts: Dict[Any, int] = {}
+        self._names: Dict[str, int] = {}
+        # FunctionCall nodes compiled to TAIL_CALL (kazi bodies only)
+        self.tail = tail
+        # Nested PUSH_SCOPEs at the current instruction
+        self.depth = 0
+
+    def compile(self, statements: List[Node]) -> CodeObject:
+        self.compile_block(statements)
+        self.emit(RETURN_VALUE)
+        code = self.code.code
+        for pc in range(0, len(code), 2):
+            # A jump to a return returns straight away
+            if code[pc] == JUMP and code[code[pc + 1]] == RETURN_VALUE:
+                code[pc], code[pc + 1] = RETURN_VALUE, 0
+        self.code.seal()
+        return self.code
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        self.code.code.append(op)
+        self.code.code.append(arg)
+        return len(self.code.code) - 2
+
+    def patch(self, at: int, target: Optional[int] = None) -> None:
+        """Point the jump at instruction index at to target (default: here)"""
+        self.code.code[at + 1] = len(self.code.code) if target is None else target
+
+    def const(self, value: Any) -> int:
+        try:
+            key = (type(value), value)
+            hash(key)
+        except TypeError:
+            key = id(value)
+        if key not in self._consts:
+            self._consts[key] = len(self.code.consts)
+            self.code.consts.append(value)
+        return self._consts[key]
+
+    def name(self, name: str) -> int:
+        if name not in self._names:
+            self._names[name] = len(self.code.names)
+            self.code.names.append(name)
+        return self._names[name]
+
+    def node(self, node: Node) -> int:
+        self.code.nodes.append(node)
+        return len(self.code.nodes) - 1
+
+    def stored(self, name: str) -> None:
+        """Note a store; top-level stores outside any scope stay global"""
+        if self.code.kind != 'module' or self.depth:
+            self.code.local_names.add(name)
+
+    def compile_block(self, statements: List[Node]) -> None:
+        """Run statements in order, leaving the last value (or hakuna)"""
+        if not statements:
+            self.emit(LOAD_CONST, self.const(None))
+            return
+        for index, stmt in enumerate(statements):
+            if index:
+                self.emit(POP_TOP)
+            self.visit(stmt)
+
+    def compile_scoped(self, statements: List[Node]) -> None:
+        # A scope nothing is stored in behaves like its parent, so skip it
+        if not binds_names(statements):
+            self.compile_block(statements)
+            return
+        self.emit(PUSH_SCOPE)
+        self.depth += 1
+        self.compile_block(statements)
+        self.depth -= 1
+        self.emit(POP_SCOPE)
+
+    def generic_visit(self, node: Node) -> None:
+        raise SPLRuntimeError(f"Hakuna njia ya {node.type}", node)
+
+    def visit_Number(self, node) -> None:
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    visit_String = visit_Number
+    visit_Literal = visit_Number
+
+    def visit_Var(self, node) -> None:
+        self.emit(LOAD_NAME, self.name(node.name))
+
+    def visit_Assignment(self, node) -> None:
+        self.visit(node.value)
+        self.stored(node.name)
+        if node.var_type:
+            self.emit(STORE_TYPED, self.const((node.name, node.var_type)))
+        else:
+            self.emit(STORE_NAME, self.name(node.name))
+
+    def visit_BinaryOp(self, node) -> None:
+        self.visit(node.left)
+        op = BINARY_OPCODES.get(node.operator, UNKNOWN_OP)
+        if op != UNKNOWN_OP and isinstance(node.right, (Number, String)):
+            # As LOAD_CONST then the operator, in one step
+            self.emit(BINARY_CONST, self.const((BINARY_FUNCTIONS[op], node.right.value, self.node(node))))
+            return
+        self.visit(node.right)
+        self.emit(op, self.node(node))
+
+    def visit_Print(self, node) -> None:
+        self.visit(node.value)
+        self.emit(PRINT)
+
+    def visit_Return(self, node) -> None:
+        if node.value is None:
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            self.visit(node.value)
+        # Only a kazi body can return directly; elsewhere the signal
+        # propagates exactly as in the tree walker
+        self.emit(RETURN_VALUE if self.code.kind == 'function' else RAISE_RETURN)
+
+    def visit_FunctionDef(self, node: FunctionDef) -> None:
+        # Bodies compile on first call, so lazily parsed kazi stay unparsed
+        self.stored(node.name)
+        self.emit(MAKE_FUNCTION, self.const(node))
+
+    def visit_FunctionCall(self, node) -> None:
+        self.visit(node.function)
+        for arg in node.args:
+            self.visit(arg)
+        self.emit(TAIL_CALL if node in self.tail else CALL, len(node.args))
+
+    def visit_If(self, node) -> None:
+        self.visit(node.condition)
+        to_else = self.emit(JUMP_IF_FALSE)
+        self.compile_scoped(node.then)
+        to_end = self.emit(JUMP)
+        self.patch(to_else)
+        self.compile_scoped(node.orelse)
+        self.patch(to_end)
+
+    def visit_PatternMatch(self, node) -> None:
+        # DISPATCH takes the subject off the stack and jumps to the chosen
+        # case, whose BIND_NAME, if any, comes first; cases that store names
+        # get a fresh scope, as in the tree walker
+        self.visit(node.expression)
+        tree = decision_tree(node.cases)
+        # Case index -> jump target, then the no-match target last
+        targets = [0] * (len(node.cases) + 1)
+        self.emit(DISPATCH, self.const((tree, targets)))
+        to_end = []
+        for index in tree.reachable:
+            case = node.cases[index]
+            targets[index] = len(self.code.code)
+            pattern = case.pattern
+            scoped = isinstance(pattern, (Binding, TypedPattern)) or binds_names(case.body)
+            if scoped:
+                self.emit(PUSH_SCOPE)
+                self.depth += 1
+            if isinstance(pattern, (Binding, TypedPattern)):
+                self.stored(pattern.name)
+                self.emit(BIND_NAME, self.name(pattern.name))
+            self.compile_block(case.body)
+            if scoped:
+                self.depth -= 1
+                self.emit(POP_SCOPE)
+            to_end.append(self.emit(JUMP))
+        targets[-1] = len(self.code.code)
+        self.emit(NO_MATCH, self.node(node))
+        for at in to_end:
+            self.patch(at)
+
+    def visit_Spawn(self, node) -> None:
+        body = BytecodeCompiler("<anzisha>", 'block').compile(node.body)
+        self.code.local_names |= body.local_names
+        self.emit(SPAWN, self.const((body, node)))
+
+def bind(variables: Dict[str, Any], params: tuple, args: Sequence[Any]) -> None:
+    """Store arguments in a fresh scope, which has no sandbox and no
+    earlier bindings to version; extra arguments are ignored"""
+    if len(args) < len(params):
+        params = params[:len(args)]
+    index = 0
+    for name in params:
+        variables[name] = args[index]
+        index += 1
+
+def load_locals(code: CodeObject, params: Set[str]) -> None:
+    """Turn loads of parameters the body never rebinds into LOAD_LOCAL.
+
+    Such a name is always in the kazi's own Environment, whatever scope
+    the load runs in, so the VM reads it there without walking the chain.
+    """
+    instructions = code.code
+    for pc in range(0, len(instructions), 2):
+        if instructions[pc] == LOAD_NAME:
+            name = code.names[instructions[pc + 1]]
+            if name in params and name not in code.local_names:
+                instructions[pc] = LOAD_LOCAL
+    code.seal()
+
+class VMFunction:
+    """A kazi defined under the VM; callable from builtins like panga"""
+    __slots__ = ('node', 'vm', 'root', 'guard', 'params', '_code')
+
+    def __init__(self, node: FunctionDef, vm: 'VirtualMachine', root: Environment):
+        self.node = node
+        self.vm = vm
+        # Environment global names are read from
+        self.root = root
+        # Shared by every kazi with the same signature
+        self.guard = parameter_guard(tuple((param.name, param.annotation) for param in node.params))
+        self.params = tuple(param.name for param in node.params)
+        self._code: Optional[CodeObject] = None
+
+    @property
+    def spl_node(self) -> FunctionDef:
+        """Sent as its definition when an anzisha block runs in another process"""
+        return self.node
+
+    @property
+    def code(self) -> CodeObject:
+        if self._code is None:
+            body = self.node.body
+            code = BytecodeCompiler(self.node.name, 'function', tail_calls(body)).compile(body)
+            load_locals(code, set(self.params))
+            code.local_names.update(self.params)
+            # Registered before the body first runs and stores anything
+            self.vm.local_names |= code.local_names
+            self._code = code
+        return self._code
+
+    def __call__(self, *args: Any) -> Any:
+        vm = self.vm
+        caller_env = vm.current_env
+        try:
+            return vm.run(self.code, vm.enter(self, args, caller_env), self.root)
+        finally:
+            # Builtin calls in the body moved it; the next call from the
+            # same builtin must see its own caller's scope
+            vm.current_env = caller_env
+
+    def __repr__(self) -> str:
+        return f"<kazi {self.node.name}>"
+
+class VirtualMachine:
+    """Stack VM with the Interpreter's interpret() API.
+
+    Calls between kazi do not recurse in Python: the loop keeps its state
+    in locals and, on CALL only, saves the caller's as one tuple on a list
+    of suspended frames; every frame shares one value stack. TAIL_CALL
+    replaces the running frame instead, so recursion depth is bounded by
+    memory rather than sys.getrecursionlimit(). Only calls made back from
+    builtins (panga and friends) start a nested run().
+
+    The loop itself is the steps() generator, which yields a Suspend when
+    it calls a builtin with an spl_async coroutine function. run() blocks
+    on those; on the async backend the program and its anzisha blocks
+    are driven as coroutines instead.
+    """
+
+    def __init__(self, sandbox: bool = False):
+        self.global_env = Environment(sandbox=sandbox)
+        self.global_env.vars.update(CUSTOM_BUILTINS)
+        # kumbuka works here too; calls between kazi bypass Python wrappers,
+        # so pure kazi are memoized only by the tree engine
+        self.memo = Memoizer()
+        # Builtins bound to this VM; a worker process has its own
+        self.bound_builtins = self.memo.builtins()
+        self.global_env.vars.update(self.bound_builtins)
+        # Scope of the running frame, read when builtins call back into SPL
+        self.current_env = self.global_env
+        # Every name some code stores below its starting Environment; any
+        # other name can only be global, so its lookup skips the call chain
+        self.local_names: Set[str] = set()
+        # Set on the async backend, whose builtins suspend instead of blocking
+        self.loop: Optional[EventLoop] = None
+        if default_backend() == 'async':
+            self.loop = EventLoop()
+            self.bound_builtins.update(self.loop.builtins())
+            self.global_env.vars.update(self.bound_builtins)
+
+    def compile(self, ast: List[Node]) -> CodeObject:
+        return BytecodeCompiler().compile(list(ensure_nodes(ast)))
+
+    def interpret(self, ast: List[Node], env: Optional[Environment] = None) -> Any:
+        """Compile and execute AST nodes in the specified environment"""
+        return self.execute(self.compile(ast), env or self.current_env)
+
+    def execute(self, code: CodeObject, env: Environment) -> Any:
+        self.local_names |= code.local_names
+        original_env = self.current_env
+        try:
+            if self.loop is not None and not self.loop.running():
+                return self.loop.run(self.steps(code, env, env))
+            return self.run(code, env, env)
+        finally:
+            self.current_env = original_env
+
+    def enter(self, function: VMFunction, args: tuple, caller_env: Environment) -> Environment:
+        """Scope for a call; like the tree walker, it hangs off the caller's"""
+        if function.guard is not None:
+            function.guard(args)
+        local_env = Environment(caller_env)
+        bind(local_env.vars, function.params, args)
+        return local_env
+
+    def run(self, code: CodeObject, env: Environment, root: Environment) -> Any:
+        return complete(self.steps(code, env, root))
+
+    def steps(self, code: CodeObject, env: Environment, root: Environment):
+        instructions = code.ops
+        consts = code.consts
+        names = code.names
+        # One value stack for every frame; base is where the running
+        # frame's values start
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        base = 0
+        pc = 0
+        # The running kazi's own variables, read by LOAD_LOCAL
+        own = env.vars
+        # Suspended callers: (code, pc, base, env, own)
+        frames: List[tuple] = []
+        # Value of the last lingana, for its case's BIND_NAME
+        subject = None
+        local_names = self.local_names
+        # Only the async backend installs builtins with spl_async
+        suspends = self.loop is not None
+        while True:
+            op, arg = instructions[pc]
+            pc += 2
+            if op < CALL:
+                # Loads and operators
+                if op == LOAD_LOCAL:
+                    try:
+                        push(own[names[arg]])
+                    except KeyError:
+                        # Too few arguments: found further out, if at all
+                        push(lookup(env, names[arg]))
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+                elif op == BINARY_CONST:
+                    function, right, at = consts[arg]
+                    try:
+                        stack[-1] = function(stack[-1], right)
+                    except TypeError as e:
+                        raise SPLRuntimeError(f"Aina si sahihi: {e}", code.nodes[at])
+                elif op == LOAD_NAME:
+                    name = names[arg]
+                    scope = env if name in local_names else root
+                    while True:
+                        variables = scope.vars
+                        if name in variables:
+                            push(variables[name])
+                            break
+                        scope = scope.parent
+                        if scope is None:
+                            raise SPLRuntimeError(f"Kisichojulikana: {name}")
+                else:
+                    right = pop()
+                    try:
+                        if op == BINARY_ADD:
+                            stack[-1] = stack[-1] + right
+                        else:
+                            stack[-1] = BINARY_FUNCTIONS[op](stack[-1], right)
+                    except TypeError as e:
+                        raise SPLRuntimeError(f"Aina si sahihi: {e}", code.nodes[arg])
+            elif op <= DISPATCH:
+                # Calls and control flow
+                if op <= TAIL_CALL:
+                    function = stack[-arg - 1]
+                    if type(function) is VMFunction and function.vm is self:
+                        args = stack[-arg:] if arg else ()
+                        del stack[-arg - 1:]
+                        callee = function._code or function.code
+                        # As enter(), without the method calls
+                        if function.guard is not None:
+                            function.guard(args)
+                        env = Environment(env)
+                        params = function.params
+                        if len(params) == arg:
+                            index = 0
+                            variables = env.vars
+                            for name in params:
+                                variables[name] = args[index]
+                                index += 1
+                        else:
+                            bind(env.vars, params, args)
+                        if op == CALL:
+                            frames.append((code, pc, base, env.parent, own))
+                            base = len(stack)
+                        elif len(stack) > base:
+                            # Nothing is left to do in this frame
+                            del stack[base:]
+                        own = env.vars
+                        code = callee
+                        instructions = code.ops
+                        consts = code.consts
+                        names = code.names
+                        pc = 0
+                    else:
+                        if arg:
+                            args = stack[-arg:]
+                            del stack[-arg:]
+                        else:
+                            args = ()
+                        self.current_env = env
+                        start = getattr(function, 'spl_async', None) if suspends else None
+                        if start is None:
+                            stack[-1] = function(*args)
+                        else:
+                            # Awaited on the loop, or called by complete()
+                            stack[-1] = yield Suspend(start, function, args)
+                elif op == RETURN_VALUE:
+                    if not frames:
+                        return pop()
+                    value = pop()
+                    if len(stack) > base:
+                        # Left below the value by a rudisha inside an expression
+                        del stack[base:]
+                    code, pc, base, env, own = frames.pop()
+                    instructions = code.ops
+                    consts = code.consts
+                    names = code.names
+                    push(value)
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == POP_TOP:
+                    pop()
+                else:
+                    tree, targets = consts[arg]
+                    subject = pop()
+                    index = tree.dispatch(subject)
+                    pc = targets[-1 if index is None else index]
+            elif op == STORE_NAME:
+                if env.sandbox is None:
+                    env.vars[names[arg]] = stack[-1]
+                else:
+                    env.set(names[arg], stack[-1])
+            elif op == STORE_TYPED:
+                name, var_type = consts[arg]
+                env.set(name, stack[-1], var_type)
+            elif op == PUSH_SCOPE:
+                env = Environment(parent=env)
+            elif op == POP_SCOPE:
+                # Calls made inside the scope have returned to it
+                env = env.parent
+            elif op == BIND_NAME:
+                # Right after the DISPATCH that set subject
+                env.set(names[arg], subject)
+            elif op == NO_MATCH:
+                raise SPLRuntimeError("Hakuna mfano ulinganifu", code.nodes[arg])
+            elif op == PRINT:
+                print(stack[-1])
+                stack[-1] = None
+            elif op == MAKE_FUNCTION:
+                node = consts[arg]
+                env.set(node.name, VMFunction(node, self, root))
+                push(None)
+            elif op == SPAWN:
+                body, node = consts[arg]
+                backend = node.backend or default_backend()
+                if backend == 'process':
+                    try:
+                        push(spawn_process(node.body, env, bound=self.bound_builtins))
+                    except CaptureError as e:
+                        raise SPLRuntimeError(str(e), node)
+                elif backend == 'async' and self.loop is not None:
+                    push(self.loop.spawn(self.steps(body, Environment(parent=env), root)))
+                else:
+                    push(spawn(self._spawn_task(body, Environment(parent=env), root)))
+            elif op == RAISE_RETURN:
+                raise ReturnSignal(pop())
+            elif op == UNKNOWN_OP:
+                node = code.nodes[arg]
+                raise SPLRuntimeError(f"Operesheni isiyojulikana: {node.operator}", node)
+            else:
+                raise SPLRuntimeError(f"Opcode isiyojulikana: {op}")
+
+    def _spawn_task(self, code: CodeObject, env: Environment, root: Environment):
+        def task_wrapper():
+            try:
+                return self.run(code, env, root)
+            except Exception as e:
+                print(f"Shida ya mtindo: {e}")
+        return task_wrapper
+
+if __name__ == '__main__':
+    from .lexer import Lexer
+    from .parser import Parser
+
+    source = """
+kazi fib(n: int) -> int {
+    kama n < 2 { rudisha n }
+    rudisha fib(n - 1) + fib(n - 2)
+}
+chapisha fib(20)
+"""
+    code = BytecodeCompiler().compile(Parser(Lexer(source).tokenize()).parse())
+    print(disassemble(code))
+    vm = VirtualMachine()
+    vm.execute(code, vm.global_env)
@@ -0,0 +1,60 @@
+import pytest
+
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.memo import Memoizer, pure_functions
+from src.parser import Parser
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def pure_names(source):
+    return {node.name for node in pure_functions(parse(source))}
+
+def test_pure_kazi():
+    source = """
+kazi mraba(x) { rudisha x * x }
+kazi jumla(x) { rudisha mraba(x) + urefu("abc") }
+kazi chapa(x) { chapisha(x) }
+"""
+    assert pure_names(source) == {'mraba', 'jumla'}
+
+@pytest.mark.parametrize("builtin", ["orodha()", "kamusi()", 'gawa("a b")'])
+def test_fresh_mutable_results_are_not_pure(builtin):
+    # A cache would hand every caller the same list or dict
+    assert pure_names(f"kazi mpya(n) {{ rudisha {builtin} }}\n") == set()
+
+def test_caches_with_the_same_name_keep_their_own_counts(capsys):
+    memo = Memoizer(auto=True)
+    interpreter = Interpreter(memo=memo)
+    interpreter.interpret(parse("""
+kazi f(n) { rudisha n + 1 }
+g = kumbuka(f)
+g(1)
+g(1)
+f(5)
+f(5)
+"""))
+    stats = memo.stats()
+    assert set(stats) == {'f#1', 'f#2'}
+    # The kazi's own cache, then the one kumbuka added around it
+    assert (stats['f#1']['hits'], stats['f#1']['misses']) == (1, 2)
+    assert (stats['f#2']['hits'], stats['f#2']['misses']) == (1, 1)
+    assert "f#1" in memo.report()
+
+def test_tail_calls_go_through_the_cache():
+    memo = Memoizer(auto=True)
+    interpreter = Interpreter(memo=memo)
+    interpreter.interpret(parse("""
+kazi jumla(n, acc) {
+    kama n == 0 { rudisha acc }
+    rudisha jumla(n - 1, acc + n)
+}
+a = jumla(5000, 0)
+b = jumla(5001, 0 - 5001)
+"""))
+    assert interpreter.global_env.get('a') == interpreter.global_env.get('b') == 12502500
+    stats = memo.stats()['jumla']
+    # Every call of the first chain was stored; the second one's first
+    # tail call, jumla(5000, 0), found it
+    assert (stats['hits'], stats['misses']) == (1, 5002)
@@ -0,0 +1,20 @@
+from pathlib import Path
+from typing import Any
+
+from src.compiler import Compiler
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+def transpile(source, **options):
+    namespace = {}
+    exec(Compiler(source, **options).compile("python"), namespace)
+    return namespace
+
+def test_transpiled_example_runs():
+    fibonacci = transpile((EXAMPLES / "fil.spl").read_text())['fibonacci']
+    assert [fibonacci(n) for n in range(10)] == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+
+def test_transpiled_annotations_are_python_types():
+    source = "kazi f(x: neno, y: haijulikani) -> nambari { rudisha urefu(x) }\n"
+    f = transpile(source)['f']
+    assert f.__annotations__ == {'x': str, 'y': Any, 'return': float}
@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from src import concurrency
+from src.concurrency import (
+    PoolFullError, Task, ThreadPool, WorkStealingPool, join_all, set_default_workers, spawn
+)
+
+@pytest.fixture
+def thread_per_task():
+    set_default_workers(0)
+    yield
+    set_default_workers(None)
+
+def test_stolen_tasks_run_once():
+    pool = WorkStealingPool(4)
+    runs = Counter()
+    lock = threading.Lock()
+
+    def node(path, depth):
+        with lock:
+            runs[path] += 1
+        if depth:
+            # Queued on this worker, so idle workers steal them while
+            # join runs them here
+            children = [spawn(node, path + (i,), depth - 1, pool=pool) for i in range(3)]
+            for child in children:
+                child.join()
+        return path
+
+    roots = [spawn(node, (i,), 4, pool=pool) for i in range(4)]
+    for root in roots:
+        root.join(10)
+    pool.shutdown()
+    # 4 roots, each with 3 + 9 + 27 + 81 descendants
+    assert len(runs) == 4 * 121
+    assert set(runs.values()) == {1}
+
+def test_join_all_has_one_deadline():
+    pool = WorkStealingPool(5)
+    tasks = [spawn(time.sleep, 0.5, pool=pool) for _ in range(5)]
+    start = time.monotonic()
+    results = join_all(tasks, timeout=0.1)
+    # Not 0.1 per task
+    assert time.monotonic() - start < 0.3
+    assert len(results) == 5
+    assert not all(task.done() for task in tasks)
+    pool.shutdown()
+
+def test_thread_per_task(thread_per_task):
+    assert concurrency.default_pool() is None
+
+    def total(n):
+        if n == 0:
+            return 0
+        task = spawn(total, n - 1)
+        task.join()
+        return n + task.result.value
+
+    task = spawn(total, 20)
+    task.join(10)
+    assert task.pool is None
+    assert task.result.value == 210
+
+def test_cli_workers_zero(tmp_path, monkeypatch, capsys):
+    from src import cli
+
+    path = tmp_path / "kazi.spl"
+    path.write_text("t = anzisha { 6 * 7 }\nchapisha(subiri(t))\n")
+    monkeypatch.setattr("sys.argv", ["spl", "--no-cache", "--workers", "0", "run", str(path)])
+    try:
+        cli.main()
+        assert concurrency.default_pool() is None
+    finally:
+        set_default_workers(None)
+    assert capsys.readouterr().out == "42\n"
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+def blocked(gate):
+    return Task(target=gate.wait, args=(5,))
+
+def full_pool(overflow):
+    """One worker busy until gate is set, and a queue of one that is full"""
+    pool = ThreadPool(max_workers=1, max_queue=1, overflow=overflow)
+    gate = threading.Event()
+    running, queued = blocked(gate), Task(target=lambda: 'foleni')
+    pool.submit(running)
+    wait_until(lambda: pool.metrics()['active_workers'] == 1)
+    pool.submit(queued)
+    return pool, gate, queued
+
+def test_pool_grows_then_shrinks_to_minimum():
+    pool = ThreadPool(max_workers=3, min_workers=1, idle_timeout=0.1)
+    pool.start()
+    assert pool.metrics()['workers'] == 1
+    gate = threading.Event()
+    tasks = [blocked(gate) for _ in range(5)]
+    for task in tasks:
+        pool.submit(task)
+    wait_until(lambda: pool.metrics()['active_workers'] == 3)
+    assert pool.metrics()['workers'] == 3
+    assert pool.metrics()['queue_depth'] == 2
+    gate.set()
+    join_all(tasks, 5)
+    wait_until(lambda: pool.metrics()['workers'] == 1)
+    pool.shutdown()
+
+def test_full_queue_rejects():
+    pool, gate, _ = full_pool('reject')
+    with pytest.raises(PoolFullError):
+        pool.submit(Task(target=int))
+    assert pool.metrics()['rejected'] == 1
+    gate.set()
+    pool.shutdown()
+
+def test_full_queue_blocks_until_room():
+    pool, gate, queued = full_pool('block')
+    with pytest.raises(PoolFullError):
+        pool.submit(Task(target=int), timeout=0.05)
+    threading.Timer(0.1, gate.set).start()
+    late = Task(target=lambda: 'baadaye')
+    pool.submit(late)
+    late.join(5)
+    assert (queued.result.value, late.result.value) == ('foleni', 'baadaye')
+    assert pool.metrics()['rejected'] == 1
+    pool.shutdown()
+
+def test_full_queue_runs_on_caller():
+    pool, gate, _ = full_pool('caller_runs')
+    here = Task(target=threading.current_thread)
+    pool.submit(here)
+    assert here.done() and here.result.value is threading.current_thread()
+    assert pool.metrics()['caller_runs'] == 1
+    gate.set()
+    pool.shutdown()
+
+def test_priority_and_deadline():
+    pool = ThreadPool(max_workers=1)
+    gate = threading.Event()
+    pool.submit(blocked(gate))
+    wait_until(lambda: pool.metrics()['active_workers'] == 1)
+    order = []
+    low = Task(target=order.append, args=('chini',))
+    high = Task(target=order.append, args=('juu',))
+    late = Task(target=order.append, args=('kuchelewa',))
+    pool.submit(low)
+    pool.submit(late, priority=1, deadline=0.01)
+    pool.submit(high, priority=5)
+    time.sleep(0.05)
+    gate.set()
+    join_all([low, high, late], 5)
+    assert order == ['juu', 'chini']
+    assert isinstance(late.result.exception, TimeoutError)
+    wait_until(lambda: pool.metrics()['expired'] == 1)
+    pool.shutdown()
+
+def test_shutdown_waits_for_queued_tasks():
+    pool = ThreadPool(max_workers=1)
+    gate = threading.Event()
+    pool.submit(blocked(gate))
+    queued = Task(target=lambda: 'imekamilika')
+    pool.submit(queued)
+    threading.Timer(0.1, gate.set).start()
+    pool.shutdown(wait=True)
+    assert queued.result.value == 'imekamilika'
+    assert pool.metrics()['workers'] == 0
+    with pytest.raises(RuntimeError, match="imesimamishwa"):
+        pool.submit(Task(target=int))
+
+def test_shutdown_without_wait_cancels_pending():
+    pool = ThreadPool(max_workers=1)
+    gate = threading.Event()
+    running = blocked(gate)
+    pool.submit(running)
+    wait_until(lambda: pool.metrics()['active_workers'] == 1)
+    queued = Task(target=int)
+    pool.submit(queued)
+    pool.shutdown(wait=False, cancel_pending=True)
+    # Returned with the running task still blocked
+    assert not running.done()
+    assert isinstance(queued.result.exception, RuntimeError)
+    assert pool.metrics()['cancelled'] == 1
+    gate.set()
+    running.join(5)
+    wait_until(lambda: pool.metrics()['workers'] == 0)
+
+def test_metrics_counts():
+    pool = ThreadPool(max_workers=2)
+    tasks = [Task(target=time.sleep, args=(0.001,)) for _ in range(10)]
+    for task in tasks:
+        pool.submit(task)
+    join_all(tasks, 5)
+    wait_until(lambda: pool.metrics()['completed'] == 10)
+    metrics = pool.metrics()
+    assert metrics['submitted'] == 10
+    assert metrics['queue_depth'] == 0
+    assert metrics['rejected'] == metrics['expired'] == metrics['cancelled'] == 0
+    assert metrics['run_time']['count'] == metrics['wait_time']['count'] == 10
+    assert metrics['run_time']['max'] >= 0.001
+    pool.shutdown()
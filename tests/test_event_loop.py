@@ -0,0 +1,157 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.event_loop import EventLoop, Suspend
+from src.interpreter import execute_file
+from src.processes import set_default_backend
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/maandishi':
+            self.reply(200, 'text/plain', b'habari')
+        elif self.path == '/json':
+            self.reply(200, 'application/json; charset=utf-8', json.dumps({'jina': 'spl'}).encode())
+        elif self.path == '/latin':
+            self.reply(200, 'text/plain; charset="latin-1"', 'café'.encode('latin-1'))
+        elif self.path == '/hamishwa':
+            self.redirect(301, '/maandishi')
+        elif self.path == '/njia':
+            self.reply(200, 'text/plain', self.command.encode())
+        elif self.path == '/polepole':
+            time.sleep(0.2)
+            self.reply(200, 'text/plain', b'polepole')
+        else:
+            self.reply(404, 'text/plain', b'haipo')
+
+    def do_POST(self):
+        if self.path == '/tuma':
+            self.redirect(303, '/njia')
+        else:
+            self.reply(200, 'text/plain', self.command.encode())
+
+    def reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def redirect(self, status, location):
+        self.send_response(status)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog for the test that connects all at once
+    request_queue_size = 256
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def event_loop():
+    loop = EventLoop()
+    yield loop
+    loop.close()
+
+@pytest.fixture
+def async_backend():
+    set_default_backend('async')
+    yield
+    set_default_backend('thread')
+
+def suspend(event_loop, name, *args):
+    """What the VM yields to call the loop's builtin name"""
+    builtin = event_loop.builtins()[name]
+    return Suspend(builtin.spl_async, builtin, args)
+
+def call(event_loop, name, *args):
+    """Value of one builtin awaited on the loop"""
+    def steps():
+        return (yield suspend(event_loop, name, *args))
+    return event_loop.run(steps())
+
+@pytest.mark.parametrize("path, njia, expected", [
+    ('/maandishi', 'GET', 'habari'),
+    ('/json', 'GET', {'jina': 'spl'}),
+    ('/latin', 'GET', 'café'),
+    ('/hamishwa', 'GET', 'habari'),
+    ('/tuma', 'POST', 'GET'),
+    ('/njia', 'POST', 'POST'),
+])
+def test_pakua(server, event_loop, path, njia, expected):
+    assert call(event_loop, 'pakua', server + path, njia) == expected
+
+def test_pakua_error_status(server, event_loop, capsys):
+    assert call(event_loop, 'pakua', server + '/haipo') is None
+    assert "Kosa la mtandao: 404" in capsys.readouterr().out
+
+def test_many_tasks_wait_together(server, event_loop):
+    def sleeper():
+        yield suspend(event_loop, 'simamisha', 0.2)
+        return (yield suspend(event_loop, 'pakua', server + '/polepole'))
+
+    tasks = [event_loop.spawn(sleeper()) for _ in range(100)]
+    start = time.monotonic()
+    call(event_loop, 'subiri_zote', tasks)
+    # One after another would take 40 s
+    assert time.monotonic() - start < 10
+    assert [task.result.value for task in tasks] == ['polepole'] * 100
+
+def test_waits_with_timeout(async_backend, tmp_path, capsys):
+    path = tmp_path / "subiri.spl"
+    path.write_text("""
+a = anzisha { simamisha(0.05) 1 }
+b = anzisha { simamisha(0.5) 2 }
+c = anzisha { simamisha(0.5) 3 }
+chapisha(subiri(a, 1))
+chapisha(subiri(b, 0.05))
+chapisha(subiri_zote(a, b, 0.05))
+chapisha(subiri(subiri_yoyote(b, a, 0.05)))
+chapisha(subiri_yoyote(b, c, 0.05))
+chapisha(zinapokamilika(b, a, 0.05))
+chapisha(zinapokamilika(c, b, 1))
+""")
+    execute_file(str(path), use_cache=False, engine='vm')
+    assert capsys.readouterr().out.split("\n") == [
+        "1", "None", "[1, None]", "1", "None", "[1, None]", "[2, 3]", ""]
+
+def test_builtins_block_outside_the_vm(async_backend, tmp_path, capsys):
+    path = tmp_path / "panga.spl"
+    path.write_text("""
+chapisha(panga(simamisha, panga(desimali, gawa("0 0"))))
+lala = kumbuka(simamisha)
+chapisha(lala(0))
+""")
+    execute_file(str(path), use_cache=False, engine='vm')
+    assert capsys.readouterr().out == "[None, None]\nNone\n"
+
+def test_failed_program_cancels_its_tasks(event_loop):
+    def sleeper():
+        yield suspend(event_loop, 'simamisha', 10)
+
+    def program():
+        yield suspend(event_loop, 'simamisha', 0)
+        raise ValueError("kosa")
+
+    task = event_loop.spawn(sleeper())
+    with pytest.raises(ValueError):
+        event_loop.run(program())
+    # Finished while the loop ran, so its waiters wake up
+    assert task.done()
+    assert isinstance(task.result.exception, asyncio.CancelledError)
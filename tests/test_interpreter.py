@@ -0,0 +1,163 @@
+import pytest
+
+from src.interpreter import SPLRuntimeError, execute_file
+
+ENGINES = ('tree', 'vm')
+
+def run(source, engine, tmp_path, capsys, **options):
+    path = tmp_path / f"programu_{engine}.spl"
+    path.write_text(source)
+    execute_file(str(path), use_cache=False, engine=engine, **options)
+    return capsys.readouterr().out
+
+def run_both(source, tmp_path, capsys):
+    """Output of source, checked to be the same on both engines"""
+    tree, vm = (run(source, engine, tmp_path, capsys) for engine in ENGINES)
+    assert vm == tree
+    return tree
+
+def error(source, engine, tmp_path, capsys, **options):
+    with pytest.raises(SPLRuntimeError) as raised:
+        run(source, engine, tmp_path, capsys, **options)
+    return str(raised.value)
+
+def test_arithmetic_and_scopes(tmp_path, capsys):
+    source = """
+x = 10
+kazi ongeza(n) { rudisha n + x }
+kama x > 5 { y = 1 chapisha(y) } vinginevyo { chapisha(0) }
+chapisha(ongeza(5) * 2 - 1 / 2)
+chapisha("a" + "b")
+"""
+    assert run_both(source, tmp_path, capsys) == "1\n29.5\nab\n"
+
+def test_tail_calls(tmp_path, capsys):
+    source = """
+kazi jumla(n: int, acc: int) -> int {
+    kama n == 0 { rudisha acc }
+    rudisha jumla(n - 1, acc + n)
+}
+chapisha jumla(100000, 0)
+kazi shuka(n) { kama n == 0 { "chini" } vinginevyo { shuka(n - 1) } }
+chapisha shuka(30000)
+"""
+    assert run_both(source, tmp_path, capsys) == "5000050000\nchini\n"
+
+def test_deep_recursion_on_vm(tmp_path, capsys):
+    source = """
+kazi hesabu(n) {
+    kama n == 0 { rudisha 0 }
+    rudisha 1 + hesabu(n - 1)
+}
+chapisha hesabu(200000)
+"""
+    # Not a tail call: only the VM's frame stack runs it this deep
+    assert run(source, 'vm', tmp_path, capsys) == "200000\n"
+    assert "Kujirudia" in error(source, 'tree', tmp_path, capsys)
+
+def test_lingana(tmp_path, capsys):
+    source = """
+kazi aina_ya(x) {
+    lingana x {
+        1 => "moja"
+        "a" => "herufi a"
+        n: orodha => "orodha"
+        s: neno => "neno " + s
+        f: float => "float"
+        _ => "kingine"
+    }
+}
+chapisha aina_ya(1)
+chapisha aina_ya("a")
+chapisha aina_ya("b")
+chapisha aina_ya(gawa("x y"))
+chapisha aina_ya(2.5)
+chapisha aina_ya(hakuna)
+kazi hatua(n) {
+    lingana n {
+        0 => "mwisho"
+        _ => hatua(n - 1)
+    }
+}
+chapisha hatua(50000)
+"""
+    expected = "moja\nherufi a\nneno b\norodha\nfloat\nkingine\nmwisho\n"
+    assert run_both(source, tmp_path, capsys) == expected
+
+def test_lingana_generic_type(tmp_path, capsys):
+    source = """
+kazi aina_ya(x) {
+    lingana x {
+        n: orodha[neno] => "orodha"
+        k: kamusi[int] => "kamusi"
+        y: orodha[haipo] => "haifiki"
+        _ => "kingine"
+    }
+}
+chapisha aina_ya(gawa("x y"))
+chapisha aina_ya(kamusi())
+chapisha aina_ya(3)
+"""
+    # Matched on the container, as a parameter annotated orodha[neno] accepts it
+    assert run_both(source, tmp_path, capsys) == "orodha\nkamusi\nkingine\n"
+
+@pytest.mark.parametrize("source", [
+    "chapisha(haipo)\n",
+    'chapisha(1 + "a")\n',
+    "kazi f(n: int) { rudisha n }\nf(\"a\")\n",
+    "kazi g(x) { lingana x { 1 => 1 } }\ng(2)\n",
+])
+def test_errors_match(source, tmp_path, capsys):
+    assert error(source, 'vm', tmp_path, capsys) == error(source, 'tree', tmp_path, capsys)
+
+@pytest.mark.parametrize("source", [
+    'kazi f() -> int { rudisha "s" }\n',
+    'kazi f() -> int { kama 1 { rudisha "s" } rudisha 1 }\n',
+])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_specialize_checks_declared_returns(source, engine, tmp_path, capsys):
+    # A declared return type the body breaks proves nothing about g's argument
+    source += "kazi g(a: int) { rudisha a }\nchapisha(g(f()))\n"
+    assert error(source, engine, tmp_path, capsys, specialize=True) == \
+        error(source, engine, tmp_path, capsys) == "Aina si sahihi kwa a: Expected int, got str"
+
+@pytest.mark.parametrize("argument", ["kweli", "1 < 2"])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_nambari_rejects_bool(argument, engine, tmp_path, capsys):
+    source = f"kazi f(x: nambari) {{ rudisha x }}\nchapisha(f(2))\nchapisha(f({argument}))\n"
+    expected = "Aina si sahihi kwa x: Expected nambari, got bool"
+    assert error(source, engine, tmp_path, capsys) == expected
+    # Comparisons type as int statically, which proves nothing here
+    assert error(source, engine, tmp_path, capsys, specialize=True) == expected
+
+def test_error_in_spawned_block(tmp_path, capsys):
+    source = """
+t = anzisha { chapisha(haipo) }
+subiri(t)
+u = anzisha { 6 * 7 }
+chapisha(subiri(u))
+"""
+    # The block's error is reported, not raised into the program
+    assert run_both(source, tmp_path, capsys) == "Shida ya mtindo: Kisichojulikana: haipo\n42\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_process_block_captures(engine, tmp_path, capsys):
+    fib = "kazi fib(n) { kama n < 2 { rudisha n } rudisha fib(n - 1) + fib(n - 2) }\n"
+    # kumbuka itself is the worker's own; the function it returns is a
+    # value like any other, and does not pickle
+    source = fib + "u = anzisha mchakato { h = kumbuka(fib) h(12) }\nchapisha(subiri(u))\n"
+    assert run(source, engine, tmp_path, capsys) == "144\n"
+    source = fib + "g = kumbuka(fib)\nt = anzisha mchakato { chapisha(g(10)) }\n"
+    assert "Thamani ya 'g' (function) haiwezi kutumwa" in error(source, engine, tmp_path, capsys)
+
+def test_timeout_marks_unfinished_tasks(tmp_path, capsys):
+    source = """
+kazi kama_ilivyo(x) { rudisha x }
+a = anzisha { 1 }
+b = anzisha { simamisha(2) 2 }
+subiri(a)
+chapisha(panga(kama_ilivyo, zinapokamilika(a, b, 0.2)))
+chapisha(subiri_zote(a, b, 0.1))
+"""
+    # The late task is hakuna, not dropped from the list
+    assert run_both(source, tmp_path, capsys) == "[1, None]\n[1, None]\n"
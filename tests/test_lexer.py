@@ -0,0 +1,29 @@
+import io
+
+import pytest
+
+from src.lexer import Lexer, SPLexer, read_chunks
+
+SOURCE = """
+kazi jumla(a: nambari, b: nambari) -> nambari {
+    rudisha a + b
+}
+ujumbe = "habari za asubuhi"
+chapisha(jumla(5, 3.2))  # Chapisha jumla
+"""
+
+def streamed(source, chunk_size):
+    return SPLexer('').stream(read_chunks(io.StringIO(source), chunk_size))
+
+def summary(tokens):
+    return [(token.type, token.value, token.line, token.column) for token in tokens]
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 64 * 1024])
+def test_stream_matches_tokenize(chunk_size):
+    assert summary(streamed(SOURCE, chunk_size)) == summary(Lexer(SOURCE).tokenize())
+
+def test_stream_token_longer_than_chunk():
+    source = 'x = "' + 'a' * 50000 + '"\nchapisha(x)\n'
+    tokens = summary(streamed(source, 16))
+    assert tokens == summary(Lexer(source).tokenize())
+    assert ('STRING', 'a' * 50000) in [(kind, value) for kind, value, _, _ in tokens]
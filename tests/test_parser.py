@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from src.ast_nodes import NodeVisitor, to_dict
+from src.lexer import Lexer, SPLexer, read_chunks
+from src.parser import Parser, TokenWindow, Token
+
+SOURCE = """
+kazi lala(n) {
+    simamisha(n)
+    rudisha n
+}
+anzisha mchakato { lala(1) }
+anzisha uzi { lala(2) }
+t = anzisha { lala(3) }
+anzisha { mchakato }
+"""
+
+def parse_list(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def parse_stream(source, chunk_size):
+    tokens = SPLexer('').stream(read_chunks(io.StringIO(source), chunk_size))
+    return Parser(tokens).parse()
+
+def tokens(count):
+    return (Token('IDENTIFIER', f"t{i}", 1, i) for i in range(count))
+
+def test_window_keeps_tokens_after_lookahead():
+    window = TokenWindow(tokens(5))
+    assert window[1].value == 't1'
+    # A peek past the current token must not drop the current one
+    assert window[2].value == 't2'
+    assert window[1].value == 't1'
+
+def test_window_release_drops_earlier_tokens():
+    window = TokenWindow(tokens(5))
+    window[4]
+    window.release(2)
+    assert window[2].value == 't2'
+    with pytest.raises(IndexError):
+        window[1]
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_stream_parse_matches_list_parse(chunk_size):
+    expected = [to_dict(node) for node in parse_list(SOURCE)]
+    assert [to_dict(node) for node in parse_stream(SOURCE, chunk_size)] == expected
+
+def test_spawn_backends_after_peek():
+    statements = parse_stream(SOURCE, 16)
+    spawns = [node for node in statements if node.type == 'Spawn']
+    assert [spawn.backend for spawn in spawns] == ['process', 'thread', None]
+    # A backend name not followed by a brace is the block's statement
+    assert statements[-1].body[0].type == 'Var'
+    assert statements[-2].value.type == 'Spawn'
+
+def test_visitor_walks_nodes_it_does_not_handle():
+    class Names(NodeVisitor):
+        def __init__(self):
+            self.names = []
+
+        def visit_Var(self, node):
+            self.names.append(node.name)
+
+    visitor = Names()
+    for node in parse_list(SOURCE):
+        visitor.visit(node)
+    assert visitor.names == ['simamisha', 'n', 'n', 'lala', 'lala', 'lala', 'mchakato']
@@ -0,0 +1,73 @@
+import pytest
+
+from src import splc
+from src.ast_nodes import to_dict
+from src.interpreter import execute_file
+
+PROGRAM = """
+kazi mraba(x) {
+    rudisha x * x
+}
+chapisha(mraba(7))
+"""
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "mraba.spl"
+    path.write_text(PROGRAM)
+    return path
+
+def as_dicts(ast):
+    return [to_dict(node) for node in ast]
+
+def no_parse(*args, **kwargs):
+    raise AssertionError("parsed instead of loading the cache")
+
+def test_compile_load_and_run(source, tmp_path, capsys):
+    output = splc.compile_file(source, tmp_path / "mraba.splc")
+    assert as_dicts(splc.load_precompiled(output)) == as_dicts(splc.load_file(source, use_cache=False))
+    execute_file(str(output))
+    assert capsys.readouterr().out == "49\n"
+
+def test_cache_is_written_then_used(source, monkeypatch):
+    first = splc.load_file(source)
+    assert splc.cache_path(source).exists()
+    monkeypatch.setattr(splc, '_parse_file', no_parse)
+    assert as_dicts(splc.load_file(source)) == as_dicts(first)
+
+def test_changed_source_invalidates_cache(source, capsys):
+    splc.load_file(source)
+    source.write_text(PROGRAM.replace("7", "8"))
+    with pytest.raises(splc.SPLCError, match="changed"):
+        splc.loads(splc.cache_path(source).read_bytes(), splc._hash_file(source))
+    execute_file(str(source))
+    assert capsys.readouterr().out == "64\n"
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:splc.HEADER.size] + b"\xff" * (len(data) - splc.HEADER.size),
+    lambda data: b"",
+])
+def test_corrupt_cache_falls_back_to_parsing(source, damage):
+    expected = as_dicts(splc.load_file(source))
+    cached = splc.cache_path(source)
+    cached.write_bytes(damage(cached.read_bytes()))
+    assert as_dicts(splc.load_file(source)) == expected
+    # Rewritten with a valid entry
+    assert as_dicts(splc.loads(cached.read_bytes(), splc._hash_file(source))) == expected
+
+def test_other_optimization_level_is_not_reused(source):
+    splc.load_file(source, optimize=0)
+    assert not splc.cache_path(source, optimize=1).exists()
+    splc.load_file(source, optimize=1)
+    assert splc.cache_path(source, optimize=1).exists()
+
+@pytest.mark.parametrize("flags, threshold", [(["--jit", "0"], 1), (["--jit-report"], None)])
+def test_cli_jit_threshold(source, monkeypatch, capsys, flags, threshold):
+    from src import cli
+    from src.jit import DEFAULT_THRESHOLD
+
+    monkeypatch.setattr("sys.argv", ["spl", "--no-cache", "--jit-report", *flags, "run", str(source)])
+    cli.main()
+    report = capsys.readouterr().err
+    assert f"jit (threshold {threshold or DEFAULT_THRESHOLD})" in report